@@ -3,6 +3,14 @@ ASGI config for Pilatesreserva project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Modo ASGI (uvicorn):
+
+    pip install "uvicorn[standard]"
+    uvicorn Pilatesreserva.asgi:application --host 0.0.0.0 --port 8000 --workers 2
+
+Bajo ASGI las vistas públicas usan sus versiones async (index/views_async.py).
+Se puede forzar el modo con PILATES_ASYNC_VIEWS=0/1.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +20,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Pilatesreserva.settings')
+os.environ.setdefault('PILATES_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,214 @@
+"""
+Pilatesreserva/cache.py
+
+Capa de cache para contenido (fragmentos de templates, landing, memo de
+compresión) sobre cualquier backend de Django: locmem, archivo o Redis
+(ver CACHES en settings.py). Solo usa get/set/add/delete, así que se
+comporta igual en los tres.
+
+Cada entrada se guarda como (valor, delta, vence):
+  delta → segundos que tomó calcularla
+  vence → vencimiento lógico (epoch); en el backend vive ttl + GRACE
+
+  - Recálculo temprano probabilístico (XFetch): antes de `vence`, cada
+    lectura recalcula con probabilidad creciente a medida que se acerca
+    el vencimiento, y antes cuanto más cara es la entrada
+    (ahora - delta * BETA * ln(rand) >= vence). Así no vencen todas a la vez.
+  - Single-flight: solo quien consigue el candado recalcula; el resto no
+    toca la BD. El candado es cache.add (atómico en locmem y Redis); en
+    FileBasedCache add() no es atómico (has_key + set), así que ahí es un
+    archivo creado con O_EXCL junto a las entradas.
+  - Stale-while-revalidate: vencida pero dentro de la gracia, quien no
+    tiene el candado recibe el valor viejo en el acto. Si el recálculo
+    falla, también se sirve el viejo (stale-if-error).
+  - Miss completo: quien no tiene el candado espera hasta WAIT segundos
+    a que aparezca el valor; pasado eso calcula por su cuenta.
+
+Configuración: settings.CACHE_LAYER. ttl=0 desactiva el cache (se
+calcula siempre), como TEMPLATE_FRAGMENT_CACHE en modo dev.
+
+version()/cambiar_version(): sellos para invalidar por contenido
+(catálogo, sitemaps) sin conocer todas las claves derivadas.
+"""
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'GRACE': 5 * 60,        # segundos que se sirve una entrada vencida
+    'BETA': 1.0,            # >1 recalcula antes, <1 más tarde
+    'LOCK_TIMEOUT': 30,     # el candado expira solo si el proceso muere
+    'WAIT': 2.0,            # espera máxima ante un miss con candado ajeno
+    'POLL': 0.05,
+}
+
+_eventos = Counter()
+_eventos_lock = threading.Lock()
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'CACHE_LAYER', {})}
+
+
+def _contar(evento):
+    with _eventos_lock:
+        _eventos[evento] += 1
+
+
+def estadisticas():
+    """Contadores del proceso: acierto, viejo, espera, recalculo, error."""
+    with _eventos_lock:
+        return dict(_eventos)
+
+
+def _ruta_candado(cache, clave):
+    return cache._key_to_file(f'{clave}:candado') + '.lock'
+
+
+def _candado_archivo(cache, clave, token, timeout):
+    ruta = _ruta_candado(cache, clave)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    for _intento in range(2):
+        try:
+            fd = os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(ruta) < timeout:
+                    return False
+                os.remove(ruta)         # vencido: su dueño murió
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write(token)
+        return True
+    return False
+
+
+def _tomar_candado(cache, clave, cfg):
+    token = uuid.uuid4().hex
+    if isinstance(cache, FileBasedCache):
+        tomado = _candado_archivo(cache, clave, token, cfg['LOCK_TIMEOUT'])
+    else:
+        tomado = cache.add(f'{clave}:candado', token, cfg['LOCK_TIMEOUT'])
+    return token if tomado else None
+
+
+def _soltar_candado(cache, clave, token):
+    if isinstance(cache, FileBasedCache):
+        ruta = _ruta_candado(cache, clave)
+        try:
+            with open(ruta) as f:
+                if f.read() == token:
+                    os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        return
+    candado = f'{clave}:candado'
+    if cache.get(candado) == token:
+        cache.delete(candado)
+
+
+def _calcular_y_guardar(cache, clave, calcular, ttl, gracia):
+    inicio = time.perf_counter()
+    valor = calcular()
+    delta = time.perf_counter() - inicio
+    cache.set(clave, (valor, delta, time.time() + ttl), ttl + gracia)
+    _contar('recalculo')
+    return valor
+
+
+def obtener(clave, calcular, ttl, *, alias=None, gracia=None):
+    """
+    Devuelve el valor cacheado bajo `clave`; si falta (o toca recalcular)
+    lo obtiene llamando a `calcular()` y lo guarda `ttl` segundos.
+    """
+    if not ttl:
+        return calcular()
+    cfg = config()
+    cache = caches[alias or cfg['ALIAS']]
+    gracia = cfg['GRACE'] if gracia is None else gracia
+
+    entrada = cache.get(clave)
+    if entrada is not None:
+        valor, delta, vence = entrada
+        ahora = time.time()
+        # 1 - random() está en (0, 1]: log nunca recibe 0
+        if ahora - delta * cfg['BETA'] * math.log(1.0 - random.random()) < vence:
+            _contar('acierto')
+            return valor
+        token = _tomar_candado(cache, clave, cfg)
+        if token is None:                   # otro ya la está recalculando
+            _contar('viejo' if ahora >= vence else 'acierto')
+            return valor
+        try:
+            return _calcular_y_guardar(cache, clave, calcular, ttl, gracia)
+        except Exception:
+            logger.exception('Falló el recálculo de %s; se sirve el valor anterior', clave)
+            _contar('error')
+            return valor
+        finally:
+            _soltar_candado(cache, clave, token)
+
+    token = _tomar_candado(cache, clave, cfg)
+    if token is None:
+        limite = time.monotonic() + cfg['WAIT']
+        while time.monotonic() < limite:
+            time.sleep(cfg['POLL'])
+            entrada = cache.get(clave)
+            if entrada is not None:
+                _contar('espera')
+                return entrada[0]
+        # El dueño del candado tarda demasiado (o murió): calcular igual
+    try:
+        return _calcular_y_guardar(cache, clave, calcular, ttl, gracia)
+    finally:
+        if token is not None:
+            _soltar_candado(cache, clave, token)
+
+
+def invalidar(*claves, alias=None):
+    """Borra las entradas: la próxima lectura recalcula (single-flight)."""
+    caches[alias or config()['ALIAS']].delete_many(claves)
+
+
+# ─────────────────────────────────────────────────────────────
+# SELLOS DE VERSIÓN
+# ─────────────────────────────────────────────────────────────
+# Para cachés que se invalidan por contenido: la clave del valor incluye
+# el sello, y cambiar el sello deja al valor viejo huérfano (vence solo).
+
+def version(clave, alias=None):
+    """Sello guardado bajo `clave`; si no existe (cache vacío) se crea."""
+    cache = caches[alias or config()['ALIAS']]
+    sello = cache.get(clave)
+    if sello is None:
+        cache.add(clave, uuid.uuid4().hex, timeout=None)
+        sello = cache.get(clave)
+    return sello
+
+
+def cambiar_version(*claves, alias=None, using=None):
+    """
+    Cambia los sellos ya (este proceso ve su propio cambio aunque la
+    transacción siga abierta) y otra vez después del commit (por si otro
+    proceso recalculó en el medio con los datos previos al commit).
+    """
+    def cambiar():
+        caches[alias or config()['ALIAS']].set_many(
+            {clave: uuid.uuid4().hex for clave in claves}, timeout=None)
+    cambiar()
+    transaction.on_commit(cambiar, using=using)
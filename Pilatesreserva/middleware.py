@@ -0,0 +1,250 @@
+"""
+Pilatesreserva/middleware.py
+
+CompressionMiddleware: minificación HTML opcional + compresión brotli/gzip.
+
+  - Negocia por Accept-Encoding (respeta q=0); prefiere br si el paquete
+    brotli está instalado, si no gzip.
+  - Solo comprime tipos de texto y respuestas de al menos MIN_SIZE bytes.
+  - Respuestas streaming: se comprimen por trozos con flush en cada uno,
+    así el cliente sigue recibiendo datos a medida que se generan.
+  - Memo en cache (Pilatesreserva/cache.py): el resultado (minificado +
+    comprimido) se guarda por hash del cuerpo y encoding, así una página
+    idéntica no se vuelve a comprimir en cada hit.
+  - Páginas con token CSRF (mitigación BREACH, como Django): no se
+    memoizan, van en gzip con relleno aleatorio y nunca en br (brotli no
+    tiene dónde meter relleno); si el cliente no acepta gzip, sin comprimir.
+  - Si el cuerpo se reescribe (minificado y/o comprimido) el ETag pasa a
+    débil: ya no identifica los bytes que generó la vista.
+
+Orden en MIDDLEWARE: justo después de InstrumentationMiddleware y antes
+de cualquier middleware que lea el cuerpo. Si se activa el cache de
+página (UpdateCacheMiddleware), debe ir ANTES que este en la lista para
+que lo que se guarde sea la variante ya comprimida; el header
+Vary: Accept-Encoding hace que cada encoding tenga su propia entrada.
+
+Configuración: settings.COMPRESSION y settings.HTML_MINIFY.
+"""
+import gzip
+import hashlib
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+from . import cache as cache_contenido
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli se usa solo gzip
+    brotli = None
+
+DEFAULTS = {
+    'MIN_SIZE': 860,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'MEMO_CACHE': 'default',
+    'MEMO_TIMEOUT': 60 * 60,
+    'MEMO_MAX_BYTES': 512 * 1024,
+}
+
+TIPOS_COMPRIMIBLES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'application/atom+xml',
+                      'application/rss+xml', 'image/svg+xml')
+
+_re_accept = _lazy_re_compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def _config():
+    return {**DEFAULTS, **getattr(settings, 'COMPRESSION', {})}
+
+
+def elegir_encoding(accept_encoding, opciones=('br', 'gzip')):
+    """Devuelve 'br', 'gzip' o None según Accept-Encoding."""
+    aceptados = {}
+    for parte in (accept_encoding or '').split(','):
+        m = _re_accept.match(parte)
+        if not m:
+            continue
+        try:
+            q = float(m.group(2)) if m.group(2) else 1.0
+        except ValueError:
+            q = 0.0
+        aceptados[m.group(1).lower()] = q
+    comodin = aceptados.get('*', 0.0)
+    for encoding in opciones:
+        if encoding == 'br' and not brotli:
+            continue
+        if aceptados.get(encoding, comodin) > 0:
+            return encoding
+    return None
+
+
+# ─────────────────────────────────────────────────────────────
+# MINIFICADOR HTML
+# ─────────────────────────────────────────────────────────────
+
+# Bloques cuyo contenido no se toca (o se trata aparte, como <style>)
+_re_protegido = re.compile(
+    r'(<(pre|textarea|script|style)\b[^>]*>.*?</\2\s*>)', re.S | re.I)
+_re_comentario = re.compile(r'<!--(?!\[if|<!|>).*?-->', re.S)
+_re_espacios = re.compile(r'\s+')
+_re_css_comentario = re.compile(r'/\*.*?\*/', re.S)
+
+
+def minificar_html(html):
+    """
+    Quita comentarios HTML y colapsa cada tramo de espacios a un espacio.
+    <pre>, <textarea> y <script> quedan intactos; en <style> se quitan los
+    comentarios CSS y se colapsan espacios.
+    """
+    partes = _re_protegido.split(html)
+    salida = []
+    i = 0
+    while i < len(partes):
+        texto = partes[i]
+        salida.append(_re_espacios.sub(' ', _re_comentario.sub('', texto)))
+        if i + 1 < len(partes):
+            bloque, etiqueta = partes[i + 1], partes[i + 2].lower()
+            if etiqueta == 'style':
+                bloque = _re_espacios.sub(' ', _re_css_comentario.sub('', bloque))
+            salida.append(bloque)
+        i += 3
+    return ''.join(salida)
+
+
+# ─────────────────────────────────────────────────────────────
+# COMPRESORES
+# ─────────────────────────────────────────────────────────────
+
+def comprimir(datos, encoding, relleno=False):
+    cfg = _config()
+    if encoding == 'br':
+        if relleno:
+            raise ValueError('brotli no admite relleno: usar gzip')
+        return brotli.compress(datos, quality=cfg['BROTLI_QUALITY'])
+    if relleno:
+        return compress_string(datos, max_random_bytes=100)
+    return gzip.compress(datos, compresslevel=cfg['GZIP_LEVEL'], mtime=0)
+
+
+class _CompresorIncremental:
+    def __init__(self, encoding):
+        cfg = _config()
+        if encoding == 'br':
+            self._c = brotli.Compressor(quality=cfg['BROTLI_QUALITY'])
+            self._flush = self._c.flush
+            self._fin = self._c.finish
+            self._add = self._c.process
+        else:
+            self._c = zlib.compressobj(cfg['GZIP_LEVEL'], zlib.DEFLATED, 31)
+            self._flush = lambda: self._c.flush(zlib.Z_SYNC_FLUSH)
+            self._fin = self._c.flush
+            self._add = self._c.compress
+
+    def trozo(self, datos):
+        return self._add(datos) + self._flush()
+
+    def fin(self):
+        return self._fin()
+
+
+def _stream(iterador, encoding):
+    compresor = _CompresorIncremental(encoding)
+    for trozo in iterador:
+        salida = compresor.trozo(trozo)
+        if salida:
+            yield salida
+    yield compresor.fin()
+
+
+async def _astream(iterador, encoding):
+    compresor = _CompresorIncremental(encoding)
+    async for trozo in iterador:
+        salida = compresor.trozo(trozo)
+        if salida:
+            yield salida
+    yield compresor.fin()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or \
+                'no-transform' in response.get('Cache-Control', ''):
+            return response
+        tipo = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not tipo.startswith(TIPOS_COMPRIMIBLES):
+            return response
+
+        # La respuesta varía según Accept-Encoding aunque no se comprima
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        encoding = elegir_encoding(accept_encoding)
+
+        if response.streaming:
+            if encoding is None:
+                return response
+            if response.is_async:
+                response.streaming_content = _astream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = _stream(response.streaming_content, encoding)
+            del response.headers['Content-Length']
+            self._marcar(response, encoding)
+            return response
+
+        cuerpo = response.content
+        minificar = tipo == 'text/html' and getattr(settings, 'HTML_MINIFY', False)
+        cfg = _config()
+        if len(cuerpo) < cfg['MIN_SIZE'] or (encoding is None and not minificar):
+            return response
+
+        # Páginas con token CSRF: sin memo y en gzip con relleno aleatorio (BREACH)
+        secreta = b'csrfmiddlewaretoken' in cuerpo
+        if secreta:
+            encoding = elegir_encoding(accept_encoding, opciones=('gzip',))
+            if encoding is None and not minificar:
+                return response
+
+        def procesar():
+            resultado, enc = cuerpo, encoding
+            if minificar:
+                charset = response.charset or 'utf-8'
+                resultado = minificar_html(cuerpo.decode(charset)).encode(charset)
+            if enc is not None:
+                comprimido = comprimir(resultado, enc, relleno=secreta)
+                if len(comprimido) < len(resultado):
+                    resultado = comprimido
+                else:
+                    enc = None
+            return resultado, enc
+
+        if secreta or len(cuerpo) > cfg['MEMO_MAX_BYTES']:
+            return self._aplicar(response, *procesar())
+        clave = 'compresion:%s:%d:%s' % (encoding or 'identity', int(minificar),
+                                          hashlib.sha1(cuerpo).hexdigest())
+        return self._aplicar(response, *cache_contenido.obtener(
+            clave, procesar, cfg['MEMO_TIMEOUT'], alias=cfg['MEMO_CACHE']))
+
+    def _aplicar(self, response, cuerpo, encoding):
+        if cuerpo != response.content:  # minificado y/o comprimido
+            self._debilitar_etag(response)
+        response.content = cuerpo
+        response['Content-Length'] = str(len(cuerpo))
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+        return response
+
+    def _marcar(self, response, encoding):
+        self._debilitar_etag(response)
+        response['Content-Encoding'] = encoding
+
+    @staticmethod
+    def _debilitar_etag(response):
+        # Como GZipMiddleware: el ETag fuerte deja de valer para otro cuerpo
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
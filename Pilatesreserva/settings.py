@@ -1,4 +1,5 @@
 # Pilatesreserva/settings.py
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -26,12 +27,20 @@ INSTALLED_APPS = [
     "administrador",
     "index",
     "login",
+    "monitoreo",
+    "api",
+    "tareas",
 ]
 
 # ─────────────────────────────
 # Middleware
 # ─────────────────────────────
 MIDDLEWARE = [
+    # Primero: mide la latencia total incluyendo el resto de middleware
+    "monitoreo.middleware.InstrumentationMiddleware",
+    # Comprime/minifica al final de la respuesta (ver Pilatesreserva/middleware.py).
+    # Si se agrega UpdateCacheMiddleware, va ANTES de esta línea.
+    "Pilatesreserva.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -46,24 +55,52 @@ ROOT_URLCONF = "Pilatesreserva.urls"
 # ─────────────────────────────
 # Templates
 # ─────────────────────────────
+# PILATES_TEMPLATE_MODE:
+#   "production" → loader cacheado explícito (cada template se lee y
+#                  compila una vez por proceso) + fragmentos {% fragmento %}
+#   "dev"        → APP_DIRS, recarga al editar, fragmentos sin cache
+TEMPLATE_MODE = os.environ.get("PILATES_TEMPLATE_MODE", "dev" if DEBUG else "production")
+
+_TEMPLATE_OPTIONS = {
+    "context_processors": [
+        "django.template.context_processors.debug",
+        "django.template.context_processors.request",
+        "django.contrib.auth.context_processors.auth",
+        "django.contrib.messages.context_processors.messages",
+        "login.context_processors.principal",
+        "index.context_processors.fragmentos",
+    ],
+}
+if TEMPLATE_MODE == "production":
+    _TEMPLATE_OPTIONS["loaders"] = [
+        ("django.template.loaders.cached.Loader", [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ]),
+    ]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
-        "OPTIONS": {
-            "context_processors": [
-                "django.template.context_processors.debug",
-                "django.template.context_processors.request",
-                "django.contrib.auth.context_processors.auth",
-                "django.contrib.messages.context_processors.messages",
-            ],
-        },
+        # APP_DIRS no puede convivir con "loaders" explícitos
+        "APP_DIRS": TEMPLATE_MODE != "production",
+        "OPTIONS": _TEMPLATE_OPTIONS,
     },
 ]
 
+# Fragmentos {% fragmento %} de las secciones estáticas (navbar, footer, nosotros).
+# VERSION entra en la clave: cambiarla en cada deploy invalida los fragmentos.
+TEMPLATE_FRAGMENT_CACHE = {
+    "TIMEOUT": 60 * 60 if TEMPLATE_MODE == "production" else 0,
+    "VERSION": os.environ.get("PILATES_RELEASE", "1"),
+}
+
 WSGI_APPLICATION = "Pilatesreserva.wsgi.application"
 
+# Vistas públicas async (index/views_async.py). asgi.py lo activa por defecto.
+PUBLIC_ASYNC_VIEWS = os.environ.get("PILATES_ASYNC_VIEWS", "") == "1"
+
 # ─────────────────────────────
 # Base de datos
 # ─────────────────────────────
@@ -74,6 +111,99 @@ DATABASES = {
     }
 }
 
+# ─────────────────────────────
+# Cache
+# ─────────────────────────────
+# PILATES_CACHE_URL elige el backend:
+#   locmem://              → por proceso (default; desarrollo, un solo worker)
+#   file:///var/tmp/pilates → archivos compartidos por los workers de una máquina
+#   redis://host:6379/0    → compartido entre máquinas (requiere pip install redis)
+# Con varios workers usar file:// o redis:// para que el throttling del
+# login, el sello del catálogo y los candados de Pilatesreserva/cache.py
+# sean globales.
+CACHE_URL = os.environ.get("PILATES_CACHE_URL", "locmem://")
+if CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+    _cache_default = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_URL,
+    }
+elif CACHE_URL.startswith("file://"):
+    _cache_default = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": CACHE_URL[len("file://"):] or str(BASE_DIR / ".cache"),
+    }
+else:
+    _cache_default = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pilates-default",
+    }
+CACHES = {
+    "default": _cache_default,
+    # Páginas serializadas de la API (api/views.py): la clave depende de
+    # cursor/limit/fields, que elige el cliente. Van aparte, acotadas, para
+    # que no desalojen el throttling del login ni los sellos de versión.
+    "api": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pilates-api",
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    },
+}
+
+# Capa de cache de contenido (Pilatesreserva/cache.py): single-flight,
+# recálculo temprano probabilístico y stale-while-revalidate.
+CACHE_LAYER = {
+    "ALIAS": "default",
+    "GRACE": 5 * 60,
+    "BETA": 1.0,
+    "LOCK_TIMEOUT": 30,
+    "WAIT": 2.0,
+}
+
+# Sitemaps y feed Atom (index/seo.py). SITE_URL fija el origen de las URLs
+# absolutas (sitemaps, feed, JSON-LD); vacío = el host del request. Con el
+# pre-render conviene fijarlo, porque esas páginas no vienen de un request real.
+SITE_URL = os.environ.get("PILATES_SITE_URL", "")
+SEO = {
+    "CHUNK_SIZE": 1000,     # URLs por sitemap (por rango de pk)
+    "FEED_SIZE": 50,
+    "TIMEOUT": 24 * 60 * 60,
+    "MAX_AGE": 5 * 60,
+}
+
+# API JSON pública (api/). orjson es opcional (pip install orjson).
+API = {
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+    "TIMEOUT": 24 * 60 * 60,   # páginas serializadas; se invalidan por versión
+    "CACHE": "api",            # alias de CACHES para esas páginas
+    "MAX_AGE": 60,
+    "CORS_ORIGIN": "*",
+}
+
+# Últimas novedades de la landing (index/views.py), vía CACHE_LAYER.
+# Se invalidan al guardar un BlogPost; el TTL es el máximo de desfase.
+LANDING_CACHE_TIMEOUT = 10 * 60
+
+# Snapshot del catálogo de servicios (index/catalogo.py): el sello de
+# versión vive en este cache; debe ser compartido entre workers para que
+# un cambio invalide el snapshot de todos los procesos.
+CATALOGO = {
+    "CACHE_ALIAS": "default",
+}
+
+# ─────────────────────────────
+# Compresión y minificación (Pilatesreserva/middleware.py)
+# ─────────────────────────────
+# brotli es opcional (pip install brotli); sin él solo se negocia gzip.
+COMPRESSION = {
+    "MIN_SIZE": 860,        # bytes; por debajo no vale la pena comprimir
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,    # 4-6 es el punto dulce para compresión en línea
+    "MEMO_CACHE": "default",
+    "MEMO_TIMEOUT": 60 * 60,
+}
+HTML_MINIFY = os.environ.get("PILATES_HTML_MINIFY", "" if DEBUG else "1") == "1"
+
 # ─────────────────────────────
 # Password validators
 # ─────────────────────────────
@@ -97,6 +227,27 @@ USE_TZ = True
 # ─────────────────────────────
 STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
+STATIC_ROOT = BASE_DIR / "staticfiles"   # destino de collectstatic
+
+# Fuera de DEBUG, collectstatic agrega un hash al nombre de cada archivo
+# (cache de largo plazo seguro). PILATES_STATIC_MANIFEST=0 lo desactiva.
+STATIC_MANIFEST = os.environ.get("PILATES_STATIC_MANIFEST", "" if DEBUG else "1") == "1"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "Pilatesreserva.storage.ManifestStaticFilesStorageNoEstricto"
+        if STATIC_MANIFEST else "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Bootstrap/Bootstrap Icons desde static/vendor, que no se versiona: lo
+# genera `manage.py vendor_assets` en el deploy. Si la copia local no
+# existe, {% vendor_url %} usa el CDN.
+VENDOR_ASSETS_LOCAL = True
+
+# CSS crítico inline en index/servicios/nosotros (manage.py critical_css);
+# con él, site.css y navbar.css se cargan sin bloquear el primer pintado.
+CRITICAL_CSS_ENABLED = True
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -120,6 +271,90 @@ LOGIN_URL = "login:login"
 LOGIN_REDIRECT_URL = "index:index"  # ✅ Cambiado de usuarios:home_cliente
 LOGOUT_REDIRECT_URL = "index:index"
 
+# ─────────────────────────────
+# Sesiones y mensajes flash
+# ─────────────────────────────
+# PILATES_SESSION_MODE:
+#   "cached_db"      → lecturas desde el cache, la BD solo al escribir (default)
+#   "signed_cookies" → sin tabla django_session; la sesión viaja firmada en la cookie
+#   "db"             → comportamiento original de Django
+SESSION_MODE = os.environ.get("PILATES_SESSION_MODE", "cached_db")
+SESSION_ENGINE = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}[SESSION_MODE]
+SESSION_COOKIE_HTTPONLY = True
+
+# Los flash de messages.success() viajan en una cookie, no en la sesión
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+# Segundos que el backend de login cachea el usuario autenticado (0 = sin cache)
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Segundos que vale la versión del principal guardado en la sesión
+# (login/principal.py); None = AUTH_USER_CACHE_TIMEOUT, 0 = sin cache
+PRINCIPAL_CACHE_TIMEOUT = None
+
+# ─────────────────────────────
+# Throttling del login privado (login/throttling.py)
+# ─────────────────────────────
+LOGIN_THROTTLE = {
+    "LIMIT_IP": 20,        # fallos por IP en la ventana
+    "LIMIT_USERNAME": 5,   # fallos por usuario en la ventana
+    "WINDOW": 300,         # segundos
+    "CACHE_ALIAS": "default",
+    "TRUST_X_FORWARDED_FOR": False,
+}
+
+# ─────────────────────────────
+# Pre-render del sitio público (index/prerender.py)
+# ─────────────────────────────
+# Con PRERENDER_ENABLED, cada cambio de Service/BlogPost re-publica las
+# páginas afectadas en PRERENDER_ROOT (servidas directo por nginx).
+PRERENDER_ENABLED = os.environ.get("PILATES_PRERENDER", "") == "1"
+PRERENDER_ROOT = BASE_DIR / "prerender"
+
+# ─────────────────────────────
+# Monitoreo (monitoreo/): consultas, tiempos y /metrics
+# ─────────────────────────────
+MONITOREO_ENABLED = True
+MONITOREO_BUFFER = 1000            # muestras en el ring buffer por proceso
+# /metrics: token Bearer para el scraper, o IPs que conectan directo a
+# Django. Detrás de nginx todo llega desde 127.0.0.1: no listar localhost.
+METRICS_TOKEN = os.environ.get("PILATES_METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = [ip for ip in os.environ.get("PILATES_METRICS_IPS", "").split(",") if ip]
+MONITOREO_SERVER_TIMING = DEBUG    # header Server-Timing con el desglose de render
+MONITOREO_TEMPLATE_LENTO_MS = 200  # loguea renders más lentos que esto (0 = nunca)
+
+# Máximo de consultas SQL por vista (clave = namespace:nombre de la URL).
+# Excederlo loguea un warning; en tests (QUERY_BUDGETS_STRICT) falla.
+QUERY_BUDGETS = {
+    "index:index": 4,
+    "index:nosotros": 0,
+    "index:novedades": 1,
+    "index:servicios": 2,          # 0 con el snapshot de index/catalogo.py y el ranking al día
+    "index:servicio_detalle": 1,
+    "index:contacto_publico": 10,  # POST: mensaje, aviso, rollup del día y, si no hay uno
+                                   # pendiente, último envío + la tarea (5 si ya lo hay)
+    "api:servicios": 1,            # 0 con la página ya serializada
+    "api:novedades": 1,
+    "administrador:home": 11,      # conteos de mensajes y gráficos desde los rollups
+    "administrador:servicios_list": 2,
+    "administrador:blog_list": 2,
+    "administrador:mensajes_list": 2,
+}
+QUERY_BUDGETS_STRICT = False
+
+# Visitas de servicios y novedades (index/visitas.py): se suman en memoria
+# por proceso y se escriben en lote a ViewCounter.
+VISITAS = {
+    "ENABLED": True,
+    "FLUSH_INTERVAL": 30,      # segundos
+    "FLUSH_HITS": 200,
+    "RANKING_TTL": 5 * 60,     # orden "más vistos" de /servicios/
+}
+
 # ─────────────────────────────
 # Crispy Forms
 # ─────────────────────────────
@@ -145,6 +380,16 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 # Timeout para conexión SMTP
 EMAIL_TIMEOUT = 30
 
+# Avisos de mensajes de contacto nuevos (administrador/avisos.py): el primero
+# sale en el acto (vía la cola de tareas) y los siguientes se juntan en un
+# resumen por ventana, todos por una sola conexión SMTP.
+AVISOS_CONTACTO = {
+    "ENABLED": True,
+    "WINDOW": 15 * 60,
+    "RECIPIENTS": [],      # vacío = usuarios con rol administrador y email
+    "RETENTION_DAYS": 30,  # los avisos ya enviados se purgan (tarea diaria)
+}
+
 # Link de reseteo válido por 24 horas
 PASSWORD_RESET_TIMEOUT = 60 * 60 * 24
 
@@ -154,6 +399,29 @@ PASSWORD_RESET_TIMEOUT = 60 * 60 * 24
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Subidas de imágenes (administrador/uploads.py): siempre a un temporal en
+# disco, con tope de bytes; la decodificación completa va fuera del request.
+FILE_UPLOAD_HANDLERS = ["administrador.uploads.LimitedTemporaryFileUploadHandler"]
+UPLOADS = {
+    "MAX_BYTES": 8 * 1024 * 1024,
+    "MAX_PIXELS": 40_000_000,          # ~ 7700×5200
+    "FORMATS": ["JPEG", "PNG", "WEBP", "GIF"],
+    "VERIFY_MODE": "thread",           # "sync" = en el mismo hilo tras el commit;
+                                       # "queue" = cola de tareas (tareas/)
+}
+
+# Cola de tareas en la BD (tareas/cola.py); worker: manage.py procesar_tareas.
+# "sync" ejecuta cada tarea al encolarla (desarrollo sin worker).
+TAREAS = {
+    "MODE": os.environ.get("PILATES_TASKS_MODE", "worker"),
+    "POLL_INTERVAL": 1.0,
+    "VISIBILITY_TIMEOUT": 10 * 60,     # "running" más vieja = worker muerto, se retoma
+    "BACKOFF_BASE": 10,
+    "BACKOFF_MAX": 60 * 60,
+    "RETENTION_DAYS": 7,
+    "PERIODIC": {},                    # {"app.tareas.funcion": segundos}; 0 = desactivada
+}
+
 
 LOGIN_URL = '/login/pr-gestion-k7x/'
 LOGIN_REDIRECT_URL = '/administrador/'
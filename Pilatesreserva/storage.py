@@ -0,0 +1,23 @@
+"""
+Pilatesreserva/storage.py
+
+Storage de estáticos con hash en el nombre (collectstatic genera
+site.3f2a9c.css y un manifest), para servirlos con cache de un año.
+
+No estricto: una referencia a un archivo que no existe (p.ej. el
+favicon, que aún no está en static/) devuelve la URL sin hash en lugar
+de romper la página con un 500. `manifest_strict = False` no alcanza:
+con el nombre fuera del manifest Django intenta calcular el hash
+abriendo el archivo, y hashed_name() levanta ValueError si no está.
+"""
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class ManifestStaticFilesStorageNoEstricto(ManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -18,11 +18,20 @@ Panel CMS:
 
 Django Admin (soporte técnico):
   /admin/              → Django admin nativo
+
+API JSON pública (solo lectura):
+  /api/v1/servicios/   /api/v1/novedades/
+
+Monitoreo:
+  /metrics             → métricas Prometheus (Bearer METRICS_TOKEN, IP en
+                         METRICS_ALLOWED_IPS —vacío por defecto— o
+                         superusuario)
 """
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from monitoreo.views import metrics
 
 urlpatterns = [
     # Django admin (soporte técnico)
@@ -36,6 +45,12 @@ urlpatterns = [
 
     # Panel CMS del administrador
     path('administrador/', include('administrador.urls')),
+
+    # API JSON pública, versionada
+    path('api/v1/', include('api.urls')),
+
+    # Métricas Prometheus
+    path('metrics', metrics, name='metrics'),
 ]
 
 # Servir archivos media en desarrollo
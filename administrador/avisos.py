@@ -0,0 +1,174 @@
+"""
+administrador/avisos.py
+
+Avisos por email a los administradores cuando llega un mensaje de
+contacto. El envío nunca ocurre dentro del request del formulario.
+
+  1. Al crearse un ContactMessage, administrador/signals.py inserta su
+     ContactNotification (outbox). El formulario público crea el mensaje
+     dentro de transaction.atomic() (index/views.py, guardar_contacto):
+     mensaje y aviso se guardan juntos o ninguno.
+  2. Después del commit se programa el envío en la cola de tareas
+     (administrador/tareas.py → enviar_avisos_contacto). Ver si ya hay
+     uno pendiente y cuándo salió el último son dos consultas por índice,
+     que no crecen con el outbox:
+       - si no salió ningún aviso en los últimos WINDOW segundos, ya;
+       - si no, al cumplirse la ventana desde el último envío.
+     Si ya hay un envío pendiente, el mensaje se suma a ese resumen.
+  3. El envío toma todas las filas sin enviar y arma un correo por
+     destinatario: uno solo si hay un mensaje, o un resumen con todos.
+     Todos salen por una sola conexión (get_connection) y recién ahí se
+     marcan como enviados. Si el SMTP falla, las filas quedan libres y la
+     cola reintenta con backoff.
+
+La tarea también corre cada 15 minutos como barrido, por si algún aviso
+quedó sin programar (p.ej. el proceso murió justo después del commit).
+Una vez al día purgar_avisos_enviados borra los enviados hace más de
+RETENTION_DAYS.
+
+Configuración: settings.AVISOS_CONTACTO. Los destinatarios son, por
+defecto, los usuarios activos con rol administrador que tengan email.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from tareas.models import Task
+from .models import ContactNotification
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WINDOW': 15 * 60,          # segundos mínimos entre dos avisos
+    'RECIPIENTS': [],           # vacío = administradores con email
+    'SUBJECT_PREFIX': '[PilatesReserva] ',
+    'CLAIM_TIMEOUT': 5 * 60,    # un lote tomado por un worker muerto se libera
+    'RETENTION_DAYS': 30,       # los avisos enviados se purgan pasado este plazo
+}
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'AVISOS_CONTACTO', {})}
+
+
+def registrar(mensaje, using=None):
+    """Outbox del mensaje nuevo + envío programado después del commit."""
+    if not config()['ENABLED']:
+        return
+    ContactNotification.objects.using(using).create(message=mensaje)
+    transaction.on_commit(programar_envio, using=using)
+
+
+def _hay_envio_pendiente():
+    from .tareas import enviar_avisos_contacto
+
+    return Task.objects.filter(name=enviar_avisos_contacto.nombre,
+                               status=Task.PENDIENTE).exists()
+
+
+def _ultimo_envio():
+    """sent_at del último aviso: por el índice de sent_at, sin recorrer la tabla."""
+    return (ContactNotification.objects.filter(sent_at__isnull=False)
+            .order_by('-sent_at').values_list('sent_at', flat=True).first())
+
+
+def _proximo_envio(ahora, ultimo):
+    """None = ya; si no, cuando se cumple la ventana desde el último aviso."""
+    siguiente = ultimo + timedelta(seconds=config()['WINDOW']) if ultimo else None
+    return siguiente if siguiente and siguiente > ahora else None
+
+
+def programar_envio():
+    from .tareas import enviar_avisos_contacto
+
+    # Ya hay un resumen en espera: el mensaje nuevo viaja en ese
+    if _hay_envio_pendiente():
+        return None
+    return enviar_avisos_contacto.programar(
+        en=_proximo_envio(timezone.now(), _ultimo_envio()))
+
+
+def destinatarios():
+    cfg = config()
+    if cfg['RECIPIENTS']:
+        return list(cfg['RECIPIENTS'])
+    return list(get_user_model().objects.filter(rol='administrador', is_active=True)
+                .exclude(email='').order_by('pk').values_list('email', flat=True))
+
+
+def _url_panel(mensaje):
+    ruta = reverse('administrador:mensaje_detalle', args=[mensaje.pk])
+    return getattr(settings, 'SITE_URL', '').rstrip('/') + ruta
+
+
+def armar_correo(mensajes, destinatario):
+    cfg = config()
+    if len(mensajes) == 1:
+        asunto = f'Nuevo mensaje de contacto: {mensajes[0].name}'
+    else:
+        asunto = f'{len(mensajes)} mensajes de contacto nuevos'
+    cuerpo = render_to_string('administrador/emails/aviso_contacto.txt', {
+        'mensajes': [(m, _url_panel(m)) for m in mensajes],
+        'lista_url': (getattr(settings, 'SITE_URL', '').rstrip('/')
+                      + reverse('administrador:mensajes_list')),
+    })
+    return EmailMessage(cfg['SUBJECT_PREFIX'] + asunto, cuerpo, to=[destinatario],
+                        reply_to=[mensajes[0].email] if len(mensajes) == 1 else None)
+
+
+def _tomar_lote(ahora):
+    """Marca como propias las filas sin enviar (y libres) y las devuelve."""
+    lote = uuid.uuid4().hex
+    vencidos = ahora - timedelta(seconds=config()['CLAIM_TIMEOUT'])
+    ContactNotification.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=vencidos), sent_at__isnull=True,
+    ).update(batch=lote, claimed_at=ahora)
+    avisos = list(ContactNotification.objects.filter(batch=lote, sent_at__isnull=True)
+                  .select_related('message').order_by('message__created_at', 'pk'))
+    return lote, avisos
+
+
+def enviar_pendientes():
+    """
+    Envía un aviso (o resumen) con todo lo pendiente, respetando la
+    ventana. Devuelve cuántos mensajes incluyó.
+    """
+    ahora = timezone.now()
+    if _proximo_envio(ahora, _ultimo_envio()) is not None:
+        programar_envio()           # todavía no: queda para el fin de la ventana
+        return 0
+    lote, avisos = _tomar_lote(ahora)
+    if not avisos:
+        return 0
+    mensajes = [a.message for a in avisos]
+    para = destinatarios()
+    try:
+        if para:
+            with get_connection(fail_silently=False) as conexion:
+                conexion.send_messages([armar_correo(mensajes, d) for d in para])
+        else:
+            logger.warning('Avisos de contacto sin destinatarios (%s mensajes)', len(mensajes))
+    except Exception:
+        ContactNotification.objects.filter(batch=lote).update(batch='', claimed_at=None)
+        raise                       # la cola de tareas reintenta con backoff
+    ContactNotification.objects.filter(batch=lote).update(sent_at=timezone.now())
+    logger.info('Aviso de contacto enviado: %s mensaje(s) a %s destinatario(s)',
+                len(mensajes), len(para))
+    return len(mensajes)
+
+
+def purgar_enviados():
+    """Borra los avisos enviados hace más de RETENTION_DAYS. Devuelve cuántos."""
+    limite = timezone.now() - timedelta(days=config()['RETENTION_DAYS'])
+    borrados, _detalle = ContactNotification.objects.filter(sent_at__lt=limite).delete()
+    return borrados
@@ -0,0 +1,303 @@
+"""
+administrador/contenido.py
+
+Exportación / importación de servicios y novedades (con sus imágenes),
+para pasar contenido entre staging y producción o sembrar un estudio
+nuevo. Lo usan `manage.py exportar_contenido` e `importar_contenido`.
+
+Formato: un .tar (o .tar.gz) con
+
+  contenido.jsonl     una cabecera y luego una fila JSON por objeto:
+                      {"modelo": "servicio", "name": …, "price": "1000", …}
+  media/<ruta>        los archivos de imagen, con la misma ruta que en MEDIA_ROOT
+
+o solo el .jsonl, sin imágenes. Las filas llevan todos los campos salvo
+id, created_at y updated_at, incluida la metadata de la imagen
+(administrador/imagenes.py): al importar no hay que volver a abrirlas.
+
+Todo es en streaming, con memoria constante:
+  - exportar recorre la BD con .values().iterator(); el .jsonl va a un
+    temporal en disco (tar necesita el tamaño) y las imágenes se copian
+    del storage al tar de a una.
+  - importar lee el tar en modo stream ("r|*"): primero las filas, por
+    lotes de `lote` (default 1000), y después los archivos.
+
+Cada lote es un upsert por clave natural (CLAVES: nombre del servicio;
+título + fecha de la novedad): una consulta trae los pk existentes, y en
+una transacción van un bulk_create de los nuevos y un bulk_create con
+update_conflicts (ON CONFLICT sobre el pk) de los que ya estaban. Como
+eso no dispara post_save, al final se envía un solo
+`lote_actualizado` por modelo (cache, SEO, API y pre-render). Las
+imágenes que un upsert deja sin referencia las limpia `media_gc`.
+
+Cada lote se confirma por separado: una importación que falla a mitad
+deja lo ya guardado (y lo invalida igual). Repetirla con el archivo
+corregido completa el resto sin duplicar.
+"""
+import io
+import json
+import tarfile
+import tempfile
+from datetime import datetime
+from pathlib import PurePosixPath
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BlogPost, Service
+from .signals import lote_actualizado
+
+FORMATO = 'pilates-contenido'
+VERSION = 1
+ARCHIVO_FILAS = 'contenido.jsonl'
+PREFIJO_MEDIA = 'media/'
+
+MODELOS = {'servicio': Service, 'novedad': BlogPost}
+CLAVES = {Service: ('name',), BlogPost: ('title', 'published_date')}
+EXCLUIDOS = {'id', 'created_at', 'updated_at'}
+
+
+class ContenidoInvalido(Exception):
+    """El archivo a importar no tiene el formato esperado."""
+
+
+def campos(modelo):
+    return [c.name for c in modelo._meta.concrete_fields if c.name not in EXCLUIDOS]
+
+
+def _clave(modelo, obj):
+    return tuple(getattr(obj, c) for c in CLAVES[modelo])
+
+
+class _Codificador(DjangoJSONEncoder):
+    # DjangoJSONEncoder recorta a milisegundos: la fecha es parte de la clave natural
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def es_tar(ruta):
+    return not str(ruta).endswith('.jsonl')
+
+
+# ─────────────────────────────────────────────────────────────
+# EXPORTAR
+# ─────────────────────────────────────────────────────────────
+
+def escribir_filas(salida, modelos, progreso=None, lote=1000):
+    """
+    Escribe el JSONL en `salida` (texto). Devuelve el conjunto de rutas de
+    imagen referenciadas y los totales por tipo.
+    """
+    imagenes, totales = set(), {}
+    salida.write(json.dumps({'formato': FORMATO, 'version': VERSION}) + '\n')
+    for tipo, modelo in MODELOS.items():
+        if tipo not in modelos:
+            continue
+        n = 0
+        filas = modelo.objects.order_by('pk').values(*campos(modelo))
+        for fila in filas.iterator(chunk_size=lote):
+            salida.write(json.dumps({'modelo': tipo, **fila}, cls=_Codificador,
+                                    ensure_ascii=False) + '\n')
+            if fila['image']:
+                imagenes.add(fila['image'])
+            n += 1
+            if progreso and n % lote == 0:
+                progreso(tipo, n)
+        totales[tipo] = n
+        if progreso:
+            progreso(tipo, n)
+    return imagenes, totales
+
+
+def exportar(destino, modelos=tuple(MODELOS), imagenes=True, progreso=None, lote=1000):
+    """
+    Exporta a `destino` (.jsonl, .tar o .tar.gz). Devuelve
+    (totales por tipo, imágenes copiadas, imágenes faltantes).
+    """
+    if not es_tar(destino):
+        with open(destino, 'w', encoding='utf-8') as salida:
+            _rutas, totales = escribir_filas(salida, modelos, progreso, lote)
+        return totales, 0, []
+
+    modo = 'w:gz' if str(destino).endswith(('.gz', '.tgz')) else 'w'
+    copiadas, faltantes = 0, []
+    with tempfile.TemporaryFile('w+b') as temporal, tarfile.open(destino, modo) as tar:
+        texto = io.TextIOWrapper(temporal, encoding='utf-8')
+        rutas, totales = escribir_filas(texto, modelos, progreso, lote)
+        texto.flush()
+        texto.detach()              # el temporal sigue abierto para el tar
+        info = tarfile.TarInfo(ARCHIVO_FILAS)
+        info.size, info.mtime = temporal.tell(), int(timezone.now().timestamp())
+        temporal.seek(0)
+        tar.addfile(info, temporal)
+
+        if imagenes:
+            for ruta in sorted(rutas):
+                if not default_storage.exists(ruta):
+                    faltantes.append(ruta)
+                    continue
+                info = tarfile.TarInfo(PREFIJO_MEDIA + ruta)
+                info.size = default_storage.size(ruta)
+                info.mtime = int(default_storage.get_modified_time(ruta).timestamp())
+                with default_storage.open(ruta, 'rb') as archivo:
+                    tar.addfile(info, archivo)
+                copiadas += 1
+    return totales, copiadas, faltantes
+
+
+# ─────────────────────────────────────────────────────────────
+# IMPORTAR
+# ─────────────────────────────────────────────────────────────
+
+class Importacion:
+    """Estado de una importación: lotes pendientes por modelo y totales."""
+
+    def __init__(self, lote=1000, progreso=None, using=None):
+        self.lote = lote
+        self.progreso = progreso
+        self.using = using
+        self.pendientes = {modelo: {} for modelo in MODELOS.values()}
+        self.creados = {tipo: 0 for tipo in MODELOS}
+        self.actualizados = {tipo: 0 for tipo in MODELOS}
+        self.pks = {modelo: [] for modelo in MODELOS.values()}
+        self.archivos = {'copiados': 0, 'existentes': 0}
+
+    def filas(self, lineas):
+        """Consume las líneas del JSONL (bytes o str)."""
+        lineas = iter(lineas)
+        cabecera = json.loads(next(lineas, '{}') or '{}')
+        if cabecera.get('formato') != FORMATO or cabecera.get('version') != VERSION:
+            raise ContenidoInvalido('Cabecera inválida: no es una exportación de contenido.')
+        for numero, linea in enumerate(lineas, start=2):
+            if not linea.strip():
+                continue
+            try:
+                self.agregar(json.loads(linea))
+            except (ValueError, KeyError, TypeError, ValidationError) as error:
+                raise ContenidoInvalido(f'Línea {numero}: {error}') from error
+        self.vaciar()
+
+    def agregar(self, fila):
+        modelo = MODELOS[fila.pop('modelo')]
+        valores = {}
+        for nombre in campos(modelo):
+            if nombre in fila:
+                valores[nombre] = modelo._meta.get_field(nombre).to_python(fila[nombre])
+        obj = modelo(**valores)
+        if any(v in (None, '') for v in _clave(modelo, obj)):
+            raise ValueError(f'falta la clave natural {CLAVES[modelo]}')
+        # La misma clave dos veces en un lote: gana la última
+        self.pendientes[modelo][_clave(modelo, obj)] = obj
+        if len(self.pendientes[modelo]) >= self.lote:
+            self._guardar(modelo)
+
+    def vaciar(self):
+        for modelo in self.pendientes:
+            if self.pendientes[modelo]:
+                self._guardar(modelo)
+
+    def _guardar(self, modelo):
+        objs, self.pendientes[modelo] = self.pendientes[modelo], {}
+        primero = CLAVES[modelo][0]
+        existentes = {}
+        # Una consulta por lote; si la clave está repetida en la BD gana el pk menor
+        for obj in (modelo.objects.using(self.using)
+                    .filter(**{f'{primero}__in': {k[0] for k in objs}})
+                    .only('pk', *CLAVES[modelo]).order_by('-pk')):
+            existentes[_clave(modelo, obj)] = obj.pk
+        nuevos, cambiados = [], []
+        ahora = timezone.now()
+        for clave, obj in objs.items():
+            if clave in existentes:
+                obj.pk, obj.updated_at = existentes[clave], ahora
+                cambiados.append(obj)
+            else:
+                nuevos.append(obj)
+        objetos = modelo.objects.using(self.using)
+        with transaction.atomic(using=self.using):
+            creados = objetos.bulk_create(nuevos)
+            # Los existentes ya tienen pk: INSERT … ON CONFLICT (id) DO UPDATE. Es
+            # lineal; bulk_update arma un CASE por campo y con miles de filas se arrastra.
+            objetos.bulk_create(cambiados, update_conflicts=True,
+                                unique_fields=[modelo._meta.pk.name],
+                                update_fields=campos(modelo) + ['updated_at'])
+        tipo = next(t for t, m in MODELOS.items() if m is modelo)
+        self.creados[tipo] += len(nuevos)
+        self.actualizados[tipo] += len(cambiados)
+        self.pks[modelo] += [o.pk for o in creados if o.pk is not None] + [o.pk for o in cambiados]
+        if self.progreso:
+            self.progreso(tipo, self.creados[tipo] + self.actualizados[tipo])
+
+    def archivo(self, nombre, contenido, sobrescribir=False):
+        """Guarda un archivo de media en el storage con su ruta original."""
+        if default_storage.exists(nombre):
+            if not sobrescribir:
+                self.archivos['existentes'] += 1
+                return
+            default_storage.delete(nombre)
+        guardado = default_storage.save(nombre, File(contenido))
+        if guardado != nombre:          # otro proceso lo creó en medio
+            default_storage.delete(guardado)
+            self.archivos['existentes'] += 1
+            return
+        self.archivos['copiados'] += 1
+
+    def avisar(self):
+        """Una sola invalidación por modelo (cache, SEO, API, pre-render)."""
+        for modelo, pks in self.pks.items():
+            if pks:
+                lote_actualizado.send(sender=modelo, pks=pks, campos=campos(modelo))
+
+
+def ruta_de_media(nombre):
+    """Ruta en el storage de un miembro media/<ruta> del tar, o None si es sospechosa."""
+    if not nombre.startswith(PREFIJO_MEDIA):
+        return None
+    ruta = PurePosixPath(nombre[len(PREFIJO_MEDIA):])
+    if ruta.is_absolute() or '..' in ruta.parts or not ruta.parts:
+        return None
+    return str(ruta)
+
+
+def importar(origen, lote=1000, imagenes=True, sobrescribir=False, progreso=None):
+    """
+    Importa un .jsonl o un tar de exportar(). Devuelve la Importacion.
+
+    No es atómico: si falla a mitad (línea inválida, tar mal armado,
+    error al copiar una imagen) los lotes ya guardados quedan, y igual
+    se avisa por ellos para no dejar cache, SEO, API ni pre-render viejos.
+    """
+    importacion = Importacion(lote=lote, progreso=progreso)
+    try:
+        if not es_tar(origen):
+            with open(origen, encoding='utf-8') as entrada:
+                importacion.filas(entrada)
+        else:
+            _importar_tar(importacion, origen, imagenes, sobrescribir)
+    finally:
+        importacion.avisar()
+    return importacion
+
+
+def _importar_tar(importacion, origen, imagenes, sobrescribir):
+    with tarfile.open(origen, 'r|*') as tar:
+        filas_leidas = False
+        for miembro in tar:
+            if miembro.name == ARCHIVO_FILAS and miembro.isfile():
+                importacion.filas(tar.extractfile(miembro))
+                filas_leidas = True
+                continue
+            if not filas_leidas:
+                raise ContenidoInvalido(f'{ARCHIVO_FILAS} debe ser el primer archivo del tar.')
+            ruta = ruta_de_media(miembro.name)
+            if not imagenes or ruta is None or not miembro.isfile():
+                continue
+            importacion.archivo(ruta, tar.extractfile(miembro), sobrescribir)
+    if not filas_leidas:
+        raise ContenidoInvalido(f'El tar no contiene {ARCHIVO_FILAS}.')
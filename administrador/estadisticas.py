@@ -0,0 +1,187 @@
+"""
+administrador/estadisticas.py
+
+Rollups de los mensajes de contacto para el dashboard del panel, así
+el dashboard no agrupa ContactMessage completo en cada visita:
+
+  ContactStatusDaily    (día de recepción × estado) → mensajes
+  ContactResponseDaily  (día de respuesta) → respuestas y suma de segundos
+
+Se mantienen en forma incremental desde administrador/signals.py, con
+un UPDATE aditivo (x = x + n) y un INSERT si la fila no existía:
+
+  - mensaje nuevo           → +1 en (día, estado)
+  - cambio de estado        → -1 en el estado anterior, +1 en el nuevo
+                              (el día sigue siendo el de recepción)
+  - primera respuesta       → +1 respuesta y sus segundos, en el día de la respuesta
+  - mensaje eliminado       → se descuenta de ambos
+
+`manage.py recalcular_estadisticas` los reconstruye desde cero, con un
+GROUP BY por tabla. Sirve para la carga inicial o si algo los
+desincronizó, p.ej. un QuerySet.update() que no dispara señales.
+
+Los días son fechas locales (TIME_ZONE).
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ContactMessage, ContactResponseDaily, ContactStatusDaily
+
+ESTADOS = [estado for estado, _nombre in ContactMessage.STATUS_CHOICES]
+
+
+def _dia(dt):
+    return timezone.localdate(dt)
+
+
+def _sumar(modelo, using, clave, **incrementos):
+    """UPSERT aditivo: UPDATE … SET x = x + n; si no había fila, INSERT."""
+    filas = modelo.objects.using(using).filter(**clave)
+    sumas = {campo: F(campo) + n for campo, n in incrementos.items()}
+    if filas.update(**sumas):
+        return
+    try:
+        with transaction.atomic(using=using):
+            modelo.objects.using(using).create(**clave, **incrementos)
+    except IntegrityError:          # otro request la creó entre el UPDATE y el INSERT
+        filas.update(**sumas)
+
+
+def _segundos_respuesta(mensaje):
+    return (mensaje.replied_at - mensaje.created_at).total_seconds()
+
+
+# ─────────────────────────────────────────────────────────────
+# MANTENIMIENTO INCREMENTAL (administrador/signals.py)
+# ─────────────────────────────────────────────────────────────
+
+def mensaje_guardado(mensaje, created, using=None):
+    dia = _dia(mensaje.created_at)
+    anterior = None if created else getattr(mensaje, '_status_original', mensaje.status)
+    if anterior != mensaje.status:
+        if anterior is not None:
+            _sumar(ContactStatusDaily, using, {'day': dia, 'status': anterior}, messages=-1)
+        _sumar(ContactStatusDaily, using, {'day': dia, 'status': mensaje.status}, messages=1)
+    if getattr(mensaje, '_respondido_ahora', False):
+        _sumar(ContactResponseDaily, using, {'day': _dia(mensaje.replied_at)},
+               replies=1, response_seconds=_segundos_respuesta(mensaje))
+    mensaje._status_original = mensaje.status
+    mensaje._respondido_ahora = False
+
+
+def mensaje_eliminado(mensaje, using=None):
+    estado = getattr(mensaje, '_status_original', mensaje.status)
+    _sumar(ContactStatusDaily, using, {'day': _dia(mensaje.created_at), 'status': estado},
+           messages=-1)
+    if mensaje.replied_at:
+        _sumar(ContactResponseDaily, using, {'day': _dia(mensaje.replied_at)},
+               replies=-1, response_seconds=-_segundos_respuesta(mensaje))
+
+
+# ─────────────────────────────────────────────────────────────
+# RECONSTRUCCIÓN (manage.py recalcular_estadisticas)
+# ─────────────────────────────────────────────────────────────
+
+def recalcular(desde=None, using=None):
+    """
+    Reconstruye los rollups (desde la fecha `desde`, o todos). Devuelve
+    (filas por estado, filas de respuesta).
+    """
+    tz = timezone.get_current_timezone()
+    mensajes = ContactMessage.objects.using(using).order_by()
+    with transaction.atomic(using=using):
+        estados = ContactStatusDaily.objects.using(using)
+        respuestas = ContactResponseDaily.objects.using(using)
+        if desde is not None:
+            estados, respuestas = estados.filter(day__gte=desde), respuestas.filter(day__gte=desde)
+        estados.delete()
+        respuestas.delete()
+
+        por_estado = mensajes.annotate(dia=TruncDate('created_at', tzinfo=tz))
+        if desde is not None:
+            por_estado = por_estado.filter(dia__gte=desde)
+        filas = [ContactStatusDaily(day=f['dia'], status=f['status'], messages=f['n'])
+                 for f in por_estado.values('dia', 'status').annotate(n=Count('pk'))]
+        ContactStatusDaily.objects.using(using).bulk_create(filas, batch_size=500)
+
+        # Sum() de la resta de fechas: DurationField (timedelta) en todos los backends
+        por_respuesta = (mensajes.filter(replied_at__isnull=False)
+                         .annotate(dia=TruncDate('replied_at', tzinfo=tz)))
+        if desde is not None:
+            por_respuesta = por_respuesta.filter(dia__gte=desde)
+        diarias = [ContactResponseDaily(day=f['dia'], replies=f['n'],
+                                        response_seconds=f['suma'].total_seconds())
+                   for f in por_respuesta.values('dia').annotate(
+                       n=Count('pk'), suma=Sum(F('replied_at') - F('created_at')))]
+        ContactResponseDaily.objects.using(using).bulk_create(diarias, batch_size=500)
+    return len(filas), len(diarias)
+
+
+# ─────────────────────────────────────────────────────────────
+# LECTURA (dashboard y sidebar)
+# ─────────────────────────────────────────────────────────────
+
+def totales():
+    """{estado: mensajes} de todos los mensajes, leyendo solo los rollups."""
+    conteos = dict(ContactStatusDaily.objects.order_by().values_list('status')
+                   .annotate(n=Sum('messages')))
+    return {estado: conteos.get(estado) or 0 for estado in ESTADOS}
+
+
+def _lunes(dia):
+    return dia - timedelta(days=dia.weekday())
+
+
+def _porcentajes(filas):
+    maximo = max((f['total'] for f in filas), default=0) or 1
+    for f in filas:
+        f['segmentos'] = [(estado, f['por_estado'][estado],
+                           round(100 * f['por_estado'][estado] / maximo, 1))
+                          for estado in ESTADOS]
+    return filas
+
+
+def graficos(dias=30, semanas=12, hoy=None):
+    """
+    Series del dashboard: volumen diario (últimos `dias`) y semanal
+    (últimas `semanas`, de lunes a domingo) por estado, con el tiempo
+    de respuesta promedio en horas. Lee un par de cientos de filas de
+    rollup, sin tocar ContactMessage.
+    """
+    hoy = hoy or timezone.localdate()
+    inicio_dias = hoy - timedelta(days=dias - 1)
+    inicio_semanas = _lunes(hoy) - timedelta(weeks=semanas - 1)
+    desde = min(inicio_dias, inicio_semanas)
+
+    por_dia = {}
+    for dia, estado, n in (ContactStatusDaily.objects.filter(day__gte=desde)
+                           .values_list('day', 'status', 'messages')):
+        por_dia.setdefault(dia, dict.fromkeys(ESTADOS, 0))[estado] = n
+    respuestas = {dia: (n, seg) for dia, n, seg in ContactResponseDaily.objects
+                  .filter(day__gte=desde).values_list('day', 'replies', 'response_seconds')}
+
+    def promedio_horas(pares):
+        n = sum(p[0] for p in pares)
+        return round(sum(p[1] for p in pares) / n / 3600, 1) if n > 0 else None
+
+    diario = []
+    for i in range(dias):
+        dia = inicio_dias + timedelta(days=i)
+        conteos = por_dia.get(dia, dict.fromkeys(ESTADOS, 0))
+        diario.append({'inicio': dia, 'por_estado': conteos, 'total': sum(conteos.values()),
+                       'respuesta_horas': promedio_horas([respuestas.get(dia, (0, 0))])})
+
+    semanal = []
+    for i in range(semanas):
+        lunes = inicio_semanas + timedelta(weeks=i)
+        semana = [lunes + timedelta(days=d) for d in range(7)]
+        conteos = {estado: sum(por_dia.get(d, {}).get(estado, 0) for d in semana)
+                   for estado in ESTADOS}
+        semanal.append({'inicio': lunes, 'por_estado': conteos, 'total': sum(conteos.values()),
+                        'respuesta_horas': promedio_horas([respuestas.get(d, (0, 0))
+                                                           for d in semana])})
+    return {'diario': _porcentajes(diario), 'semanal': _porcentajes(semanal)}
@@ -5,15 +5,17 @@ Formularios para el panel de administración CMS.
 from django import forms
 from django.contrib.auth import get_user_model
 from .models import Service, BlogPost, ContactMessage
+from .uploads import ImagenSubida, VerificacionDiferidaMixin
 
 User = get_user_model()
 
 
-class ServiceForm(forms.ModelForm):
+class ServiceForm(VerificacionDiferidaMixin, forms.ModelForm):
     class Meta:
         model = Service
         fields = ['name', 'description', 'price',
                   'image', 'is_active', 'order']
+        field_classes = {'image': ImagenSubida}
         widgets = {
             'name':        forms.TextInput(attrs={'class': 'form-control'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
@@ -22,11 +24,12 @@ class ServiceForm(forms.ModelForm):
         }
 
 
-class BlogPostForm(forms.ModelForm):
+class BlogPostForm(VerificacionDiferidaMixin, forms.ModelForm):
     class Meta:
         model = BlogPost
         fields = ['title', 'content', 'image',
                   'is_published', 'published_date']
+        field_classes = {'image': ImagenSubida}
         widgets = {
             'title':          forms.TextInput(attrs={'class': 'form-control'}),
             'content':        forms.Textarea(attrs={'class': 'form-control', 'rows': 6}),
@@ -0,0 +1,73 @@
+"""
+administrador/imagenes.py
+
+Metadata de las imágenes de Service y BlogPost, calculada UNA vez al
+subir la imagen (ver ImagenMetadata en models.py):
+
+  - ancho/alto reales (ya con la orientación EXIF aplicada), para que
+    los <img> lleven width/height y no haya layout shift;
+  - color dominante, fondo mientras carga la imagen;
+  - placeholder: miniatura JPEG de ~16 px en base64 (data URI, <1 KB)
+    que el navegador escala y se ve como un blur.
+
+Así los templates nunca abren el archivo por request.
+"""
+import base64
+import io
+import logging
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+LADO_PLACEHOLDER = 16
+CALIDAD_PLACEHOLDER = 40
+
+ORIENTACION = 0x0112          # tag EXIF
+ROTADAS = {5, 6, 7, 8}        # orientaciones que intercambian ancho y alto
+
+
+def analizar(archivo):
+    """
+    Devuelve {'width', 'height', 'color', 'placeholder'} del archivo (file-like),
+    o None si no es una imagen legible.
+    """
+    try:
+        archivo.seek(0)
+        img = Image.open(archivo)
+        ancho, alto = img.size
+        if img.getexif().get(ORIENTACION) in ROTADAS:
+            ancho, alto = alto, ancho
+        # draft() deja que JPEG decodifique directo a baja resolución
+        img.draft('RGB', (64, 64))
+        img = ImageOps.exif_transpose(img).convert('RGB')
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logger.warning('No se pudo analizar la imagen %s: %s', getattr(archivo, 'name', ''), e)
+        return None
+    finally:
+        archivo.seek(0)
+
+    muestra = img.copy()
+    muestra.thumbnail((64, 64))
+    return {
+        'width': ancho,
+        'height': alto,
+        'color': color_dominante(muestra),
+        'placeholder': placeholder(muestra),
+    }
+
+
+def color_dominante(img):
+    """Color más frecuente tras reducir la paleta a 5 colores, como #rrggbb."""
+    paleta = img.quantize(colors=5)
+    _cuenta, indice = max(paleta.getcolors())
+    r, g, b = paleta.getpalette()[indice * 3:indice * 3 + 3]
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+def placeholder(img):
+    mini = img.copy()
+    mini.thumbnail((LADO_PLACEHOLDER, LADO_PLACEHOLDER))
+    buffer = io.BytesIO()
+    mini.save(buffer, 'JPEG', quality=CALIDAD_PLACEHOLDER, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
@@ -0,0 +1,44 @@
+"""
+manage.py exportar_contenido
+Exporta servicios y novedades (con sus imágenes) a un JSONL o a un tar
+con el JSONL y la media (ver administrador/contenido.py).
+
+  python manage.py exportar_contenido contenido.tar.gz
+  python manage.py exportar_contenido servicios.jsonl --solo servicio   # sin imágenes
+  python manage.py exportar_contenido contenido.tar --sin-imagenes
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from administrador import contenido
+
+
+class Command(BaseCommand):
+    help = 'Exporta servicios y novedades (JSONL + imágenes) para importar_contenido.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('destino', help='Archivo .jsonl, .tar o .tar.gz a crear.')
+        parser.add_argument('--solo', action='append', choices=list(contenido.MODELOS),
+                            help='Exporta solo ese tipo (repetible).')
+        parser.add_argument('--sin-imagenes', action='store_true',
+                            help='No incluye los archivos de imagen en el tar.')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Filas por lectura de la BD.')
+
+    def handle(self, *args, **opts):
+        self.verbosity = opts['verbosity']
+        inicio = time.monotonic()
+        totales, copiadas, faltantes = contenido.exportar(
+            opts['destino'], modelos=opts['solo'] or tuple(contenido.MODELOS),
+            imagenes=not opts['sin_imagenes'], progreso=self._progreso, lote=opts['lote'])
+        for ruta in faltantes:
+            self.stderr.write(f'  imagen faltante en el storage: {ruta}')
+        resumen = ', '.join(f'{n} {tipo}(s)' for tipo, n in totales.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'{resumen}, {copiadas} imagen(es) en {time.monotonic() - inicio:.1f}s '
+            f'→ {opts["destino"]}'))
+
+    def _progreso(self, tipo, n):
+        if self.verbosity > 0:
+            self.stdout.write(f'  {tipo}: {n} fila(s)…')
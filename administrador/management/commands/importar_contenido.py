@@ -0,0 +1,59 @@
+"""
+manage.py importar_contenido
+Importa lo que generó exportar_contenido (ver administrador/contenido.py):
+upsert por clave natural en lotes de bulk_create, y después
+las imágenes que no existan ya en el storage.
+
+  python manage.py importar_contenido contenido.tar.gz
+  python manage.py importar_contenido contenido.tar.gz --sobrescribir-imagenes
+  python manage.py importar_contenido servicios.jsonl --lote 5000
+
+Correrlo dos veces con el mismo archivo no duplica nada: la segunda vez
+solo actualiza. Cada lote se confirma por separado, así que si falla a
+mitad (línea inválida, tar mal armado) lo importado hasta ahí queda:
+corregir el archivo y volver a correrlo.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from administrador import contenido
+
+
+class Command(BaseCommand):
+    help = ('Importa servicios y novedades (JSONL o tar de exportar_contenido). '
+            'Cada lote se confirma por separado: si falla, la importación queda '
+            'parcial y se puede repetir con el archivo corregido.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('origen', help='Archivo .jsonl, .tar o .tar.gz.')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Filas por lote (una transacción cada uno).')
+        parser.add_argument('--sin-imagenes', action='store_true',
+                            help='Importa solo las filas, sin copiar archivos.')
+        parser.add_argument('--sobrescribir-imagenes', action='store_true',
+                            help='Reemplaza los archivos que ya existan en el storage.')
+
+    def handle(self, *args, **opts):
+        self.verbosity = opts['verbosity']
+        self.inicio = time.monotonic()
+        try:
+            importacion = contenido.importar(
+                opts['origen'], lote=opts['lote'], imagenes=not opts['sin_imagenes'],
+                sobrescribir=opts['sobrescribir_imagenes'], progreso=self._progreso)
+        except (contenido.ContenidoInvalido, OSError) as error:
+            raise CommandError(f'{error} (importación parcial: los lotes anteriores '
+                               'quedaron guardados)')
+        duracion = time.monotonic() - self.inicio
+        resumen = ', '.join(f'{tipo}: {importacion.creados[tipo]} nueva(s) y '
+                            f'{importacion.actualizados[tipo]} actualizada(s)'
+                            for tipo in contenido.MODELOS)
+        archivos = importacion.archivos
+        self.stdout.write(self.style.SUCCESS(
+            f'{resumen}; {archivos["copiados"]} imagen(es) copiada(s), '
+            f'{archivos["existentes"]} ya existía(n); {duracion:.1f}s'))
+
+    def _progreso(self, tipo, n):
+        if self.verbosity > 0:
+            duracion = time.monotonic() - self.inicio
+            self.stdout.write(f'  {tipo}: {n} fila(s) ({n / duracion if duracion else 0:.0f}/s)')
@@ -0,0 +1,130 @@
+"""
+manage.py media_gc
+Reconcilia MEDIA_ROOT contra la BD: encuentra archivos que ninguna fila
+referencia (ver administrador/media.py) y, con --delete, los borra.
+
+  python manage.py media_gc                        # dry-run: solo informa
+  python manage.py media_gc --delete               # borra los huérfanos
+  python manage.py media_gc --delete --max-batches 50   # corta y sigue mañana
+  python manage.py media_gc --reset                # empieza de cero
+
+Recorre el disco en orden lexicográfico y consulta la BD por lotes de
+--batch-size rutas (una consulta IN por campo de archivo), así la memoria
+no depende de cuántos archivos haya. Después de cada lote guarda la
+última ruta en --state; si se interrumpe, la siguiente corrida sigue
+desde ahí. Al terminar el recorrido completo el estado se borra.
+
+Solo toca archivos más viejos que --min-age segundos: un archivo recién
+subido todavía puede estar esperando el commit de su fila.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from administrador import media
+
+
+def recorrer(raiz, desde=None):
+    """
+    Rutas relativas de todos los archivos bajo `raiz`, en orden por
+    componentes. Con `desde` (tupla de componentes) salta todo lo que ya
+    se procesó, sin listar los subdirectorios ya terminados.
+    """
+    def _walk(directorio, partes):
+        try:
+            entradas = sorted(os.scandir(directorio), key=lambda e: e.name)
+        except FileNotFoundError:
+            return
+        for entrada in entradas:
+            if entrada.name.startswith('.'):
+                continue
+            ruta = partes + (entrada.name,)
+            if desde and ruta < desde[:len(ruta)]:
+                continue
+            if entrada.is_dir(follow_symlinks=False):
+                yield from _walk(entrada.path, ruta)
+            elif not desde or ruta > desde:
+                yield ruta, entrada
+
+    yield from _walk(raiz, ())
+
+
+class Command(BaseCommand):
+    help = 'Encuentra (y con --delete borra) archivos de MEDIA_ROOT sin referencias en la BD.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true', help='Borra los huérfanos.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, default=0,
+                            help='Corta después de N lotes (0 = sin límite).')
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Ignora archivos modificados hace menos de N segundos.')
+        parser.add_argument('--state', default=str(Path(settings.BASE_DIR) / '.media_gc.json'),
+                            help='Archivo donde se guarda el progreso.')
+        parser.add_argument('--reset', action='store_true', help='Ignora el progreso guardado.')
+
+    def handle(self, *args, **opts):
+        self.verbosity = opts['verbosity']
+        raiz = getattr(default_storage, 'location', None)
+        if raiz is None:
+            raise CommandError('media_gc necesita un storage en disco (FileSystemStorage).')
+        estado = Path(opts['state'])
+        desde = None
+        if estado.exists() and not opts['reset']:
+            desde = tuple(json.loads(estado.read_text())['ultima'])
+            self.stdout.write(f'Reanudando después de {"/".join(desde)}')
+
+        limite_mtime = time.time() - opts['min_age']
+        totales = {'revisados': 0, 'huerfanos': 0, 'borrados': 0, 'bytes': 0}
+        lote, lotes = [], 0
+        completo = True
+        for partes, entrada in recorrer(raiz, desde):
+            lote.append((partes, entrada))
+            if len(lote) >= opts['batch_size']:
+                self._procesar(lote, limite_mtime, opts['delete'], totales)
+                self._guardar(estado, lote[-1][0])
+                lote, lotes = [], lotes + 1
+                if opts['max_batches'] and lotes >= opts['max_batches']:
+                    completo = False
+                    break
+        if lote:
+            self._procesar(lote, limite_mtime, opts['delete'], totales)
+        if completo:
+            estado.unlink(missing_ok=True)
+
+        accion = 'borrados' if opts['delete'] else 'a borrar (dry-run)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{totales["revisados"]} archivo(s) revisados, {totales["huerfanos"]} huérfano(s) '
+            f'{accion}, {totales["bytes"] / 1024 / 1024:.1f} MB'
+            + ('' if completo else ' — incompleto, correr de nuevo para seguir')))
+
+    def _procesar(self, lote, limite_mtime, borrar, totales):
+        nombres = {'/'.join(partes): entrada for partes, entrada in lote}
+        # Una rendition está viva si su original lo está
+        originales = {nombre: media.original_de(nombre) for nombre in nombres}
+        vivos = media.referenciados(set(originales.values()))
+        totales['revisados'] += len(nombres)
+        for nombre, entrada in nombres.items():
+            if originales[nombre] in vivos:
+                continue
+            info = entrada.stat(follow_symlinks=False)
+            if info.st_mtime > limite_mtime:
+                continue
+            totales['huerfanos'] += 1
+            totales['bytes'] += info.st_size
+            if borrar:
+                default_storage.delete(nombre)
+                totales['borrados'] += 1
+            elif self.verbosity > 1:
+                self.stdout.write(f'  huérfano: {nombre}')
+
+    @staticmethod
+    def _guardar(estado, partes):
+        tmp = estado.with_name(estado.name + '.tmp')
+        tmp.write_text(json.dumps({'ultima': list(partes)}))
+        os.replace(tmp, estado)
@@ -0,0 +1,31 @@
+"""
+manage.py recalcular_estadisticas
+Reconstruye los rollups de mensajes de contacto del dashboard
+(administrador/estadisticas.py) desde ContactMessage.
+
+  python manage.py recalcular_estadisticas                      # todo
+  python manage.py recalcular_estadisticas --desde 2026-01-01   # solo desde esa fecha
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from administrador import estadisticas
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los rollups diarios de mensajes de contacto (volumen y respuesta).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Fecha local AAAA-MM-DD desde la que recalcular.')
+
+    def handle(self, *args, **opts):
+        desde = None
+        if opts['desde']:
+            try:
+                desde = date.fromisoformat(opts['desde'])
+            except ValueError:
+                raise CommandError('--desde debe tener el formato AAAA-MM-DD')
+        por_estado, respuestas = estadisticas.recalcular(desde)
+        self.stdout.write(self.style.SUCCESS(
+            f'{por_estado} fila(s) por día y estado, {respuestas} día(s) con respuestas'))
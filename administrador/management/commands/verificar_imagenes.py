@@ -0,0 +1,29 @@
+"""
+manage.py verificar_imagenes
+Verifica las imágenes que quedaron en "pending" (p.ej. si el proceso se
+reinició antes de que el hilo de fondo terminara). Ver
+administrador/verificacion.py.
+
+  python manage.py verificar_imagenes
+"""
+from django.core.management.base import BaseCommand
+
+from administrador import verificacion
+from administrador.models import BlogPost, Service
+
+
+class Command(BaseCommand):
+    help = 'Decodifica y verifica las imágenes pendientes de Service y BlogPost.'
+
+    def handle(self, *args, **opts):
+        resultados = {}
+        for modelo in (Service, BlogPost):
+            pendientes = modelo.objects.filter(
+                image_status=modelo.IMAGEN_PENDIENTE).values_list('pk', 'image')
+            for pk, nombre in pendientes.iterator():
+                estado = verificacion.verificar(modelo, pk, nombre)
+                resultados[estado] = resultados.get(estado, 0) + 1
+                self.stdout.write(f'  {modelo.__name__} #{pk}: {estado}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultados.get("ok", 0)} verificada(s), '
+            f'{resultados.get("rejected", 0)} rechazada(s)'))
@@ -0,0 +1,92 @@
+"""
+administrador/media.py
+
+Ciclo de vida de los archivos en MEDIA_ROOT.
+
+  - Al borrar un Service/BlogPost o reemplazar su imagen, el archivo
+    viejo (y sus renditions) se borra DESPUÉS del commit: si la
+    transacción hace rollback, el archivo sigue ahí y la fila también.
+  - Antes de borrar se verifica que ninguna otra fila lo referencie
+    (p.ej. dos servicios importados con la misma imagen).
+  - Renditions: variantes derivadas de un original (miniaturas, webp…)
+    viven en <RENDITIONS_DIR>/<ruta del original>/ y se van con él.
+
+Lo que se escape (rollback después de subir un archivo, borrados
+masivos con .update(), archivos copiados a mano) lo limpia el comando
+`media_gc`, que recorre el disco por lotes y es reanudable.
+"""
+import logging
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'renditions'
+
+
+def campos_de_archivo():
+    """[(modelo, nombre del campo)] de todos los FileField/ImageField instalados."""
+    return [(modelo, campo.name)
+            for modelo in apps.get_models()
+            for campo in modelo._meta.concrete_fields
+            if isinstance(campo, models.FileField)]
+
+
+def original_de(nombre):
+    """Para una rendition devuelve la ruta del original; si no, el mismo nombre."""
+    prefijo = RENDITIONS_DIR + '/'
+    if not nombre.startswith(prefijo):
+        return nombre
+    resto = nombre[len(prefijo):]
+    return resto.rsplit('/', 1)[0] if '/' in resto else resto
+
+
+def referenciados(nombres):
+    """Subconjunto de `nombres` que alguna fila de la BD referencia."""
+    nombres = list(nombres)
+    vivos = set()
+    if not nombres:
+        return vivos
+    for modelo, campo in campos_de_archivo():
+        vivos.update(modelo._default_manager.filter(
+            **{f'{campo}__in': nombres}).values_list(campo, flat=True))
+    return vivos
+
+
+def renditions(nombre, storage=default_storage):
+    """Archivos bajo <RENDITIONS_DIR>/<nombre>/ (vacío si no hay)."""
+    carpeta = f'{RENDITIONS_DIR}/{nombre}'
+    try:
+        _dirs, archivos = storage.listdir(carpeta)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    return [f'{carpeta}/{a}' for a in archivos]
+
+
+def borrar_si_huerfanos(nombres, storage=default_storage):
+    """Borra cada archivo (y sus renditions) que ya nadie referencie."""
+    nombres = [n for n in dict.fromkeys(nombres) if n]
+    vivos = referenciados(nombres)
+    borrados = []
+    for nombre in nombres:
+        if nombre in vivos:
+            continue
+        for archivo in [*renditions(nombre, storage), nombre]:
+            try:
+                storage.delete(archivo)
+            except OSError:
+                logger.exception('No se pudo borrar %s', archivo)
+                continue
+            borrados.append(archivo)
+    if borrados:
+        logger.info('Media: %d archivo(s) borrados', len(borrados))
+    return borrados
+
+
+def programar_borrado(nombres, using=None):
+    """Encola el borrado para cuando la transacción actual haga commit."""
+    nombres = [n for n in nombres if n]
+    if nombres:
+        transaction.on_commit(lambda: borrar_si_huerfanos(nombres), using=using, robust=True)
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:22
+
+from django.db import migrations, models
+
+
+def calcular_existentes(apps, schema_editor):
+    """Metadata de las imágenes ya subidas; las que faltan en disco se saltan."""
+    from administrador import imagenes
+
+    for nombre in ('Service', 'BlogPost'):
+        Modelo = apps.get_model('administrador', nombre)
+        for obj in Modelo.objects.exclude(image='').exclude(image__isnull=True):
+            try:
+                with obj.image.open('rb') as f:
+                    datos = imagenes.analizar(f)
+            except OSError:
+                continue
+            if datos:
+                Modelo.objects.filter(pk=obj.pk).update(
+                    image_width=datos['width'], image_height=datos['height'],
+                    image_color=datos['color'], image_placeholder=datos['placeholder'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administrador', '0004_blogpost_contactmessage_service_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(calcular_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administrador', '0005_imagen_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='image_status',
+            field=models.CharField(choices=[('ok', 'Verificada'), ('pending', 'En verificación'), ('rejected', 'Rechazada')], default='ok', editable=False, max_length=10, verbose_name='Estado de la imagen'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='image_status',
+            field=models.CharField(choices=[('ok', 'Verificada'), ('pending', 'En verificación'), ('rejected', 'Rechazada')], default='ok', editable=False, max_length=10, verbose_name='Estado de la imagen'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administrador', '0006_image_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('sent_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Enviado')),
+                ('batch', models.CharField(blank=True, editable=False, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('message', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='aviso', to='administrador.contactmessage', verbose_name='Mensaje')),
+            ],
+            options={
+                'verbose_name': 'Aviso de contacto',
+                'verbose_name_plural': 'Avisos de contacto',
+            },
+        ),
+    ]
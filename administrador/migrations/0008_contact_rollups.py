@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:46
+
+import zoneinfo
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def cargar_rollups(apps, schema_editor):
+    """Carga inicial de ContactStatusDaily (ver administrador/estadisticas.py)."""
+    ContactMessage = apps.get_model('administrador', 'ContactMessage')
+    ContactStatusDaily = apps.get_model('administrador', 'ContactStatusDaily')
+    tz = zoneinfo.ZoneInfo(settings.TIME_ZONE)
+    filas = (ContactMessage.objects.order_by()
+             .annotate(dia=TruncDate('created_at', tzinfo=tz))
+             .values('dia', 'status').annotate(n=Count('pk')))
+    ContactStatusDaily.objects.bulk_create(
+        [ContactStatusDaily(day=f['dia'], status=f['status'], messages=f['n']) for f in filas],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administrador', '0007_contactnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactResponseDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='Día')),
+                ('replies', models.IntegerField(default=0, verbose_name='Respuestas')),
+                ('response_seconds', models.FloatField(default=0, verbose_name='Segundos de respuesta (suma)')),
+            ],
+            options={
+                'verbose_name': 'Respuestas por día',
+                'verbose_name_plural': 'Respuestas por día',
+            },
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='replied_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Primera vez que el mensaje pasó a Respondido', null=True, verbose_name='Fecha de respuesta'),
+        ),
+        migrations.CreateModel(
+            name='ContactStatusDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Día')),
+                ('status', models.CharField(choices=[('new', 'Nuevo'), ('read', 'Leído'), ('replied', 'Respondido')], max_length=20, verbose_name='Estado')),
+                ('messages', models.IntegerField(default=0, verbose_name='Mensajes')),
+            ],
+            options={
+                'verbose_name': 'Mensajes por día y estado',
+                'verbose_name_plural': 'Mensajes por día y estado',
+                'constraints': [models.UniqueConstraint(fields=('day', 'status'), name='contacto_dia_estado_unico')],
+            },
+        ),
+        migrations.RunPython(cargar_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administrador', '0008_contact_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('servicio', 'Servicio'), ('novedad', 'Novedad')], max_length=10, verbose_name='Tipo')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID')),
+                ('views', models.PositiveBigIntegerField(default=0, verbose_name='Visitas')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última visita')),
+            ],
+            options={
+                'verbose_name': 'Contador de visitas',
+                'verbose_name_plural': 'Contadores de visitas',
+                'indexes': [models.Index(fields=['kind', '-views'], name='visitas_ranking_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='visitas_tipo_objeto_unico')],
+            },
+        ),
+    ]
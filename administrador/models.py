@@ -1,8 +1,94 @@
 from django.db import models
 from django.utils import timezone
 
+from . import imagenes
 
-class Service(models.Model):
+
+class ImagenMetadata(models.Model):
+    """
+    Ancho, alto, color dominante y placeholder de `image`, calculados con
+    Pillow al guardar una imagen nueva (ver administrador/imagenes.py).
+    Los templates los usan sin abrir el archivo en cada request.
+    """
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
+
+    # Imágenes subidas por el panel quedan "pending" hasta que
+    # administrador/verificacion.py las decodifica completas fuera del request.
+    IMAGEN_OK, IMAGEN_PENDIENTE, IMAGEN_RECHAZADA = 'ok', 'pending', 'rejected'
+    ESTADOS_IMAGEN = [
+        (IMAGEN_OK, 'Verificada'),
+        (IMAGEN_PENDIENTE, 'En verificación'),
+        (IMAGEN_RECHAZADA, 'Rechazada'),
+    ]
+    image_status = models.CharField(
+        max_length=10, choices=ESTADOS_IMAGEN, default=IMAGEN_OK,
+        editable=False, verbose_name="Estado de la imagen")
+
+    CAMPOS_METADATA = ['image_width', 'image_height', 'image_color', 'image_placeholder']
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        # Nombre del archivo tal como está en la BD: al guardar un reemplazo,
+        # administrador/signals.py programa el borrado del viejo.
+        original = obj.__dict__.get('image')
+        obj._imagen_original = getattr(original, 'name', original) or ''
+        return obj
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'image' in update_fields:
+            if self.actualizar_metadata_imagen() and update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.CAMPOS_METADATA}
+        super().save(*args, **kwargs)
+
+    def actualizar_metadata_imagen(self, forzar=False):
+        """
+        Recalcula la metadata si la imagen es nueva (aún no guardada en el
+        storage), si se quitó, o con forzar=True. Las imágenes "pending" se
+        saltan: las calcula la verificación en segundo plano.
+        Devuelve True si cambió algo.
+        """
+        if not self.image:
+            if not any(getattr(self, c) for c in self.CAMPOS_METADATA):
+                return False
+            self.image_width = self.image_height = None
+            self.image_color = self.image_placeholder = ''
+            return True
+        if (self.image._committed or self.image_status == self.IMAGEN_PENDIENTE) and not forzar:
+            return False
+        if self.image._committed:
+            with self.image.open('rb') as f:
+                datos = imagenes.analizar(f)
+        else:
+            datos = imagenes.analizar(self.image.file)
+        if datos is None:
+            return False
+        self.image_width, self.image_height = datos['width'], datos['height']
+        self.image_color, self.image_placeholder = datos['color'], datos['placeholder']
+        return True
+
+    @property
+    def imagen_visible(self):
+        """True si hay imagen y ya pasó la verificación (lo que usa el sitio público)."""
+        return bool(self.image) and self.image_status == self.IMAGEN_OK
+
+    @property
+    def image_placeholder_style(self):
+        """Fondo del <img> mientras descarga la imagen real."""
+        if not self.image_color:
+            return ''
+        return (f'background:{self.image_color} url({self.image_placeholder}) '
+                'center/cover no-repeat;')
+
+
+class Service(ImagenMetadata):
     """
     Modelo para gestionar los servicios ofrecidos por el centro de Pilates.
     Estos servicios se muestran dinámicamente en la landing page.
@@ -55,7 +141,7 @@ class Service(models.Model):
         return self.name
 
 
-class BlogPost(models.Model):
+class BlogPost(ImagenMetadata):
     """
     Modelo para gestionar publicaciones de blog/novedades.
     Se muestran en la sección de novedades de la landing page.
@@ -151,6 +237,11 @@ class ContactMessage(models.Model):
         auto_now_add=True,
         verbose_name="Fecha de recepción"
     )
+    replied_at = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        verbose_name="Fecha de respuesta",
+        help_text="Primera vez que el mensaje pasó a Respondido"
+    )
 
     class Meta:
         verbose_name = "Mensaje de contacto"
@@ -159,3 +250,128 @@ class ContactMessage(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.email} ({self.get_status_display()})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        # Estado tal como está en la BD: los rollups (administrador/estadisticas.py)
+        # mueven el mensaje de un estado a otro al guardar.
+        obj._status_original = obj.__dict__.get('status')
+        return obj
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None or 'status' in fields:
+            self._status_original = self.status
+
+    def save(self, *args, **kwargs):
+        self._respondido_ahora = self.status == 'replied' and self.replied_at is None
+        if self._respondido_ahora:
+            self.replied_at = timezone.now()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'replied_at'}
+        super().save(*args, **kwargs)
+
+
+class ContactNotification(models.Model):
+    """
+    Outbox de avisos por email a los administradores: una fila por cada
+    ContactMessage nuevo, en la misma transacción que el mensaje. El
+    envío (administrador/avisos.py) las junta en resúmenes y las marca
+    con sent_at.
+    """
+    message = models.OneToOneField(
+        ContactMessage, on_delete=models.CASCADE, related_name='aviso',
+        verbose_name="Mensaje")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creado")
+    sent_at = models.DateTimeField(null=True, blank=True, db_index=True,
+                                   verbose_name="Enviado")
+    # Lote que lo está enviando (evita que dos workers manden el mismo aviso)
+    batch = models.CharField(max_length=32, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        verbose_name = "Aviso de contacto"
+        verbose_name_plural = "Avisos de contacto"
+
+    def __str__(self):
+        return f"Aviso de {self.message_id} ({'enviado' if self.sent_at else 'pendiente'})"
+
+
+class ContactStatusDaily(models.Model):
+    """
+    Rollup: mensajes recibidos el día `day` (hora local) que hoy están en
+    `status`. Se mantiene al crear, cambiar de estado o borrar mensajes
+    (administrador/estadisticas.py); `manage.py recalcular_estadisticas`
+    lo reconstruye desde ContactMessage.
+
+    Ojo: el mantenimiento va por señales. bulk_create(), QuerySet.update()
+    y los INSERT/UPDATE en SQL crudo sobre ContactMessage no las disparan
+    (QuerySet.delete() sí), así que después de escribir mensajes por esas
+    vías hay que llamar a estadisticas.recalcular(desde=<día>), como hace
+    `manage.py benchmark`.
+    """
+    day = models.DateField(verbose_name="Día")
+    status = models.CharField(max_length=20, choices=ContactMessage.STATUS_CHOICES,
+                              verbose_name="Estado")
+    messages = models.IntegerField(default=0, verbose_name="Mensajes")
+
+    class Meta:
+        verbose_name = "Mensajes por día y estado"
+        verbose_name_plural = "Mensajes por día y estado"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status'], name='contacto_dia_estado_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.messages}"
+
+
+class ContactResponseDaily(models.Model):
+    """
+    Rollup: primeras respuestas dadas el día `day` y la suma de sus
+    tiempos de respuesta (replied_at - created_at), para el promedio.
+    Se mantiene igual que ContactStatusDaily (mismas salvedades con
+    bulk_create y update).
+    """
+    day = models.DateField(unique=True, verbose_name="Día")
+    replies = models.IntegerField(default=0, verbose_name="Respuestas")
+    response_seconds = models.FloatField(default=0, verbose_name="Segundos de respuesta (suma)")
+
+    class Meta:
+        verbose_name = "Respuestas por día"
+        verbose_name_plural = "Respuestas por día"
+
+    def __str__(self):
+        return f"{self.day}: {self.replies}"
+
+
+class ViewCounter(models.Model):
+    """
+    Visitas acumuladas de una página pública (servicio o novedad). Se
+    escriben en lotes desde index/visitas.py, con UPDATE aditivo: varios
+    procesos pueden sumar sobre la misma fila sin pisarse.
+    """
+    SERVICIO = 'servicio'
+    NOVEDAD = 'novedad'
+    KIND_CHOICES = [
+        (SERVICIO, 'Servicio'),
+        (NOVEDAD, 'Novedad'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Tipo")
+    object_id = models.PositiveIntegerField(verbose_name="ID")
+    views = models.PositiveBigIntegerField(default=0, verbose_name="Visitas")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última visita")
+
+    class Meta:
+        verbose_name = "Contador de visitas"
+        verbose_name_plural = "Contadores de visitas"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='visitas_tipo_objeto_unico'),
+        ]
+        indexes = [models.Index(fields=['kind', '-views'], name='visitas_ranking_idx')]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.views}"
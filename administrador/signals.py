@@ -0,0 +1,61 @@
+"""
+administrador/signals.py
+Borra del disco las imágenes reemplazadas o de filas eliminadas, después
+del commit (ver administrador/media.py).
+
+También define `estado_alternado`, que envían los toggles del panel
+(administrador/views.py). Esos toggles usan un UPDATE directo, que no
+dispara post_save; quien cachee páginas públicas (index/signals.py) se
+suscribe a esta señal. Argumentos: instance (ya con el estado nuevo) y
+campo (nombre del booleano alternado).
+
+`lote_actualizado` es lo mismo para las acciones en lote del panel
+(reordenar, activar/desactivar varios) y la importación de contenido
+(administrador/contenido.py), que usan bulk_create/bulk_update/update:
+se envía una sola vez por lote, con pks (los que cambiaron) y campos.
+
+Cada ContactMessage nuevo deja su aviso en el outbox de emails a los
+administradores (administrador/avisos.py). Altas, cambios de estado y
+bajas de mensajes actualizan los rollups del dashboard
+(administrador/estadisticas.py).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import avisos, estadisticas, media
+from .models import BlogPost, ContactMessage, Service
+
+estado_alternado = Signal()
+lote_actualizado = Signal()
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=BlogPost)
+def imagen_reemplazada(sender, instance, using, **kwargs):
+    anterior = getattr(instance, '_imagen_original', '')
+    actual = instance.image.name or ''
+    if anterior and anterior != actual:
+        media.programar_borrado([anterior], using=using)
+    instance._imagen_original = actual
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=BlogPost)
+def fila_eliminada(sender, instance, using, **kwargs):
+    media.programar_borrado([instance.image.name], using=using)
+
+
+@receiver(post_save, sender=ContactMessage)
+def mensaje_recibido(sender, instance, created, using, **kwargs):
+    if created:
+        avisos.registrar(instance, using=using)
+
+
+@receiver(post_save, sender=ContactMessage)
+def mensaje_guardado(sender, instance, created, using, **kwargs):
+    estadisticas.mensaje_guardado(instance, created, using=using)
+
+
+@receiver(post_delete, sender=ContactMessage)
+def mensaje_eliminado(sender, instance, using, **kwargs):
+    estadisticas.mensaje_eliminado(instance, using=using)
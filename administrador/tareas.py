@@ -0,0 +1,26 @@
+"""
+administrador/tareas.py
+Tareas en segundo plano del panel (ver tareas/cola.py).
+"""
+from django.apps import apps
+
+from tareas.cola import tarea
+from . import avisos, verificacion
+
+
+@tarea(cola='imagenes')
+def verificar_imagen(modelo, pk, nombre):
+    """UPLOADS['VERIFY_MODE'] = "queue": verificación de una imagen subida."""
+    return verificacion.verificar(apps.get_model(modelo), pk, nombre)
+
+
+@tarea(cola='emails', cada=15 * 60)
+def enviar_avisos_contacto():
+    """Aviso/resumen de mensajes de contacto nuevos (administrador/avisos.py)."""
+    return avisos.enviar_pendientes()
+
+
+@tarea(cola='emails', cada=24 * 60 * 60, reintentos=0)
+def purgar_avisos_enviados():
+    """Retención del outbox de avisos (AVISOS_CONTACTO['RETENTION_DAYS'])."""
+    return avisos.purgar_enviados()
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from administrador import avisos
+from administrador.models import ContactMessage, ContactNotification
+from tareas import cola
+from tareas.models import Task
+
+User = get_user_model()
+
+@override_settings(AVISOS_CONTACTO={'WINDOW': 600}, SITE_URL='https://pilates.test',
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AvisosContactoTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='a1', password='x', rol='administrador',
+                                 email='a1@pilates.test')
+        User.objects.create_user(username='a2', password='x', rol='administrador',
+                                 email='a2@pilates.test')
+        User.objects.create_user(username='sin_mail', password='x', rol='administrador')
+
+    def _contactar(self, nombre):
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(reverse('index:contacto_publico'), {
+                'nombre': nombre, 'email': f'{nombre.lower()}@cliente.cl',
+                'telefono': '', 'mensaje': f'Hola, soy {nombre} y quiero info',
+            })
+        self.assertEqual(r.status_code, 302)
+
+    def _procesar(self):
+        return cola.trabajar(['emails'], una_vez=True, periodicas=False)
+
+    def test_primer_mensaje_inmediato_y_el_resto_en_resumen(self):
+        self._contactar('Ana')
+        self.assertEqual(len(mail.outbox), 0)          # nada dentro del request
+        self.assertEqual(self._procesar(), {'done': 1})
+        self.assertEqual([m.to for m in mail.outbox], [['a1@pilates.test'], ['a2@pilates.test']])
+        correo = mail.outbox[0]
+        self.assertEqual(correo.subject, '[PilatesReserva] Nuevo mensaje de contacto: Ana')
+        self.assertEqual(correo.reply_to, ['ana@cliente.cl'])
+        mensaje = ContactMessage.objects.get()
+        self.assertIn(f'https://pilates.test/administrador/mensajes/{mensaje.pk}/', correo.body)
+
+        # Dentro de la ventana: se juntan en un solo envío programado
+        mail.outbox.clear()
+        self._contactar('Beto')
+        self._contactar('Carla')
+        programada = Task.objects.get(status='pending', queue='emails')
+        self.assertGreater(programada.run_at, timezone.now() + timedelta(seconds=500))
+        self.assertEqual(self._procesar(), {})
+        self.assertEqual(ContactNotification.objects.filter(sent_at__isnull=True).count(), 2)
+
+        # Cumplida la ventana sale el resumen, uno por destinatario
+        ContactNotification.objects.update(sent_at=timezone.now() - timedelta(seconds=601))
+        ContactNotification.objects.filter(message__name__in=['Beto', 'Carla']).update(sent_at=None)
+        Task.objects.filter(pk=programada.pk).update(run_at=timezone.now())
+        self.assertEqual(self._procesar(), {'done': 1})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].subject, '[PilatesReserva] 2 mensajes de contacto nuevos')
+        self.assertIn('Beto <beto@cliente.cl>', mail.outbox[0].body)
+        self.assertIn('Carla <carla@cliente.cl>', mail.outbox[0].body)
+        self.assertFalse(ContactNotification.objects.filter(sent_at__isnull=True).exists())
+
+    def test_una_sola_conexion_por_lote(self):
+        for nombre in ('Ana', 'Beto'):
+            ContactMessage.objects.create(name=nombre, email='x@x.cl', message='.')
+        conexiones = []
+        real = avisos.get_connection
+
+        def contar(**kwargs):
+            conexiones.append(kwargs)
+            return real(**kwargs)
+
+        with mock.patch('administrador.avisos.get_connection', contar):
+            self.assertEqual(avisos.enviar_pendientes(), 2)
+        self.assertEqual(len(conexiones), 1)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_fallo_smtp_libera_el_lote_y_reintenta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ContactMessage.objects.create(name='Ana', email='a@x.cl', message='.')
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=SMTPException('caído')):
+            self.assertEqual(self._procesar(), {'retry': 1})
+        aviso = ContactNotification.objects.get()
+        self.assertEqual((aviso.sent_at, aviso.batch, aviso.claimed_at), (None, '', None))
+
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(self._procesar(), {'done': 1})
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_mensaje_y_aviso_en_la_misma_transaccion(self):
+        with mock.patch('administrador.avisos.registrar',
+                        side_effect=DatabaseError('outbox caído')), \
+                self.assertRaises(DatabaseError):
+            self._contactar('Ana')
+        self.assertFalse(ContactMessage.objects.exists())
+
+    def test_consultas_del_envio_usan_indices(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(avisos._ultimo_envio())
+        sql, params = (ContactNotification.objects.filter(sent_at__isnull=False)
+                       .order_by('-sent_at').values('sent_at')[:1].query.sql_with_params())
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(fila[-1] for fila in cursor.fetchall())
+        self.assertIn('USING COVERING INDEX', plan)
+        self.assertNotIn('SCAN', plan)
+
+    @override_settings(AVISOS_CONTACTO={'RETENTION_DAYS': 30})
+    def test_purga_los_enviados_viejos(self):
+        for nombre, dias in (('Vieja', 31), ('Reciente', 2), ('Pendiente', None)):
+            mensaje = ContactMessage.objects.create(name=nombre, email='x@x.cl', message='.')
+            enviado = None if dias is None else timezone.now() - timedelta(days=dias)
+            ContactNotification.objects.filter(message=mensaje).update(sent_at=enviado)
+        self.assertEqual(avisos.purgar_enviados(), 1)
+        self.assertEqual(sorted(ContactNotification.objects.values_list('message__name', flat=True)),
+                         ['Pendiente', 'Reciente'])
+
+    @override_settings(AVISOS_CONTACTO={'ENABLED': False})
+    def test_desactivados(self):
+        self._contactar('Ana')
+        self.assertFalse(ContactNotification.objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(AVISOS_CONTACTO={'RECIPIENTS': ['equipo@pilates.test']},
+                       TAREAS={'MODE': 'sync'})
+    def test_destinatarios_fijos_y_modo_sync(self):
+        self._contactar('Ana')
+        self.assertEqual([m.to for m in mail.outbox], [['equipo@pilates.test']])
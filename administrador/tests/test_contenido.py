@@ -0,0 +1,149 @@
+import io
+import json
+import shutil
+import tarfile
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from administrador import contenido
+from administrador.models import BlogPost, Service
+
+
+class ContenidoTests(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=str(self.tmp / 'media'))
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        s = Service(name='Reformer', description='Máquina', price=25000, order=2,
+                    image_width=10, image_height=5, image_color='#123456')
+        s.image.name = default_storage.save('services/reformer.jpg', ContentFile(b'jpg'))
+        s.save()
+        Service.objects.create(name='Mat', description='.', price=9000, order=1,
+                               image='services/falta.jpg', is_active=False)
+        self.fecha = timezone.now() - timedelta(days=3)
+        for i in range(5):
+            BlogPost.objects.create(title=f'Post {i}', content='texto', is_published=i % 2 == 0,
+                                    published_date=self.fecha + timedelta(hours=i))
+
+    def _exportar(self, nombre='contenido.tar.gz', *args):
+        salida = io.StringIO()
+        destino = str(self.tmp / nombre)
+        call_command('exportar_contenido', destino, *args, stdout=salida, stderr=io.StringIO())
+        return destino, salida.getvalue()
+
+    def _importar(self, origen, *args):
+        salida = io.StringIO()
+        call_command('importar_contenido', origen, *args, stdout=salida)
+        return salida.getvalue()
+
+    def _estado(self):
+        return (sorted(Service.objects.values_list('name', 'price', 'order', 'is_active',
+                                                   'image', 'image_color')),
+                sorted(BlogPost.objects.values_list('title', 'is_published', 'published_date')))
+
+    def test_ida_y_vuelta_con_imagenes(self):
+        destino, salida = self._exportar()
+        self.assertIn('2 servicio(s), 5 novedad(s), 1 imagen(es)', salida)
+        with tarfile.open(destino) as tar:
+            self.assertEqual(tar.getnames(), ['contenido.jsonl', 'media/services/reformer.jpg'])
+
+        antes = self._estado()
+        Service.objects.all().delete()
+        BlogPost.objects.all().delete()
+        default_storage.delete('services/reformer.jpg')   # (el borrado al commit no corre en TestCase)
+
+        salida = self._importar(destino, '--lote', '2')
+        self.assertIn('servicio: 2 nueva(s) y 0 actualizada(s)', salida)
+        self.assertIn('novedad: 5 nueva(s) y 0 actualizada(s)', salida)
+        self.assertIn('1 imagen(es) copiada(s)', salida)
+        self.assertIn('novedad: 4 fila(s)', salida)      # progreso por lote
+        self.assertEqual(self._estado(), antes)
+        with default_storage.open('services/reformer.jpg') as f:
+            self.assertEqual(f.read(), b'jpg')
+
+    def test_reimportar_actualiza_sin_duplicar(self):
+        destino, _ = self._exportar()
+        Service.objects.filter(name='Reformer').update(price=1, order=9)
+        BlogPost.objects.filter(title='Post 0').update(content='otro')
+
+        salida = self._importar(destino)
+        self.assertIn('servicio: 0 nueva(s) y 2 actualizada(s)', salida)
+        self.assertIn('1 ya existía(n)', salida)
+        self.assertEqual(Service.objects.count(), 2)
+        self.assertEqual(BlogPost.objects.count(), 5)
+        reformer = Service.objects.get(name='Reformer')
+        self.assertEqual((reformer.price, reformer.order), (25000, 2))
+        self.assertEqual(BlogPost.objects.get(title='Post 0').content, 'texto')
+
+    def test_lotes_con_bulk_y_una_invalidacion_por_modelo(self):
+        destino, _ = self._exportar('contenido.jsonl')
+        BlogPost.objects.all().delete()
+        with patch('index.catalogo.invalidar') as invalidar_catalogo, \
+                patch('index.seo.invalidar_novedades') as invalidar_novedades, \
+                CaptureQueriesContext(connection) as ctx:
+            importacion = contenido.importar(destino, lote=2)
+        self.assertEqual(importacion.creados, {'servicio': 0, 'novedad': 5})
+        inserts = [q for q in ctx.captured_queries
+                   if q['sql'].startswith('INSERT INTO "administrador_blogpost"')]
+        self.assertEqual(len(inserts), 3)                 # 2 + 2 + 1
+        invalidar_catalogo.assert_called_once()
+        invalidar_novedades.assert_called_once()
+
+    def test_jsonl_solo_un_tipo(self):
+        destino, _ = self._exportar('servicios.jsonl', '--solo', 'servicio')
+        with open(destino, encoding='utf-8') as f:
+            lineas = [json.loads(linea) for linea in f]
+        self.assertEqual(lineas[0], {'formato': 'pilates-contenido', 'version': 1})
+        self.assertEqual({fila['modelo'] for fila in lineas[1:]}, {'servicio'})
+        reformer = next(fila for fila in lineas[1:] if fila['name'] == 'Reformer')
+        self.assertEqual((reformer['price'], reformer['image_width']), ('25000', 10))
+        self.assertNotIn('id', reformer)
+
+    def test_archivo_invalido(self):
+        malo = self.tmp / 'malo.jsonl'
+        malo.write_text('{"formato": "otro"}\n')
+        with self.assertRaisesMessage(CommandError, 'Cabecera inválida'):
+            self._importar(str(malo))
+        malo.write_text('{"formato": "pilates-contenido", "version": 1}\n'
+                        '{"modelo": "servicio", "description": "sin nombre"}\n')
+        with self.assertRaisesMessage(CommandError, 'Línea 2'):
+            self._importar(str(malo))
+
+    def test_falla_a_mitad_deja_lo_guardado_e_invalida(self):
+        destino, _ = self._exportar('contenido.jsonl')
+        BlogPost.objects.all().delete()
+        with open(destino, 'a', encoding='utf-8') as f:
+            f.write('{"modelo": "novedad", "content": "sin título"}\n')
+        with patch('index.seo.invalidar_novedades') as invalidar_novedades, \
+                self.assertRaisesMessage(CommandError, 'importación parcial'):
+            self._importar(destino, '--lote', '2')
+        # Los lotes completos (2 + 2) quedaron y se avisó por ellos
+        self.assertEqual(BlogPost.objects.count(), 4)
+        invalidar_novedades.assert_called_once()
+
+    def test_ignora_rutas_fuera_de_media(self):
+        destino = self.tmp / 'trampa.tar'
+        with tarfile.open(destino, 'w') as tar:
+            for nombre, datos in [('contenido.jsonl', b'{"formato": "pilates-contenido", '
+                                                      b'"version": 1}\n'),
+                                  ('media/../../fuera.txt', b'x'), ('media/blog/ok.jpg', b'y')]:
+                info = tarfile.TarInfo(nombre)
+                info.size = len(datos)
+                tar.addfile(info, io.BytesIO(datos))
+        self._importar(str(destino))
+        self.assertFalse((self.tmp / 'fuera.txt').exists())
+        self.assertTrue(default_storage.exists('blog/ok.jpg'))
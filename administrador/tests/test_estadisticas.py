@@ -0,0 +1,105 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from administrador import estadisticas
+from administrador.models import ContactMessage, ContactResponseDaily, ContactStatusDaily
+
+User = get_user_model()
+
+
+def _rollups():
+    return (sorted(ContactStatusDaily.objects.exclude(messages=0)
+                   .values_list('day', 'status', 'messages')),
+            sorted((d, n, round(s)) for d, n, s in ContactResponseDaily.objects.exclude(replies=0)
+                   .values_list('day', 'replies', 'response_seconds')))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RollupsContactoTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+        self.client.login(username='admin1', password='x')
+
+    def _mensaje(self, nombre, hace_dias=0):
+        m = ContactMessage.objects.create(name=nombre, email='a@x.cl', message='.')
+        if hace_dias:
+            # Mueve el mensaje (y su rollup) a otro día, como si hubiera llegado antes
+            ContactMessage.objects.filter(pk=m.pk).update(
+                created_at=m.created_at - timedelta(days=hace_dias))
+            estadisticas.recalcular()
+            m.refresh_from_db()
+        return m
+
+    def test_incremental_coincide_con_recalcular(self):
+        hoy = timezone.localdate()
+        viejo = self._mensaje('Viejo', hace_dias=3)
+        a, b = self._mensaje('A'), self._mensaje('B')
+        self.assertEqual(estadisticas.totales(), {'new': 3, 'read': 0, 'replied': 0})
+
+        # Abrir el detalle lo marca leído; responder registra el tiempo de respuesta
+        self.client.get(reverse('administrador:mensaje_detalle', args=[a.pk]))
+        self.client.post(reverse('administrador:mensaje_detalle', args=[viejo.pk]),
+                         {'status': 'replied', 'admin_notes': ''})
+        viejo.refresh_from_db()
+        self.assertIsNotNone(viejo.replied_at)
+        self.assertEqual(estadisticas.totales(), {'new': 1, 'read': 1, 'replied': 1})
+        respuesta = ContactResponseDaily.objects.get(day=hoy)
+        self.assertEqual(respuesta.replies, 1)
+        self.assertAlmostEqual(respuesta.response_seconds, 3 * 86400, delta=60)
+
+        # Volver a "leído" y otra vez a "respondido" no cuenta una segunda respuesta
+        for estado in ('read', 'replied'):
+            viejo.status = estado
+            viejo.save()
+        self.assertEqual(ContactResponseDaily.objects.get(day=hoy).replies, 1)
+
+        b.delete()
+        incremental = _rollups()
+        estadisticas.recalcular()
+        self.assertEqual(_rollups(), incremental)
+        self.assertEqual(incremental[0], sorted([
+            (hoy - timedelta(days=3), 'replied', 1), (hoy, 'read', 1)]))
+
+    def test_comando_repara_desincronizacion(self):
+        self._mensaje('A')
+        self._mensaje('B')
+        ContactMessage.objects.update(status='read')      # sin señales
+        self.assertEqual(estadisticas.totales()['new'], 2)
+
+        salida = StringIO()
+        call_command('recalcular_estadisticas', '--desde', str(timezone.localdate()),
+                     stdout=salida)
+        self.assertIn('1 fila(s) por día y estado', salida.getvalue())
+        self.assertEqual(estadisticas.totales(), {'new': 0, 'read': 2, 'replied': 0})
+
+    def test_graficos_y_dashboard_sin_recorrer_mensajes(self):
+        self._mensaje('Viejo', hace_dias=8)
+        nuevo = self._mensaje('Nuevo')
+        nuevo.status = 'replied'
+        nuevo.save()
+
+        graficos = estadisticas.graficos(dias=30, semanas=12)
+        self.assertEqual(len(graficos['diario']), 30)
+        self.assertEqual(len(graficos['semanal']), 12)
+        hoy = graficos['diario'][-1]
+        self.assertEqual((hoy['total'], hoy['por_estado']['replied']), (1, 1))
+        self.assertEqual(hoy['respuesta_horas'], 0.0)
+        self.assertEqual(graficos['diario'][-9]['por_estado']['new'], 1)
+        self.assertEqual(sum(s['total'] for s in graficos['semanal']), 2)
+
+        with CaptureQueriesContext(connection) as consultas:
+            r = self.client.get(reverse('administrador:home'))
+        self.assertContains(r, 'data-grafico="volumen-diario"')
+        sobre_mensajes = [q['sql'] for q in consultas
+                          if 'administrador_contactmessage' in q['sql']]
+        # Solo la lista de "Mensajes recientes" (LIMIT 5); los conteos salen de los rollups
+        self.assertEqual(len(sobre_mensajes), 1)
+        self.assertIn('LIMIT 5', sobre_mensajes[0])
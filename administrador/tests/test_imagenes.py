@@ -0,0 +1,80 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from administrador import imagenes
+from administrador.models import BlogPost, Service
+
+MEDIA = tempfile.mkdtemp()
+
+
+def _jpeg(ancho=120, alto=80, color=(200, 40, 40), orientacion=None):
+    img = Image.new('RGB', (ancho, alto), color)
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientacion:
+        exif[imagenes.ORIENTACION] = orientacion
+    img.save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile('foto.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA)
+class ImagenMetadataTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA, ignore_errors=True)
+
+    def _servicio(self, **kwargs):
+        return Service.objects.create(name='Reformer', description='.', price=1000,
+                                      image=_jpeg(**kwargs))
+
+    def test_calcula_metadata_al_subir(self):
+        s = Service.objects.get(pk=self._servicio().pk)
+        self.assertEqual((s.image_width, s.image_height), (120, 80))
+        self.assertEqual(s.image_color[:3], '#c8')
+        self.assertTrue(s.image_placeholder.startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(s.image_placeholder), 1500)
+        self.assertIn(s.image_color, s.image_placeholder_style)
+
+    def test_orientacion_exif(self):
+        s = self._servicio(orientacion=6)
+        self.assertEqual((s.image_width, s.image_height), (80, 120))
+
+    def test_no_reabre_la_imagen_al_guardar_otros_campos(self):
+        s = self._servicio()
+        with mock.patch.object(imagenes, 'analizar') as analizar:
+            s.name = 'Mat'
+            s.save()
+            Service.objects.get(pk=s.pk).save(update_fields=['name'])
+        analizar.assert_not_called()
+
+    def test_cambiar_y_quitar_imagen(self):
+        post = BlogPost.objects.create(title='Hola', content='.', image=_jpeg(40, 30))
+        post.image = _jpeg(50, 100)
+        post.save(update_fields=['image'])
+        post.refresh_from_db()
+        self.assertEqual((post.image_width, post.image_height), (50, 100))
+        post.image = None
+        post.save()
+        post.refresh_from_db()
+        self.assertIsNone(post.image_width)
+        self.assertEqual(post.image_placeholder_style, '')
+
+    def test_archivo_invalido_no_rompe(self):
+        s = Service.objects.create(
+            name='X', description='.', price=1,
+            image=SimpleUploadedFile('x.jpg', b'no es imagen', content_type='image/jpeg'))
+        self.assertEqual(s.image_color, '')
+
+    def test_cards_usan_dimensiones_y_placeholder(self):
+        s = self._servicio()
+        r = self.client.get(reverse('index:servicios'))
+        self.assertContains(r, 'width="120" height="80"')
+        self.assertContains(r, f'background:{s.image_color} url(data:image/jpeg;base64,')
@@ -0,0 +1,131 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from administrador.models import Service
+from api.recursos import RECURSOS
+from Pilatesreserva import cache as cache_contenido
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AccionesEnLoteTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+        self.client.login(username='admin1', password='x')
+        self.a, self.b, self.c = [
+            Service.objects.create(name=n, description='.', price=1, order=i)
+            for i, n in enumerate(['A', 'B', 'C'], start=1)]
+
+    def _orden(self):
+        return list(Service.objects.values_list('name', flat=True))
+
+    def _reordenar(self, orden):
+        return self.client.post(reverse('administrador:servicios_reordenar'),
+                                json.dumps({'orden': orden}), content_type='application/json',
+                                HTTP_ACCEPT='application/json')
+
+    def test_reordenar_con_un_solo_update_y_una_invalidacion(self):
+        sello_api = cache_contenido.version(RECURSOS['servicios'].clave_version)
+        with patch('index.catalogo.invalidar') as invalidar_catalogo, \
+                CaptureQueriesContext(connection) as ctx:
+            r = self._reordenar([self.c.pk, self.a.pk, self.b.pk])
+        self.assertEqual(r.json(), {'orden': [self.c.pk, self.a.pk, self.b.pk], 'cambiados': 3})
+        self.assertEqual(self._orden(), ['C', 'A', 'B'])
+        updates = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('UPDATE "administrador_service"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('CASE WHEN', updates[0])
+        self.assertNotIn('"name"', updates[0])
+        invalidar_catalogo.assert_called_once()
+        self.assertNotEqual(cache_contenido.version(RECURSOS['servicios'].clave_version),
+                            sello_api)
+
+        # Solo se reescriben las filas que se movieron
+        r = self._reordenar([self.c.pk, self.b.pk, self.a.pk])
+        self.assertEqual(r.json()['cambiados'], 2)
+
+    def test_reordenar_exige_el_orden_completo(self):
+        for orden in ([self.a.pk, self.b.pk], [self.a.pk, self.a.pk, self.b.pk],
+                      [self.a.pk, self.b.pk, 999], ['x']):
+            r = self._reordenar(orden)
+            self.assertEqual(r.status_code, 400)
+        r = self.client.post(reverse('administrador:servicios_reordenar'), 'no-es-json',
+                             content_type='application/json', HTTP_ACCEPT='application/json')
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(self._orden(), ['A', 'B', 'C'])
+
+    def test_desactivar_en_lote_desde_el_form(self):
+        self.c.is_active = False
+        self.c.save()
+        with patch('index.catalogo.invalidar') as invalidar_catalogo, \
+                CaptureQueriesContext(connection) as ctx:
+            r = self.client.post(reverse('administrador:servicios_lote'),
+                                 {'accion': 'desactivar', 'ids': [self.a.pk, self.c.pk]},
+                                 follow=True)
+        self.assertRedirects(r, reverse('administrador:servicios_list'))
+        self.assertContains(r, '1 servicio(s) desactivado(s)')   # C ya estaba inactivo
+        invalidar_catalogo.assert_called_once()
+        updates = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('UPDATE "administrador_service"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(list(Service.objects.filter(is_active=True).values_list('name', flat=True)),
+                         ['B'])
+        self.assertNotContains(self.client.get(reverse('index:servicios')), '>A<')
+
+    def test_activar_en_lote_json(self):
+        Service.objects.update(is_active=False)
+        r = self.client.post(reverse('administrador:servicios_lote'),
+                             json.dumps({'accion': 'activar', 'ids': [self.a.pk, self.b.pk]}),
+                             content_type='application/json', HTTP_ACCEPT='application/json')
+        self.assertEqual(r.json(), {'pks': [self.a.pk, self.b.pk], 'is_active': True})
+
+    def test_lote_invalido(self):
+        r = self.client.post(reverse('administrador:servicios_lote'), {'accion': 'borrar',
+                                                                       'ids': [self.a.pk]},
+                             HTTP_ACCEPT='application/json')
+        self.assertEqual(r.status_code, 400)
+        r = self.client.post(reverse('administrador:servicios_lote'), {'accion': 'activar'},
+                             HTTP_ACCEPT='application/json')
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(self.client.get(reverse('administrador:servicios_lote')).status_code, 405)
+
+    def test_listado_permite_arrastrar_solo_sin_busqueda(self):
+        url = reverse('administrador:servicios_list')
+        self.assertContains(self.client.get(url), 'data-reordenar=')
+        self.assertNotContains(self.client.get(url, {'q': 'A'}), 'data-reordenar=')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LotePrerenderTests(TestCase):
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        ajustes = override_settings(PRERENDER_ROOT=root, PRERENDER_ENABLED=True)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+        self.client.login(username='admin1', password='x')
+        self.servicios = [Service.objects.create(name=f'S{i}', description='.', price=1, order=i)
+                          for i in range(3)]
+
+    def test_un_solo_publicar_por_lote(self):
+        s0, s1, s2 = self.servicios
+        with patch('index.prerender.publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('administrador:servicios_lote'),
+                                 {'accion': 'desactivar', 'ids': [s0.pk, s1.pk]})
+        publicar.assert_called_once()
+        paginas = publicar.call_args.args[0]
+        self.assertIn(reverse('index:servicios'), paginas)
+        for s in self.servicios:   # los desactivados se retiran; el activo cambia su barra
+            self.assertIn(reverse('index:servicio_detalle', args=[s.pk]), paginas)
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from administrador import media
+from administrador.models import BlogPost, Service
+
+
+def _envejecer(nombre, segundos=7200):
+    ruta = default_storage.path(nombre)
+    antes = time.time() - segundos
+    os.utime(ruta, (antes, antes))
+
+
+class _MediaTemporal(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=self.media_root)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+    def _servicio(self, nombre='a.txt'):
+        s = Service(name='Reformer', description='.', price=1)
+        s.image.save(nombre, ContentFile(b'x'), save=False)
+        s.save()
+        return Service.objects.get(pk=s.pk)
+
+
+class CicloDeVidaTests(_MediaTemporal):
+    def test_borrar_fila_borra_archivo_y_renditions_al_commit(self):
+        s = self._servicio()
+        nombre = s.image.name
+        default_storage.save(f'{media.RENDITIONS_DIR}/{nombre}/thumb.webp', ContentFile(b't'))
+        with self.captureOnCommitCallbacks(execute=True):
+            s.delete()
+            self.assertTrue(default_storage.exists(nombre))   # aún no hay commit
+        self.assertFalse(default_storage.exists(nombre))
+        self.assertFalse(default_storage.exists(f'{media.RENDITIONS_DIR}/{nombre}/thumb.webp'))
+
+    def test_reemplazar_imagen_borra_la_vieja(self):
+        s = self._servicio()
+        vieja = s.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            s.image.save('b.txt', ContentFile(b'y'))
+        self.assertFalse(default_storage.exists(vieja))
+        self.assertTrue(default_storage.exists(s.image.name))
+
+    def test_rollback_no_borra(self):
+        s = self._servicio()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            try:
+                with transaction.atomic():
+                    Service.objects.get(pk=s.pk).delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertTrue(default_storage.exists(s.image.name))
+
+    def test_archivo_compartido_no_se_borra(self):
+        s = self._servicio()
+        BlogPost.objects.create(title='t', content='.', image=s.image.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            s.delete()
+        self.assertTrue(default_storage.exists(s.image.name))
+
+
+class MediaGcTests(_MediaTemporal):
+    def _correr(self, **opts):
+        salida = io.StringIO()
+        opts.setdefault('state', os.path.join(self.media_root, '.estado.json'))
+        call_command('media_gc', stdout=salida, **opts)
+        return salida.getvalue()
+
+    def test_dry_run_y_delete(self):
+        vivo = self._servicio().image.name
+        huerfano = default_storage.save('services/huerfano.txt', ContentFile(b'z'))
+        nuevo = default_storage.save('services/recien.txt', ContentFile(b'z'))
+        rendition = default_storage.save(f'{media.RENDITIONS_DIR}/{vivo}/t.webp', ContentFile(b'r'))
+        for nombre in (vivo, huerfano, rendition):
+            _envejecer(nombre)
+
+        self.assertIn('1 huérfano(s) a borrar', self._correr())
+        self.assertTrue(default_storage.exists(huerfano))
+
+        self._correr(delete=True)
+        self.assertFalse(default_storage.exists(huerfano))
+        for nombre in (vivo, nuevo, rendition):   # referenciado, muy nuevo, rendition viva
+            self.assertTrue(default_storage.exists(nombre))
+
+    def test_reanuda_desde_el_ultimo_lote(self):
+        nombres = [default_storage.save(f'blog/{i:02d}.txt', ContentFile(b'z')) for i in range(5)]
+        for nombre in nombres:
+            _envejecer(nombre)
+        estado = os.path.join(self.media_root, '.estado.json')
+
+        self._correr(delete=True, batch_size=2, max_batches=1, state=estado)
+        self.assertEqual(json.loads(Path(estado).read_text())['ultima'], ['blog', '01.txt'])
+        self.assertTrue(default_storage.exists(nombres[2]))
+
+        salida = self._correr(delete=True, batch_size=2, state=estado)
+        self.assertIn('3 archivo(s) revisados', salida)
+        self.assertFalse(any(default_storage.exists(n) for n in nombres))
+        self.assertFalse(os.path.exists(estado))
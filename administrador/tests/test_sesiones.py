@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from administrador.models import Service
+
+User = get_user_model()
+
+
+def _consultas(ctx, tabla):
+    return [q['sql'] for q in ctx.captured_queries if tabla in q['sql']]
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SesionesPanelTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='admin1', password='x', rol='administrador')
+        self.servicio = Service.objects.create(
+            name='Reformer', description='.', price=10000, image='services/a.jpg')
+
+    def _request_panel(self):
+        self.client.get(reverse('administrador:home'))   # calienta el cache
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(reverse('administrador:servicios_list'))
+        self.assertEqual(r.status_code, 200)
+        return ctx
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db_sin_consultas_de_sesion_ni_usuario(self):
+        self.client.login(username='admin1', password='x')
+        ctx = self._request_panel()
+        self.assertEqual(_consultas(ctx, 'django_session'), [])
+        self.assertEqual(_consultas(ctx, 'login_user'), [])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookies_sin_consultas_de_sesion_ni_usuario(self):
+        self.client.login(username='admin1', password='x')
+        ctx = self._request_panel()
+        self.assertEqual(_consultas(ctx, 'django_session'), [])
+        self.assertEqual(_consultas(ctx, 'login_user'), [])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_flash_no_escribe_la_sesion(self):
+        self.client.login(username='admin1', password='x')
+        self.client.get(reverse('administrador:home'))
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.post(
+                reverse('administrador:servicio_toggle', args=[self.servicio.pk]),
+                follow=True)
+        self.assertContains(r, 'desactivado')
+        self.assertEqual(_consultas(ctx, 'django_session'), [])
+
+    def test_usuario_cacheado_se_invalida_al_guardar(self):
+        self.client.login(username='admin1', password='x')
+        self.client.get(reverse('administrador:home'))
+        self.admin.is_active = False
+        self.admin.save()
+        r = self.client.get(reverse('administrador:home'))
+        self.assertEqual(r.status_code, 302)
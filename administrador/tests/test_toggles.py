@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from administrador.models import BlogPost, Service
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TogglesTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+        self.client.login(username='admin1', password='x')
+        self.servicio = Service.objects.create(name='Reformer', description='.', price=1000)
+        self.post = BlogPost.objects.create(title='Hola', content='.', is_published=False)
+
+    def _toggle(self, nombre, pk, **extra):
+        return self.client.post(reverse(f'administrador:{nombre}', args=[pk]), **extra)
+
+    def test_get_no_permitido(self):
+        r = self.client.get(reverse('administrador:servicio_toggle', args=[self.servicio.pk]))
+        self.assertEqual(r.status_code, 405)
+        self.servicio.refresh_from_db()
+        self.assertTrue(self.servicio.is_active)
+
+    def test_json_devuelve_el_estado_nuevo(self):
+        r = self._toggle('servicio_toggle', self.servicio.pk, HTTP_ACCEPT='application/json')
+        self.assertEqual(r.json(), {'pk': self.servicio.pk, 'is_active': False})
+        r = self._toggle('servicio_toggle', self.servicio.pk, HTTP_ACCEPT='application/json')
+        self.assertEqual(r.json()['is_active'], True)
+
+        r = self._toggle('blog_toggle', self.post.pk, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(r.json(), {'pk': self.post.pk, 'is_published': True})
+
+    def test_sin_js_redirige_con_mensaje(self):
+        r = self._toggle('blog_toggle', self.post.pk, follow=True)
+        self.assertRedirects(r, reverse('administrador:blog_list'))
+        self.assertContains(r, '&quot;Hola&quot; publicado')
+
+    def test_un_solo_update_condicional(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self._toggle('servicio_toggle', self.servicio.pk, HTTP_ACCEPT='application/json')
+        updates = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('UPDATE "administrador_service"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('CASE WHEN', updates[0])
+        self.assertNotIn('"name"', updates[0])   # no reescribe toda la fila
+
+    def test_inexistente_da_404(self):
+        r = self._toggle('servicio_toggle', 999, HTTP_ACCEPT='application/json')
+        self.assertEqual(r.status_code, 404)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TogglesPrerenderTests(TestCase):
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        ajustes = override_settings(PRERENDER_ROOT=root, PRERENDER_ENABLED=True)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+        self.client.login(username='admin1', password='x')
+        self.servicios = [Service.objects.create(name=f'S{i}', description='.', price=1, order=i)
+                          for i in range(3)]
+
+    def test_desactivar_republica_paginas_afectadas_al_commit(self):
+        s = self.servicios[0]
+        with patch('index.prerender.publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                self._toggle(s.pk)
+            publicar.assert_not_called()          # todavía no hay commit
+            for callback in callbacks:
+                callback()
+        paginas = publicar.call_args.args[0]
+        self.assertIn(reverse('index:servicios'), paginas)
+        self.assertIn(reverse('index:servicio_detalle', args=[s.pk]), paginas)
+        # estaba en la barra "otros": se tocan los demás detalles
+        self.assertIn(reverse('index:servicio_detalle', args=[self.servicios[1].pk]), paginas)
+
+    def test_blog_republica_novedades(self):
+        post = BlogPost.objects.create(title='t', content='.')
+        with patch('index.prerender.publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('administrador:blog_toggle', args=[post.pk]),
+                                 HTTP_ACCEPT='application/json')
+        self.assertIn(reverse('index:novedades'), publicar.call_args.args[0])
+
+    def _toggle(self, pk):
+        return self.client.post(reverse('administrador:servicio_toggle', args=[pk]),
+                                HTTP_ACCEPT='application/json')
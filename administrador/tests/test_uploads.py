@@ -0,0 +1,177 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http.multipartparser import MultiPartParser
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from PIL import Image
+
+from administrador import uploads, verificacion
+from administrador.forms import ServiceForm
+from administrador.models import BlogPost, Service
+from tareas import cola
+from tareas.models import Task
+
+User = get_user_model()
+
+
+def _imagen(ancho=40, alto=30, formato='PNG', nombre='foto.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (ancho, alto), (10, 120, 200)).save(buffer, formato)
+    return SimpleUploadedFile(nombre, buffer.getvalue())
+
+
+UPLOADS_TEST = {'MAX_BYTES': 50_000, 'MAX_PIXELS': 1_000_000,
+                'FORMATS': ['JPEG', 'PNG'], 'VERIFY_MODE': 'sync'}
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+                   UPLOADS=UPLOADS_TEST)
+class SubidaImagenesTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        ajuste = override_settings(MEDIA_ROOT=self.media_root)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+        self.client.login(username='admin1', password='x')
+
+    def _crear_servicio(self, imagen):
+        return self.client.post(reverse('administrador:servicio_crear'), {
+            'name': 'Reformer', 'description': '.', 'price': 1000,
+            'order': 0, 'is_active': 'on', 'image': imagen,
+        })
+
+    def test_imagen_valida_queda_pendiente_y_se_verifica_al_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            r = self._crear_servicio(_imagen())
+        self.assertEqual(r.status_code, 302)
+        s = Service.objects.get()
+        self.assertEqual(s.image_status, Service.IMAGEN_PENDIENTE)
+        self.assertIsNone(s.image_width)
+        self.assertNotContains(self.client.get(reverse('index:servicios')), s.image.url)
+
+        for callback in callbacks:
+            callback()
+        s.refresh_from_db()
+        self.assertEqual(s.image_status, Service.IMAGEN_OK)
+        self.assertEqual((s.image_width, s.image_height), (40, 30))
+        self.assertContains(self.client.get(reverse('index:servicios')), s.image.url)
+
+    def test_verificacion_por_cola_de_tareas(self):
+        with self.settings(UPLOADS={**UPLOADS_TEST, 'VERIFY_MODE': 'queue'}):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._crear_servicio(_imagen())
+        s = Service.objects.get()
+        self.assertEqual(s.image_status, Service.IMAGEN_PENDIENTE)
+        tarea = Task.objects.get()
+        self.assertEqual((tarea.name, tarea.queue, tarea.args),
+                         ('administrador.tareas.verificar_imagen', 'imagenes',
+                          ['administrador.Service', s.pk, s.image.name]))
+
+        self.assertEqual(cola.trabajar(['imagenes'], una_vez=True, periodicas=False), {'done': 1})
+        s.refresh_from_db()
+        self.assertEqual(s.image_status, Service.IMAGEN_OK)
+
+    def test_excede_bytes(self):
+        r = self._crear_servicio(SimpleUploadedFile('g.png', b'\x89PNG' + b'0' * 60_000))
+        self.assertContains(r, 'supera el máximo')
+        self.assertFalse(Service.objects.exists())
+
+    def test_no_es_imagen(self):
+        r = self._crear_servicio(SimpleUploadedFile('x.png', b'hola'))
+        self.assertContains(r, 'no es una imagen válida')
+
+    def test_formato_y_pixeles_por_cabecera(self):
+        r = self._crear_servicio(_imagen(formato='GIF', nombre='a.gif'))
+        self.assertContains(r, 'Formato GIF no permitido')
+        with self.settings(UPLOADS={**UPLOADS_TEST, 'MAX_PIXELS': 100}):
+            r = self._crear_servicio(_imagen())
+        self.assertContains(r, 'demasiado grande (40×30 px)')
+
+    def test_imagen_corrupta_se_rechaza_en_segundo_plano(self):
+        # La cabecera es válida (pasa el sniff), pero los datos están cortados
+        buffer = io.BytesIO()
+        Image.effect_noise((128, 128), 50).convert('RGB').save(buffer, 'JPEG')
+        datos = buffer.getvalue()
+        truncada = SimpleUploadedFile('t.jpg', datos[:len(datos) // 2])
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(reverse('administrador:blog_crear'), {
+                'title': 'Hola', 'content': '.', 'is_published': 'on',
+                'published_date': '2026-01-01T10:00', 'image': truncada,
+            })
+        self.assertEqual(r.status_code, 302)
+        post = BlogPost.objects.get()
+        self.assertEqual(post.image_status, BlogPost.IMAGEN_RECHAZADA)
+        self.assertFalse(post.image)
+        self.assertEqual(default_storage.listdir('blog')[1], [])
+
+
+class DecodificarTests(SimpleTestCase):
+    def _archivo(self, ancho, alto):
+        return io.BytesIO(_imagen(ancho, alto).read())
+
+    def test_tope_de_pixeles_sin_tocar_el_global_de_pillow(self):
+        global_pillow, vistos = Image.MAX_IMAGE_PIXELS, []
+        abrir = Image.open
+
+        def espiar(*args, **kwargs):
+            vistos.append(Image.MAX_IMAGE_PIXELS)   # lo que ven los otros hilos
+            return abrir(*args, **kwargs)
+        with mock.patch.object(Image, 'open', espiar):
+            verificacion.decodificar(self._archivo(40, 30), 1200)
+            with self.assertRaisesMessage(ValueError, 'demasiados píxeles (40×30)'):
+                verificacion.decodificar(self._archivo(40, 30), 1199)
+        self.assertEqual(set(vistos), {global_pillow})
+        self.assertEqual(Image.MAX_IMAGE_PIXELS, global_pillow)
+
+    def test_bomba_para_pillow(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 500), \
+                self.assertRaisesMessage(ValueError, 'demasiados píxeles'):
+            verificacion.decodificar(self._archivo(40, 30), 10 ** 6)
+
+
+@override_settings(UPLOADS=UPLOADS_TEST)
+class TopeDeSubidaTests(SimpleTestCase):
+    """El handler corta la subida sin leer el resto del cuerpo."""
+
+    def _parsear(self, tamano, **meta):
+        cuerpo = encode_multipart(BOUNDARY, {
+            'name': 'S', 'image': SimpleUploadedFile('g.png', b'\x89PNG' + b'0' * tamano)})
+        entrada = io.BytesIO(cuerpo)
+        request = RequestFactory().post('/')
+        parser = MultiPartParser(
+            {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(cuerpo)), **meta},
+            entrada, [uploads.LimitedTemporaryFileUploadHandler(request)])
+        post, files = parser.parse()
+        return request, post, files, entrada.tell(), len(cuerpo)
+
+    def test_corta_al_pasar_el_tope_sin_drenar_el_cuerpo(self):
+        request, post, files, leidos, total = self._parsear(2_000_000)
+        self.assertEqual(request.subidas_cortadas, {'image'})
+        self.assertNotIn('image', files)
+        self.assertEqual(post['name'], 'S')             # lo anterior al archivo se conserva
+        self.assertLess(leidos, total // 4)
+        form = ServiceForm({'name': 'S'}, uploads.archivos_subidos(request))
+        self.assertIn('supera el máximo', str(form.errors['image']))
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1000)
+    def test_content_length_excesivo_corta_antes_del_archivo(self):
+        with mock.patch.object(uploads.TemporaryFileUploadHandler,
+                               'receive_data_chunk') as escribir:
+            request, _post, files, leidos, total = self._parsear(2_000_000)
+        escribir.assert_not_called()
+        self.assertEqual(request.subidas_cortadas, {'image'})
+        self.assertLess(leidos, total // 4)
+
+    def test_dentro_del_tope_no_corta(self):
+        request, _post, files, _leidos, _total = self._parsear(1000)
+        self.assertFalse(hasattr(request, 'subidas_cortadas'))
+        self.assertEqual(files['image'].size, 1004)
@@ -0,0 +1,150 @@
+"""
+administrador/uploads.py
+
+Subida de imágenes sin decodificarlas dentro del request.
+
+  1. LimitedTemporaryFileUploadHandler (settings.FILE_UPLOAD_HANDLERS)
+     escribe cada archivo por trozos a un temporal en disco. Pasado
+     UPLOADS['MAX_BYTES'] corta la subida con StopUpload(connection_reset)
+     y el resto del cuerpo no se lee: un archivo de varios GB no ocupa al
+     worker. Si el Content-Length ya lo deja claro, corta antes de leer
+     el primer byte del archivo. Los campos que venían después del
+     archivo se pierden; el formulario vuelve con el error.
+  2. ImagenSubida, el campo de ServiceForm/BlogPostForm, rechaza la
+     subida cortada (las vistas le pasan archivos_subidos(request)) y
+     hace un sniff solo de la cabecera con Pillow: formato permitido y
+     ancho×alto <= UPLOADS['MAX_PIXELS']. No decodifica píxeles.
+  3. Al guardar, la fila queda con image_status = "pending" y la
+     decodificación completa corre fuera del request
+     (administrador/verificacion.py). Mientras tanto el sitio público
+     no muestra la imagen.
+"""
+from django import forms
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, UnidentifiedImageError
+
+DEFAULTS = {
+    'MAX_BYTES': 8 * 1024 * 1024,
+    'MAX_PIXELS': 40_000_000,
+    'FORMATS': ('JPEG', 'PNG', 'WEBP', 'GIF'),
+    'VERIFY_MODE': 'thread',
+}
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'UPLOADS', {})}
+
+
+class SubidaCortada:
+    """Lo que ve el form en lugar del archivo cuya subida se cortó."""
+
+
+SUBIDA_CORTADA = SubidaCortada()
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Siempre a disco (nunca en memoria) y con tope duro de bytes por archivo."""
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.limite = config()['MAX_BYTES']
+        # Más que la imagen máxima + lo que pueden ocupar los campos de
+        # texto: ningún archivo entra, se corta al empezar el primero
+        margen = settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        self.cuerpo_excedido = (content_length or 0) > self.limite + margen
+        return super().handle_raw_input(input_data, META, content_length, boundary, encoding)
+
+    def new_file(self, field_name, file_name, content_type, content_length, *args, **kwargs):
+        if self.cuerpo_excedido or (content_length or 0) > self.limite:
+            self._cortar(field_name)
+        super().new_file(field_name, file_name, content_type, content_length, *args, **kwargs)
+        self.recibidos = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.recibidos += len(raw_data)
+        if self.recibidos > self.limite:
+            self._cortar(self.field_name)
+        return super().receive_data_chunk(raw_data, start)
+
+    def _cortar(self, campo):
+        # connection_reset: Django no drena el resto del cuerpo
+        cortadas = getattr(self.request, 'subidas_cortadas', set())
+        cortadas.add(campo)
+        self.request.subidas_cortadas = cortadas
+        raise StopUpload(connection_reset=True)
+
+
+def archivos_subidos(request):
+    """request.FILES, con SUBIDA_CORTADA en los campos que pasaron MAX_BYTES."""
+    archivos = request.FILES            # parsea el cuerpo (si no se hizo ya)
+    cortadas = getattr(request, 'subidas_cortadas', ())
+    if cortadas:
+        archivos = archivos.copy()
+        for campo in cortadas:
+            archivos[campo] = SUBIDA_CORTADA
+    return archivos
+
+
+class ImagenSubida(forms.FileField):
+    """FileField que valida la imagen leyendo solo la cabecera."""
+
+    default_error_messages = {
+        'grande': 'La imagen supera el máximo de %(maximo)s.',
+        'invalida': 'El archivo no es una imagen válida.',
+        'formato': 'Formato %(formato)s no permitido (usa %(permitidos)s).',
+        'pixeles': 'La imagen es demasiado grande (%(ancho)s×%(alto)s px).',
+    }
+
+    def to_python(self, data):
+        cfg = config()
+        if data is SUBIDA_CORTADA:
+            raise forms.ValidationError(self.error_messages['grande'], code='grande',
+                                        params={'maximo': filesizeformat(cfg['MAX_BYTES'])})
+        f = super().to_python(data)
+        if f is None:
+            return None
+        if f.size > cfg['MAX_BYTES']:
+            raise forms.ValidationError(self.error_messages['grande'], code='grande',
+                                        params={'maximo': filesizeformat(cfg['MAX_BYTES'])})
+        try:
+            f.seek(0)
+            with Image.open(f) as img:   # lazy: solo parsea la cabecera
+                formato, (ancho, alto) = img.format, img.size
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            raise forms.ValidationError(self.error_messages['invalida'], code='invalida')
+        finally:
+            f.seek(0)
+        if formato not in cfg['FORMATS']:
+            raise forms.ValidationError(
+                self.error_messages['formato'], code='formato',
+                params={'formato': formato, 'permitidos': ', '.join(cfg['FORMATS'])})
+        if ancho * alto > cfg['MAX_PIXELS']:
+            raise forms.ValidationError(self.error_messages['pixeles'], code='pixeles',
+                                        params={'ancho': ancho, 'alto': alto})
+        f.content_type = Image.MIME.get(formato)
+        return f
+
+    def widget_attrs(self, widget):
+        attrs = super().widget_attrs(widget)
+        if isinstance(widget, forms.FileInput) and 'accept' not in widget.attrs:
+            attrs.setdefault('accept', 'image/*')
+        return attrs
+
+
+class VerificacionDiferidaMixin:
+    """
+    ModelForm con campo `image`: una imagen nueva deja la fila en
+    "pending" y programa la verificación completa para después del commit.
+    """
+
+    def save(self, commit=True):
+        from .verificacion import programar_verificacion
+
+        nueva = 'image' in self.changed_data and bool(self.cleaned_data.get('image'))
+        if nueva:
+            self.instance.image_status = self.instance.IMAGEN_PENDIENTE
+        obj = super().save(commit)
+        if nueva and commit:
+            programar_verificacion(obj)
+        return obj
@@ -23,6 +23,10 @@ urlpatterns = [
          views.servicio_eliminar,     name='servicio_eliminar'),
     path('servicios/<int:pk>/toggle/',
          views.servicio_toggle_activo, name='servicio_toggle'),
+    path('servicios/reordenar/',         views.servicios_reordenar,
+         name='servicios_reordenar'),
+    path('servicios/lote/',              views.servicios_lote,
+         name='servicios_lote'),
 
     # ── Blog / Novedades ───────────────────────────────────
     path('blog/',                    views.blog_list,            name='blog_list'),
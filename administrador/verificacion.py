@@ -0,0 +1,115 @@
+"""
+administrador/verificacion.py
+
+Verificación completa de imágenes subidas, fuera del request (ver
+administrador/uploads.py):
+
+  - Decodifica la imagen entera si ancho × alto no pasa de
+    UPLOADS['MAX_PIXELS'] (una "bomba" de descompresión falla acá, en
+    un hilo de fondo, no en el worker que atiende la request).
+  - Si pasa: calcula la metadata (administrador/imagenes.py) y la fila
+    queda en "ok".
+  - Si no: la fila queda en "rejected", se quita la referencia y el
+    archivo se borra después del commit (administrador/media.py).
+
+UPLOADS['VERIFY_MODE']: "thread" (pool de hilos del proceso, default),
+"sync" (en el mismo hilo, después del commit; útil en tests) o "queue"
+(cola de tareas, administrador/tareas.py: la procesa `manage.py
+procesar_tareas`, con reintentos). Si el proceso muere con filas en
+"pending", `manage.py verificar_imagenes` las retoma.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, transaction
+from PIL import Image
+
+from . import imagenes
+from .uploads import config
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+
+def _ejecutor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='verificar-imagen')
+    return _pool
+
+
+def programar_verificacion(obj):
+    """Encola la verificación de la imagen actual de `obj` para después del commit."""
+    args = (type(obj), obj.pk, obj.image.name)
+    modo = config()['VERIFY_MODE']
+    if modo == 'queue':
+        from .tareas import verificar_imagen
+        verificar_imagen.encolar_al_commit(obj._meta.label, obj.pk, obj.image.name)
+    elif modo == 'sync':
+        transaction.on_commit(lambda: verificar(*args))
+    else:
+        transaction.on_commit(lambda: _ejecutor().submit(_verificar_en_hilo, *args))
+
+
+def _verificar_en_hilo(modelo, pk, nombre):
+    close_old_connections()
+    try:
+        verificar(modelo, pk, nombre)
+    except Exception:
+        logger.exception('Falló la verificación de %s', nombre)
+    finally:
+        close_old_connections()
+
+
+def decodificar(archivo, max_pixeles):
+    """
+    Decodifica la imagen completa; lanza excepción si es inválida o excesiva.
+
+    El tope es el chequeo de ancho × alto de la cabecera, antes de
+    decodificar. Image.MAX_IMAGE_PIXELS no se toca: es global al proceso
+    y esto corre en un pool de hilos, en paralelo con otras aperturas.
+    """
+    try:
+        with Image.open(archivo) as img:
+            if img.width * img.height > max_pixeles:
+                raise ValueError(f'demasiados píxeles ({img.width}×{img.height})')
+            img.verify()            # estructura (CRC, chunks)
+        archivo.seek(0)
+        with Image.open(archivo) as img:
+            img.load()              # decodificación completa
+    except Image.DecompressionBombError as e:
+        # Más allá del límite propio de Pillow (el doble de MAX_IMAGE_PIXELS)
+        raise ValueError(f'demasiados píxeles ({e})') from e
+    finally:
+        archivo.seek(0)
+
+
+def verificar(modelo, pk, nombre):
+    """
+    Verifica la imagen `nombre` de la fila `pk`. Si la fila ya tiene otra
+    imagen (se volvió a subir mientras tanto) no hace nada.
+    Devuelve el estado final o None si no aplicaba.
+    """
+    obj = modelo.objects.filter(pk=pk, image=nombre).first()
+    if obj is None:
+        return None
+    try:
+        with obj.image.open('rb') as f:
+            decodificar(f, config()['MAX_PIXELS'])
+            datos = imagenes.analizar(f)
+        if datos is None:
+            raise ValueError('no se pudo analizar')
+    except Exception as e:  # cualquier fallo de Pillow = imagen rechazada
+        logger.warning('Imagen rechazada %s (%s #%s): %s', nombre, modelo.__name__, pk, e)
+        # Sin imagen: la señal post_save de media borra el archivo al commit
+        obj.image = ''
+        obj.image_status = modelo.IMAGEN_RECHAZADA
+        obj.actualizar_metadata_imagen()
+    else:
+        obj.image_status = modelo.IMAGEN_OK
+        obj.image_width, obj.image_height = datos['width'], datos['height']
+        obj.image_color, obj.image_placeholder = datos['color'], datos['placeholder']
+    # save() (no update()) para que corran las señales: prerender, media
+    obj.save(update_fields=['image', 'image_status', *obj.CAMPOS_METADATA])
+    return obj.image_status
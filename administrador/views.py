@@ -5,14 +5,26 @@ Panel CMS personalizado.
 ROLES:
   superusuario (is_superuser=True) → accede al panel + gestiona usuarios
   administrador (rol='administrador') → accede al panel, SIN gestión de usuarios
+
+Los decoradores consultan el Principal del request (login/principal.py),
+que se resuelve una sola vez y se cachea en la sesión.
 """
+import json
 from functools import wraps
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
+from django.http import Http404, JsonResponse
 from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from login.principal import get_principal
+from . import estadisticas
 from .models import Service, BlogPost, ContactMessage
+from .signals import estado_alternado, lote_actualizado
+from .uploads import archivos_subidos
 from .forms import (ServiceForm, BlogPostForm,
                     ContactMessageForm, UsuarioCrearForm, UsuarioEditarForm)
 
@@ -31,11 +43,12 @@ def solo_admin(view_func):
     """
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated:
+        principal = get_principal(request)
+        if not principal.is_authenticated:
             login_url = reverse('login:login')
             return redirect(f'{login_url}?next={request.path}')
 
-        if request.user.is_superuser or getattr(request.user, 'rol', '') == 'administrador':
+        if principal.puede_usar_panel:
             return view_func(request, *args, **kwargs)
 
         messages.error(
@@ -52,11 +65,12 @@ def solo_superadmin(view_func):
     """
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated:
+        principal = get_principal(request)
+        if not principal.is_authenticated:
             login_url = reverse('login:login')
             return redirect(f'{login_url}?next={request.path}')
 
-        if request.user.is_superuser:
+        if principal.es_superadmin:
             return view_func(request, *args, **kwargs)
 
         messages.error(
@@ -66,13 +80,46 @@ def solo_superadmin(view_func):
     return wrapper
 
 
+# ─────────────────────────────────────────────────────────────
+# TOGGLES
+# ─────────────────────────────────────────────────────────────
+
+def _alternar(modelo, pk, campo):
+    """
+    Invierte un booleano con un único UPDATE condicional
+    (SET campo = CASE WHEN campo THEN false ELSE true END): dos clics
+    simultáneos se serializan en la BD en vez de pisarse. El estado nuevo
+    se lee dentro de la misma transacción, con la fila aún bloqueada.
+
+    .update() no dispara post_save, así que se avisa con
+    `estado_alternado` para invalidar las páginas públicas afectadas.
+    """
+    with transaction.atomic():
+        filas = modelo.objects.filter(pk=pk).update(**{
+            campo: Case(When(**{campo: True}, then=Value(False)), default=Value(True)),
+            'updated_at': timezone.now(),
+        })
+        if not filas:
+            raise Http404(f'{modelo._meta.verbose_name} no encontrado')
+        obj = modelo.objects.get(pk=pk)
+        estado_alternado.send(sender=modelo, instance=obj, campo=campo)
+    return obj
+
+
+def _quiere_json(request):
+    """True si el toggle se llamó desde JS (fetch) y no desde el form."""
+    return ('application/json' in request.headers.get('Accept', '')
+            or request.headers.get('X-Requested-With') == 'XMLHttpRequest')
+
+
 # ─────────────────────────────────────────────────────────────
 # CONTEXTO GLOBAL (sidebar)
 # ─────────────────────────────────────────────────────────────
 
 def get_sidebar_context():
+    # Desde los rollups (administrador/estadisticas.py): no cuenta la tabla completa
     return {
-        'mensajes_nuevos': ContactMessage.objects.filter(status='new').count()
+        'mensajes_nuevos': estadisticas.totales()['new']
     }
 
 
@@ -82,13 +129,15 @@ def get_sidebar_context():
 
 @solo_admin
 def home(request):
+    mensajes = estadisticas.totales()
     context = {
         'total_servicios':     Service.objects.count(),
         'servicios_activos':   Service.objects.filter(is_active=True).count(),
         'total_posts':         BlogPost.objects.count(),
         'posts_publicados':    BlogPost.objects.filter(is_published=True).count(),
-        'total_mensajes':      ContactMessage.objects.count(),
-        'mensajes_nuevos':     ContactMessage.objects.filter(status='new').count(),
+        'total_mensajes':      sum(mensajes.values()),
+        'mensajes_nuevos':     mensajes['new'],
+        'graficos':            estadisticas.graficos(),
         'mensajes_recientes':  ContactMessage.objects.order_by('-created_at')[:5],
         'servicios_recientes': Service.objects.order_by('-created_at')[:3],
         'posts_recientes':     BlogPost.objects.order_by('-published_date')[:3],
@@ -117,7 +166,7 @@ def servicios_list(request):
 @solo_admin
 def servicio_crear(request):
     if request.method == 'POST':
-        form = ServiceForm(request.POST, request.FILES)
+        form = ServiceForm(request.POST, archivos_subidos(request))
         if form.is_valid():
             form.save()
             messages.success(request, '✅ Servicio creado correctamente.')
@@ -134,7 +183,7 @@ def servicio_crear(request):
 def servicio_editar(request, pk):
     servicio = get_object_or_404(Service, pk=pk)
     if request.method == 'POST':
-        form = ServiceForm(request.POST, request.FILES, instance=servicio)
+        form = ServiceForm(request.POST, archivos_subidos(request), instance=servicio)
         if form.is_valid():
             form.save()
             messages.success(request, '✅ Servicio actualizado correctamente.')
@@ -162,15 +211,97 @@ def servicio_eliminar(request, pk):
 
 
 @solo_admin
+@require_POST
 def servicio_toggle_activo(request, pk):
-    servicio = get_object_or_404(Service, pk=pk)
-    servicio.is_active = not servicio.is_active
-    servicio.save()
+    servicio = _alternar(Service, pk, 'is_active')
+    if _quiere_json(request):
+        return JsonResponse({'pk': servicio.pk, 'is_active': servicio.is_active})
     estado = 'activado' if servicio.is_active else 'desactivado'
     messages.success(request, f'✅ Servicio "{servicio.name}" {estado}.')
     return redirect('administrador:servicios_list')
 
 
+# ── Acciones en lote: un solo UPDATE y una sola invalidación ──
+
+def _leer_lote(request):
+    """Datos de una acción en lote: body JSON (fetch del listado) o form (sin JS)."""
+    if request.content_type == 'application/json':
+        try:
+            datos = json.loads(request.body or b'{}')
+        except ValueError:
+            datos = None
+        return datos if isinstance(datos, dict) else {}
+    return {'accion': request.POST.get('accion'),
+            'orden': request.POST.getlist('orden'), 'ids': request.POST.getlist('ids')}
+
+
+def _pks(valores):
+    try:
+        return [int(v) for v in valores]
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_lote(request, texto):
+    if _quiere_json(request):
+        return JsonResponse({'error': texto}, status=400)
+    messages.error(request, f'❌ {texto}')
+    return redirect('administrador:servicios_list')
+
+
+@solo_admin
+@require_POST
+def servicios_reordenar(request):
+    """
+    Recibe el orden completo (drag & drop del listado) y lo guarda con un
+    solo bulk_update, solo de las filas cuyo `order` cambió.
+    """
+    orden = _pks(_leer_lote(request).get('orden', []))
+    with transaction.atomic():
+        servicios = {s.pk: s for s in Service.objects.select_for_update().only('pk', 'order')}
+        if orden is None or len(orden) != len(servicios) or set(orden) != set(servicios):
+            return _error_lote(request, 'El orden debe incluir cada servicio una sola vez.')
+        ahora = timezone.now()
+        cambiados = []
+        for posicion, pk in enumerate(orden, start=1):
+            servicio = servicios[pk]
+            if servicio.order != posicion:
+                servicio.order, servicio.updated_at = posicion, ahora
+                cambiados.append(servicio)
+        if cambiados:
+            Service.objects.bulk_update(cambiados, ['order', 'updated_at'])
+            lote_actualizado.send(sender=Service, pks=[s.pk for s in cambiados],
+                                  campos=['order'])
+    if _quiere_json(request):
+        return JsonResponse({'orden': orden, 'cambiados': len(cambiados)})
+    messages.success(request, f'✅ Orden guardado ({len(cambiados)} servicio(s) movido(s)).')
+    return redirect('administrador:servicios_list')
+
+
+@solo_admin
+@require_POST
+def servicios_lote(request):
+    """Activa o desactiva los servicios elegidos con un único UPDATE."""
+    datos = _leer_lote(request)
+    accion, ids = datos.get('accion'), _pks(datos.get('ids', []))
+    if accion not in ('activar', 'desactivar') or not ids:
+        return _error_lote(request, 'Elige al menos un servicio y una acción.')
+    activo = accion == 'activar'
+    with transaction.atomic():
+        # Solo los que cambian de estado: son los que hay que invalidar
+        pks = list(Service.objects.select_for_update().filter(pk__in=ids)
+                   .exclude(is_active=activo).values_list('pk', flat=True))
+        if pks:
+            Service.objects.filter(pk__in=pks).update(is_active=activo,
+                                                      updated_at=timezone.now())
+            lote_actualizado.send(sender=Service, pks=pks, campos=['is_active'])
+    if _quiere_json(request):
+        return JsonResponse({'pks': pks, 'is_active': activo})
+    estado = 'activado(s)' if activo else 'desactivado(s)'
+    messages.success(request, f'✅ {len(pks)} servicio(s) {estado}.')
+    return redirect('administrador:servicios_list')
+
+
 # ─────────────────────────────────────────────────────────────
 # BLOG
 # ─────────────────────────────────────────────────────────────
@@ -189,7 +320,7 @@ def blog_list(request):
 @solo_admin
 def blog_crear(request):
     if request.method == 'POST':
-        form = BlogPostForm(request.POST, request.FILES)
+        form = BlogPostForm(request.POST, archivos_subidos(request))
         if form.is_valid():
             form.save()
             messages.success(request, '✅ Publicación creada correctamente.')
@@ -206,7 +337,7 @@ def blog_crear(request):
 def blog_editar(request, pk):
     post = get_object_or_404(BlogPost, pk=pk)
     if request.method == 'POST':
-        form = BlogPostForm(request.POST, request.FILES, instance=post)
+        form = BlogPostForm(request.POST, archivos_subidos(request), instance=post)
         if form.is_valid():
             form.save()
             messages.success(
@@ -235,10 +366,11 @@ def blog_eliminar(request, pk):
 
 
 @solo_admin
+@require_POST
 def blog_toggle_publicado(request, pk):
-    post = get_object_or_404(BlogPost, pk=pk)
-    post.is_published = not post.is_published
-    post.save()
+    post = _alternar(BlogPost, pk, 'is_published')
+    if _quiere_json(request):
+        return JsonResponse({'pk': post.pk, 'is_published': post.is_published})
     estado = 'publicado' if post.is_published else 'despublicado'
     messages.success(request, f'✅ "{post.title}" {estado}.')
     return redirect('administrador:blog_list')
@@ -344,7 +476,7 @@ def usuario_eliminar(request, pk):
     """Elimina un usuario con confirmación. No puede eliminarse a sí mismo."""
     usuario = get_object_or_404(User, pk=pk, is_superuser=False)
 
-    if usuario == request.user:
+    if usuario.pk == get_principal(request).pk:
         messages.error(request, 'No puedes eliminar tu propia cuenta.')
         return redirect('administrador:usuarios_list')
 
@@ -0,0 +1,169 @@
+"""
+api/recursos.py
+
+Recursos de la API pública (/api/v1/): qué filas expone cada uno, en qué
+orden y con qué campos.
+
+Cada página (o detalle) lee solo sus filas con .values() (sin instanciar
+modelos ni pasar por forms/templates) y arma los dicts con tipos JSON;
+api/views.py guarda el resultado ya codificado en la capa de cache, una
+entrada por página/cursor o por detalle, bajo el sello del recurso
+(api/signals.py lo cambia). Así ninguna entrada crece con el catálogo.
+
+El orden es una clave de enteros por fila (p.ej. (order, id)); el cursor
+de paginación es esa clave y la página siguiente se pide con un filtro
+keyset (despues()), así que sigue siendo válido aunque entren o salgan
+filas entre una página y la siguiente.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.urls import reverse
+
+from administrador.models import BlogPost, Service
+
+DEFAULTS = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+    'TIMEOUT': 24 * 60 * 60,
+    'CACHE': 'default',
+    'MAX_AGE': 60,
+    'CORS_ORIGIN': '*',
+}
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'API', {})}
+
+
+def _microsegundos(dt):
+    """Entero exacto (sin pasar por float) para la clave de orden."""
+    return (dt - _EPOCA) // (datetime.resolution)
+
+
+def _desde_microsegundos(n):
+    return _EPOCA + timedelta(microseconds=n)
+
+
+def _imagen(fila, base, modelo):
+    if not fila['image'] or fila['image_status'] != modelo.IMAGEN_OK:
+        return None
+    url = default_storage.url(fila['image'])
+    return {
+        'url': base + url if url.startswith('/') else url,
+        'width': fila['image_width'],
+        'height': fila['image_height'],
+        'color': fila['image_color'] or None,
+        'placeholder': fila['image_placeholder'] or None,
+    }
+
+
+_COLUMNAS_IMAGEN = ('image', 'image_status', 'image_width', 'image_height',
+                    'image_color', 'image_placeholder')
+
+
+class Recurso:
+    nombre = ''
+    modelo = None
+    campos = ()
+    largo_clave = 2             # enteros en la clave de orden (y en el cursor)
+
+    @property
+    def clave_version(self):
+        return f'api:version:{self.nombre}'
+
+    def consulta(self):
+        raise NotImplementedError
+
+    def clave(self, fila):
+        raise NotImplementedError
+
+    def despues(self, clave):
+        """Filtro de las filas que van después de la clave de orden `clave`."""
+        raise NotImplementedError
+
+    def serializar(self, fila, base):
+        raise NotImplementedError
+
+    def pagina(self, base, filtro, limite):
+        """([(clave de orden, dict)], hay más) de una página: una consulta."""
+        consulta = self.consulta()
+        if filtro is not None:
+            consulta = consulta.filter(filtro)
+        filas = list(consulta[:limite + 1])
+        return ([(self.clave(f), self.serializar(f, base)) for f in filas[:limite]],
+                len(filas) > limite)
+
+    def uno(self, base, pk):
+        """El dict de la fila `pk`, o None si no existe o no se publica."""
+        fila = self.consulta().filter(id=pk).first()
+        return None if fila is None else self.serializar(fila, base)
+
+
+class Servicios(Recurso):
+    nombre = 'servicios'
+    modelo = Service
+    campos = ('id', 'name', 'description', 'price', 'order', 'url', 'image', 'updated_at')
+
+    def consulta(self):
+        return (Service.objects.filter(is_active=True).order_by('order', 'id')
+                .values('id', 'name', 'description', 'price', 'order', 'updated_at',
+                        *_COLUMNAS_IMAGEN))
+
+    def clave(self, fila):
+        return (fila['order'], fila['id'])
+
+    def despues(self, clave):
+        orden, pk = clave
+        return Q(order__gt=orden) | Q(order=orden, id__gt=pk)
+
+    def serializar(self, fila, base):
+        return {
+            'id': fila['id'],
+            'name': fila['name'],
+            'description': fila['description'],
+            'price': int(fila['price']),
+            'order': fila['order'],
+            'url': base + reverse('index:servicio_detalle', args=[fila['id']]),
+            'image': _imagen(fila, base, Service),
+            'updated_at': fila['updated_at'].isoformat(),
+        }
+
+
+class Novedades(Recurso):
+    nombre = 'novedades'
+    modelo = BlogPost
+    campos = ('id', 'title', 'excerpt', 'content', 'published_date', 'url', 'image',
+              'updated_at')
+
+    def consulta(self):
+        return (BlogPost.objects.filter(is_published=True).order_by('-published_date', '-id')
+                .values('id', 'title', 'content', 'published_date', 'updated_at',
+                        *_COLUMNAS_IMAGEN))
+
+    def clave(self, fila):
+        # Descendente por fecha: se niega para que la clave crezca con la página
+        return (-_microsegundos(fila['published_date']), -fila['id'])
+
+    def despues(self, clave):
+        fecha, pk = _desde_microsegundos(-clave[0]), -clave[1]
+        return Q(published_date__lt=fecha) | Q(published_date=fecha, id__lt=pk)
+
+    def serializar(self, fila, base):
+        return {
+            'id': fila['id'],
+            'title': fila['title'],
+            'excerpt': BlogPost(content=fila['content']).get_excerpt(),
+            'content': fila['content'],
+            'published_date': fila['published_date'].isoformat(),
+            'url': f"{base}{reverse('index:novedades')}#post-{fila['id']}",
+            'image': _imagen(fila, base, BlogPost),
+            'updated_at': fila['updated_at'].isoformat(),
+        }
+
+
+RECURSOS = {r.nombre: r for r in (Servicios(), Novedades())}
@@ -0,0 +1,28 @@
+"""
+api/signals.py
+Cambia el sello de versión de cada recurso de la API (api/recursos.py)
+cuando cambia su contenido, incluidos los toggles y las acciones en lote
+del panel (UPDATE directo, ver administrador.signals.estado_alternado y
+lote_actualizado).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from administrador.models import BlogPost, Service
+from administrador.signals import estado_alternado, lote_actualizado
+from Pilatesreserva import cache as cache_contenido
+from .recursos import RECURSOS
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(estado_alternado, sender=Service)
+@receiver(lote_actualizado, sender=Service)
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(estado_alternado, sender=BlogPost)
+@receiver(lote_actualizado, sender=BlogPost)
+def contenido_cambiado(sender, using=None, **kwargs):
+    for recurso in RECURSOS.values():
+        if recurso.modelo is sender:
+            cache_contenido.cambiar_version(recurso.clave_version, using=using)
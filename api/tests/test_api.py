@@ -0,0 +1,141 @@
+import base64
+import json
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from administrador.models import BlogPost, Service
+from administrador.signals import estado_alternado
+from api import recursos
+
+
+@override_settings(SITE_URL='https://pilates.test')
+class ApiServiciosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.servicios = [Service.objects.create(name=f'S{i}', description='.', price=1000 * i,
+                                                 order=i) for i in range(5)]
+        Service.objects.create(name='Oculto', description='.', price=1, is_active=False)
+
+    def _get(self, url, **params):
+        r = self.client.get(url, params)
+        return r, json.loads(r.content)
+
+    def test_lista_con_cursor(self):
+        url = reverse('api:servicios')
+        r, datos = self._get(url, limit=2)
+        self.assertEqual(r['Content-Type'], 'application/json')
+        self.assertEqual([s['name'] for s in datos['results']], ['S0', 'S1'])
+        self.assertEqual(datos['results'][1]['price'], 1000)
+        self.assertEqual(datos['results'][1]['url'],
+                         f'https://pilates.test/servicios/{self.servicios[1].pk}/')
+        self.assertIn('rel="next"', r['Link'])
+
+        vistos = [s['name'] for s in datos['results']]
+        siguiente = datos['next']
+        while siguiente:
+            # Entre página y página se agrega un servicio al principio: el cursor no se corre
+            Service.objects.create(name='Nuevo', description='.', price=1, order=-1)
+            r = self.client.get(siguiente.replace('https://pilates.test', ''))
+            datos = json.loads(r.content)
+            vistos += [s['name'] for s in datos['results']]
+            siguiente = datos['next']
+        self.assertEqual(vistos, ['S0', 'S1', 'S2', 'S3', 'S4'])
+
+    def test_seleccion_de_campos_y_errores(self):
+        _r, datos = self._get(reverse('api:servicios'), fields='id,name')
+        self.assertEqual(set(datos['results'][0]), {'id', 'name'})
+        r, datos = self._get(reverse('api:servicios'), fields='id,password')
+        self.assertEqual(r.status_code, 400)
+        self.assertIn('password', datos['error'])
+        self.assertEqual(self.client.get(reverse('api:servicios'), {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api:servicios'),
+                                         {'cursor': '%%%'}).status_code, 400)
+        self.assertEqual(self.client.post(reverse('api:servicios')).status_code, 405)
+
+    def test_detalle(self):
+        s = self.servicios[2]
+        _r, datos = self._get(reverse('api:servicio', args=[s.pk]), fields='name')
+        self.assertEqual(datos, {'name': 'S2'})
+        r = self.client.get(reverse('api:servicio', args=[999]))
+        self.assertEqual(r.status_code, 404)
+
+    def test_paginas_en_su_propio_alias_de_cache(self):
+        caches['api'].clear()
+        self.client.get(reverse('api:servicios'), {'limit': 3})
+        self.assertTrue(any(k for k in caches['api']._cache if 'api:pagina:' in k))
+        self.assertFalse(any(k for k in cache._cache if 'api:pagina:' in k))
+
+    def test_etag_y_versionado(self):
+        url = reverse('api:servicios')
+        r = self.client.get(url)
+        with self.assertNumQueries(0):
+            r304 = self.client.get(url, HTTP_IF_NONE_MATCH=r['ETag'])
+        self.assertEqual(r304.status_code, 304)
+        self.assertEqual(r304['ETag'], r['ETag'])
+        self.assertEqual(r304['Access-Control-Allow-Origin'], '*')
+        with self.assertNumQueries(1):       # otra página/campos: su propia entrada
+            self.client.get(url, {'fields': 'id'})
+        with self.assertNumQueries(0):
+            self.client.get(url, {'fields': 'id'})
+
+        s = self.servicios[0]
+        s.name = 'Renombrado'
+        s.save()
+        r2 = self.client.get(url, HTTP_IF_NONE_MATCH=r['ETag'])
+        self.assertEqual(r2.status_code, 200)
+        self.assertEqual(json.loads(r2.content)['results'][0]['name'], 'Renombrado')
+
+    def test_cada_pagina_serializa_solo_sus_filas(self):
+        original = recursos.Servicios.serializar
+        llamadas = []
+
+        def contar(recurso, fila, base):
+            llamadas.append(fila['id'])
+            return original(recurso, fila, base)
+        with mock.patch.object(recursos.Servicios, 'serializar', contar):
+            for params in ({'limit': 2}, {'limit': 2}):
+                self.client.get(reverse('api:servicios'), params)
+            self.assertEqual(llamadas, [self.servicios[0].pk, self.servicios[1].pk])
+            self.client.get(reverse('api:servicio', args=[self.servicios[3].pk]))
+        self.assertEqual(llamadas[2:], [self.servicios[3].pk])
+
+    def test_cursor_con_forma_invalida(self):
+        def cursor(clave):
+            return base64.urlsafe_b64encode(json.dumps(clave).encode()).decode()
+        for nombre, clave in (('api:servicios', [1]), ('api:servicios', [1, 2, 3]),
+                              ('api:servicios', [2 ** 70, 1]), ('api:servicios', [True, 1]),
+                              ('api:novedades', []), ('api:novedades', [5]),
+                              ('api:novedades', [False, 1]), ('api:novedades', {'a': 1}),
+                              ('api:novedades', [-2 ** 62, 1])):   # fecha fuera de rango
+            with self.subTest(clave=clave):
+                r = self.client.get(reverse(nombre), {'cursor': cursor(clave)})
+                self.assertEqual(r.status_code, 400)
+
+
+@override_settings(SITE_URL='https://pilates.test')
+class ApiNovedadesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_orden_por_fecha_y_borradores_fuera(self):
+        for dia in (3, 1, 2):
+            BlogPost.objects.create(title=f'Día {dia}', content='uno dos tres',
+                                    published_date=f'2026-01-0{dia}T10:00Z')
+        BlogPost.objects.create(title='Borrador', content='.', is_published=False)
+        r = self.client.get(reverse('api:novedades'), {'limit': 2})
+        datos = json.loads(r.content)
+        self.assertEqual([p['title'] for p in datos['results']], ['Día 3', 'Día 2'])
+        self.assertEqual(datos['results'][0]['excerpt'], 'uno dos tres')
+        r = self.client.get(datos['next'].replace('https://pilates.test', ''))
+        self.assertEqual([p['title'] for p in json.loads(r.content)['results']], ['Día 1'])
+
+    def test_toggle_del_panel_cambia_la_version(self):
+        post = BlogPost.objects.create(title='Hola', content='.')
+        r = self.client.get(reverse('api:novedades'))
+        BlogPost.objects.filter(pk=post.pk).update(is_published=False)
+        estado_alternado.send(sender=BlogPost, instance=post, campo='is_published')
+        r2 = self.client.get(reverse('api:novedades'), HTTP_IF_NONE_MATCH=r['ETag'])
+        self.assertEqual(json.loads(r2.content)['results'], [])
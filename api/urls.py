@@ -0,0 +1,15 @@
+"""
+api/urls.py — API JSON pública, versión 1 (montada en /api/v1/).
+"""
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('servicios/',          views.lista,   {'recurso': 'servicios'}, name='servicios'),
+    path('servicios/<int:pk>/', views.detalle, {'recurso': 'servicios'}, name='servicio'),
+    path('novedades/',          views.lista,   {'recurso': 'novedades'}, name='novedades'),
+    path('novedades/<int:pk>/', views.detalle, {'recurso': 'novedades'}, name='novedad'),
+]
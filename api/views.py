@@ -0,0 +1,181 @@
+"""
+api/views.py
+API JSON de solo lectura para la app móvil y los widgets de partners.
+
+  GET /api/v1/servicios/            ?limit=20&cursor=…&fields=id,name,price
+  GET /api/v1/servicios/<id>/       ?fields=…
+  GET /api/v1/novedades/            (mismos parámetros)
+  GET /api/v1/novedades/<id>/
+
+Respuesta de lista: {"results": [...], "next": url | null}; también en
+el header Link (rel="next").
+
+El ETag se calcula con el sello de versión del recurso + los parámetros,
+ANTES de armar nada: un If-None-Match que coincide responde 304 sin tocar
+la BD ni el cache de páginas. Cada página (por cursor, límite y campos) y
+cada detalle, ya serializados (bytes), quedan en la capa de cache hasta
+que cambie la versión; armarlos cuesta una consulta acotada al límite.
+Esas entradas van al alias API['CACHE'] (acotado, aparte de "default"):
+como la clave la eligen los parámetros del cliente, no deben poder
+desalojar los sellos de versión ni el throttling del login.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+from index.seo import base_url
+from Pilatesreserva import cache as cache_contenido
+from .recursos import RECURSOS, config
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa json de la stdlib
+    orjson = None
+
+
+class ParametroInvalido(ValueError):
+    pass
+
+
+def _dumps(datos):
+    if orjson is not None:
+        return orjson.dumps(datos)
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def codificar_cursor(clave):
+    return base64.urlsafe_b64encode(_dumps(list(clave))).rstrip(b'=').decode()
+
+
+def decodificar_cursor(texto, largo):
+    try:
+        clave = json.loads(base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4)))
+    except (binascii.Error, ValueError):
+        raise ParametroInvalido('cursor inválido')
+    # type() y no isinstance(): true/false no valen como enteros
+    if not isinstance(clave, list) or len(clave) != largo or not all(
+            type(v) is int and -2 ** 63 <= v < 2 ** 63 for v in clave):
+        raise ParametroInvalido('cursor inválido')
+    return tuple(clave)
+
+
+def _filtro_cursor(recurso, texto):
+    """Filtro keyset de la página que sigue al cursor (None = primera)."""
+    if not texto:
+        return None
+    clave = decodificar_cursor(texto, recurso.largo_clave)
+    try:
+        return recurso.despues(clave)
+    except (ValueError, OverflowError, IndexError, TypeError):   # p.ej. fecha fuera de rango
+        raise ParametroInvalido('cursor inválido')
+
+
+def _campos(request, recurso):
+    pedidos = [c for c in request.GET.get('fields', '').split(',') if c]
+    desconocidos = [c for c in pedidos if c not in recurso.campos]
+    if desconocidos:
+        raise ParametroInvalido('campos desconocidos: %s (disponibles: %s)' % (
+            ', '.join(desconocidos), ', '.join(recurso.campos)))
+    return tuple(dict.fromkeys(pedidos))
+
+
+def _limite(request):
+    cfg = config()
+    try:
+        limite = int(request.GET.get('limit', cfg['PAGE_SIZE']))
+    except ValueError:
+        raise ParametroInvalido('limit debe ser un entero')
+    if not 1 <= limite <= cfg['MAX_PAGE_SIZE']:
+        raise ParametroInvalido(f"limit debe estar entre 1 y {cfg['MAX_PAGE_SIZE']}")
+    return limite
+
+
+def _recortar(datos, campos):
+    return {c: datos[c] for c in campos} if campos else datos
+
+
+def _responder(request, recurso, firma, construir):
+    """304 si el ETag coincide; si no, el cuerpo cacheado (o construido)."""
+    cfg = config()
+    version = cache_contenido.version(recurso.clave_version)
+    huella = hashlib.md5(f'{version}|{firma}'.encode()).hexdigest()
+    etag = f'"{huella}"'
+    respuesta = HttpResponse(content_type='application/json')
+    respuesta['ETag'] = etag
+    respuesta['Access-Control-Allow-Origin'] = cfg['CORS_ORIGIN']
+    patch_cache_control(respuesta, public=True, max_age=cfg['MAX_AGE'])
+    condicional = get_conditional_response(request, etag=etag, response=respuesta)
+    if condicional is not respuesta:
+        # El 304 solo copia algunos headers de `respuesta`: sin este, el
+        # navegador descarta la revalidación de un origen cruzado
+        condicional['Access-Control-Allow-Origin'] = cfg['CORS_ORIGIN']
+        return condicional
+    # Alias propio (API['CACHE']): las claves las multiplica el cliente
+    cuerpo, estado, link = cache_contenido.obtener(
+        f'api:pagina:{huella}', lambda: construir(version), cfg['TIMEOUT'],
+        alias=cfg['CACHE'])
+    respuesta.content = cuerpo
+    respuesta.status_code = estado
+    if link:
+        respuesta['Link'] = f'<{link}>; rel="next"'
+    return respuesta
+
+
+def _error(mensaje, estado=400):
+    respuesta = HttpResponse(_dumps({'error': mensaje}), status=estado,
+                             content_type='application/json')
+    respuesta['Access-Control-Allow-Origin'] = config()['CORS_ORIGIN']
+    return respuesta
+
+
+@require_safe
+def lista(request, recurso):
+    recurso = RECURSOS[recurso]
+    try:
+        campos = _campos(request, recurso)
+        limite = _limite(request)
+        cursor = request.GET.get('cursor')
+        filtro = _filtro_cursor(recurso, cursor)
+    except ParametroInvalido as e:
+        return _error(str(e))
+    base = base_url(request)
+
+    def construir(version):
+        trozo, hay_mas = recurso.pagina(base, filtro, limite)
+        siguiente = None
+        if hay_mas:
+            # Solo los parámetros que entran en la firma: la página se comparte
+            parametros = {'limit': limite, 'cursor': codificar_cursor(trozo[-1][0])}
+            if campos:
+                parametros['fields'] = ','.join(campos)
+            siguiente = f'{base}{request.path}?{urlencode(parametros)}'
+        cuerpo = _dumps({'results': [_recortar(d, campos) for _c, d in trozo],
+                         'next': siguiente})
+        return cuerpo, 200, siguiente
+
+    firma = f'{base}|{",".join(campos)}|{limite}|{cursor or ""}'
+    return _responder(request, recurso, firma, construir)
+
+
+@require_safe
+def detalle(request, recurso, pk):
+    recurso = RECURSOS[recurso]
+    try:
+        campos = _campos(request, recurso)
+    except ParametroInvalido as e:
+        return _error(str(e))
+    base = base_url(request)
+
+    def construir(version):
+        datos = recurso.uno(base, pk)
+        if datos is None:
+            return _dumps({'error': 'no encontrado'}), 404, None
+        return _dumps(_recortar(datos, campos)), 200, None
+
+    return _responder(request, recurso, f'{base}|{",".join(campos)}|{pk}', construir)
@@ -0,0 +1,95 @@
+"""
+index/catalogo.py
+
+Snapshot en memoria (por proceso) del catálogo de servicios activos.
+
+index, servicios y servicio_detalle muestran siempre el mismo puñado de
+filas de Service (unas decenas como mucho). En vez de consultarlas en
+cada request, cada proceso guarda un Catalogo inmutable (tupla ordenada
++ índice por pk) y solo lo revalida contra un sello de versión guardado
+en el cache compartido (CATALOGO['CACHE_ALIAS']):
+
+  - request normal: un GET del sello al cache, cero consultas a la BD.
+  - al guardar/borrar/alternar un Service (index/signals.py) se llama
+    a invalidar(), que cambia el sello; cada proceso reconstruye su
+    snapshot en la siguiente request.
+
+El sello se lee ANTES de consultar la BD: si otro proceso lo cambia en
+medio, el snapshot queda con el sello viejo y se reconstruye de nuevo.
+
+Las instancias del snapshot se comparten entre requests: solo lectura.
+"""
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from administrador.models import Service
+from Pilatesreserva import cache as cache_contenido
+
+CLAVE_VERSION = 'catalogo:version'
+
+# Cuántos "otros servicios" muestra servicio_detalle en la barra lateral
+OTROS_EN_DETALLE = 3
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Catalogo:
+    version: str
+    servicios: tuple
+    por_pk: MappingProxyType
+
+    def get(self, pk):
+        return self.por_pk.get(pk)
+
+    def otros(self, pk, n=OTROS_EN_DETALLE):
+        """Los primeros `n` servicios activos distintos de `pk`."""
+        return tuple(s for s in self.servicios if s.pk != pk)[:n]
+
+
+def _alias():
+    return getattr(settings, 'CATALOGO', {}).get('CACHE_ALIAS', 'default')
+
+
+def _version_actual():
+    return cache_contenido.version(CLAVE_VERSION, alias=_alias())
+
+
+def _construir(version):
+    global _snapshot
+    with _lock:
+        if _snapshot is not None and _snapshot.version == version:
+            return _snapshot            # otro hilo ya lo reconstruyó
+        servicios = tuple(Service.objects.filter(is_active=True).order_by('order'))
+        _snapshot = Catalogo(version, servicios,
+                             MappingProxyType({s.pk: s for s in servicios}))
+        return _snapshot
+
+
+def actual():
+    """Catalogo vigente; consulta la BD solo si el sello cambió."""
+    version = _version_actual()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    return _construir(version)
+
+
+async def aactual():
+    """Versión async de actual(): el sello por la API async del cache."""
+    version = await caches[_alias()].aget(CLAVE_VERSION)
+    snapshot = _snapshot
+    if version is not None and snapshot is not None and snapshot.version == version:
+        return snapshot
+    return await sync_to_async(actual)()
+
+
+def invalidar(using=None):
+    """Cambia el sello: cada proceso reconstruye en su próxima request."""
+    cache_contenido.cambiar_version(CLAVE_VERSION, alias=_alias(), using=using)
@@ -0,0 +1,14 @@
+"""
+index/context_processors.py
+Parámetros de los fragmentos {% fragmento %} de los templates públicos
+(index/templatetags/fragmentos.py).
+"""
+from django.conf import settings
+
+
+def fragmentos(request):
+    conf = getattr(settings, 'TEMPLATE_FRAGMENT_CACHE', {})
+    return {
+        'fragment_ttl': conf.get('TIMEOUT', 0),
+        'fragment_version': conf.get('VERSION', '1'),
+    }
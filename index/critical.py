@@ -0,0 +1,83 @@
+"""
+index/critical.py
+
+CSS crítico de las páginas públicas más visitadas.
+
+En build (`python manage.py critical_css`) se renderiza cada página, se
+toma el HTML "sobre el pliegue" (navbar + primera sección, ver
+html_sobre_el_pliegue) y de site.css / navbar.css se quedan solo las
+reglas cuyos selectores usan clases presentes en ese HTML. El resultado
+queda en static/css/critical/<página>.css.
+
+base_index.html lo inserta inline con {% critical_css as critico %} y,
+si existe, carga las hojas completas de forma asíncrona (preload +
+onload), así el primer pintado no espera los ~60 KB de site.css.
+
+Hay que regenerarlo al cambiar site.css/navbar.css o el hero de una de
+estas páginas; `critical_css --check` falla si quedó desactualizado.
+"""
+import functools
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.urls import reverse
+
+from . import prerender, vendor
+
+# url_name → nombre de la URL a renderizar
+PAGINAS = {
+    'index': 'index:index',
+    'servicios': 'index:servicios',
+    'nosotros': 'index:nosotros',
+}
+HOJAS = ('css/site.css', 'css/navbar.css')
+DIRECTORIO = 'css/critical'
+
+_re_body = re.compile(r'<body\b.*', re.S | re.I)
+_re_section = re.compile(r'<section\b', re.I)
+_re_espacios = re.compile(r'\s+')
+
+
+def html_sobre_el_pliegue(html):
+    """Desde <body> hasta antes de la segunda <section> (navbar + hero)."""
+    m = _re_body.search(html)
+    cuerpo = m.group(0) if m else html
+    secciones = [s.start() for s in _re_section.finditer(cuerpo)]
+    return cuerpo[:secciones[1]] if len(secciones) > 1 else cuerpo
+
+
+def extraer(html, hojas=HOJAS):
+    usadas = vendor.clases_usadas_en(html_sobre_el_pliegue(html))
+    partes = []
+    for hoja in hojas:
+        ruta = finders.find(hoja)
+        css = Path(ruta).read_text()
+        partes.append(vendor.purgar_css(css, usadas, safelist=()))
+    return _re_espacios.sub(' ', ''.join(partes)).strip()
+
+
+def generar(nombre):
+    """Renderiza la página y devuelve su CSS crítico."""
+    html = prerender.renderizar(reverse(PAGINAS[nombre]))
+    return extraer(html.decode())
+
+
+def ruta_archivo(nombre):
+    return Path(settings.STATICFILES_DIRS[0]) / DIRECTORIO / f'{nombre}.css'
+
+
+@functools.lru_cache(maxsize=None)
+def _leer(nombre):
+    ruta = finders.find(f'{DIRECTORIO}/{nombre}.css')
+    return Path(ruta).read_text() if ruta else ''
+
+
+def inline(nombre):
+    """CSS crítico de la página (o '' si no hay). En DEBUG se relee siempre."""
+    if nombre not in PAGINAS or not getattr(settings, 'CRITICAL_CSS_ENABLED', True):
+        return ''
+    if settings.DEBUG:
+        _leer.cache_clear()
+    return _leer(nombre)
@@ -0,0 +1,41 @@
+"""
+manage.py critical_css
+Genera el CSS crítico de las páginas públicas (ver index/critical.py).
+
+  python manage.py critical_css                  # todas (index, servicios, nosotros)
+  python manage.py critical_css --page index
+  python manage.py critical_css --check          # CI: falla si está desactualizado
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from index import critical
+
+
+class Command(BaseCommand):
+    help = 'Extrae el CSS sobre el pliegue de las páginas públicas a static/css/critical/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page', action='append', choices=list(critical.PAGINAS),
+                            help='Página a generar (repetible). Por defecto, todas.')
+        parser.add_argument('--check', action='store_true',
+                            help='No escribe; sale con error si algún archivo difiere.')
+
+    def handle(self, *args, **opts):
+        desactualizadas = []
+        for nombre in opts['page'] or critical.PAGINAS:
+            css = critical.generar(nombre)
+            ruta = critical.ruta_archivo(nombre)
+            actual = ruta.read_text() if ruta.exists() else None
+            if opts['check']:
+                if actual != css:
+                    desactualizadas.append(nombre)
+                continue
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_text(css)
+            self.stdout.write(f'  {nombre}: {len(css.encode()) / 1024:.1f} KB → {ruta}')
+        if desactualizadas:
+            raise CommandError('CSS crítico desactualizado: ' + ', '.join(desactualizadas)
+                               + ' (correr manage.py critical_css)')
+        critical._leer.cache_clear()
+        if not opts['check']:
+            self.stdout.write(self.style.SUCCESS('CSS crítico generado.'))
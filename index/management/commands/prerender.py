@@ -0,0 +1,33 @@
+"""
+manage.py prerender
+Publica a disco las páginas públicas (ver index/prerender.py).
+
+  python manage.py prerender                   # todo el sitio
+  python manage.py prerender --path /servicios/ --path /
+  python manage.py prerender --clean           # borra el directorio antes
+"""
+import shutil
+
+from django.core.management.base import BaseCommand
+
+from index import prerender
+
+
+class Command(BaseCommand):
+    help = 'Pre-renderiza las páginas públicas a HTML estático (+ .gz/.br).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', default=[],
+                            help='Ruta a publicar (repetible). Por defecto, todas.')
+        parser.add_argument('--clean', action='store_true',
+                            help='Vacía PRERENDER_ROOT antes de publicar.')
+
+    def handle(self, *args, **opts):
+        if opts['clean']:
+            shutil.rmtree(prerender.raiz(), ignore_errors=True)
+        paginas = opts['path'] or prerender.todas_las_paginas()
+        escritas = prerender.publicar(paginas)
+        for path in escritas:
+            self.stdout.write(f'  {path} → {prerender.ruta_archivo(path)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(escritas)} página(s) publicadas en {prerender.raiz()}'))
@@ -0,0 +1,95 @@
+"""
+manage.py vendor_assets
+Copia Bootstrap y Bootstrap Icons a static/vendor/, purgados contra
+nuestros templates (ver index/vendor.py).
+
+  python manage.py vendor_assets                  # descarga del CDN
+  python manage.py vendor_assets --source ~/dl    # usa archivos ya descargados
+  python manage.py vendor_assets --no-purge       # copia completa (debug)
+
+El subset de la fuente de íconos usa fontTools (pip install fonttools
+brotli); sin él se copia la fuente completa y solo se recorta el CSS.
+Correr de nuevo cada vez que se agreguen clases o íconos nuevos en los
+templates, y después collectstatic como siempre.
+"""
+import shutil
+import tempfile
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from index import vendor
+
+
+class Command(BaseCommand):
+    help = 'Vendoriza Bootstrap/Bootstrap Icons en static/vendor, purgados y recortados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='Directorio con los archivos originales '
+                            f'({", ".join(vendor.FUENTES)}). Por defecto se descargan.')
+        parser.add_argument('--dest', help='Destino (por defecto <STATICFILES_DIRS[0]>/vendor).')
+        parser.add_argument('--no-purge', action='store_true',
+                            help='No purga el CSS ni recorta la fuente.')
+
+    def handle(self, *args, **opts):
+        destino = Path(opts['dest'] or Path(settings.STATICFILES_DIRS[0]) / 'vendor')
+        with tempfile.TemporaryDirectory() as tmp:
+            origen = Path(opts['source']) if opts['source'] else self._descargar(Path(tmp))
+            faltan = [n for n in vendor.FUENTES if not (origen / n).exists()]
+            if faltan:
+                raise CommandError(f'Faltan en {origen}: {", ".join(faltan)}')
+            self._construir(origen, destino, purgar=not opts['no_purge'])
+        vendor._local.cache_clear()
+
+    def _descargar(self, tmp):
+        for nombre, url in vendor.FUENTES.items():
+            self.stdout.write(f'  ↓ {url}')
+            try:
+                with urllib.request.urlopen(url, timeout=30) as r:
+                    (tmp / nombre).write_bytes(r.read())
+            except OSError as e:
+                raise CommandError(f'No se pudo descargar {url}: {e}')
+        return tmp
+
+    def _construir(self, origen, destino, purgar):
+        usadas = vendor.clases_usadas() if purgar else None
+        bs, iconos = destino / 'bootstrap', destino / 'bootstrap-icons'
+        (iconos / 'fonts').mkdir(parents=True, exist_ok=True)
+        bs.mkdir(parents=True, exist_ok=True)
+
+        css = (origen / 'bootstrap.min.css').read_text()
+        self._escribir(bs / 'bootstrap.min.css', vendor.purgar_css(css, usadas) if purgar else css,
+                       antes=len(css.encode()))
+        shutil.copyfile(origen / 'bootstrap.bundle.min.js', bs / 'bootstrap.bundle.min.js')
+
+        css = (origen / 'bootstrap-icons.css').read_text()
+        fuente, fonts = origen / 'bootstrap-icons.woff', iconos / 'fonts'
+        if purgar:
+            css_iconos, codepoints = vendor.recortar_iconos(css, usadas)
+            self.stdout.write(f'  {len(codepoints)} ícono(s) en uso')
+        else:
+            css_iconos, codepoints = vendor.recortar_iconos(
+                css, set(vendor._re_clase.findall(css)))
+        formatos = ['woff']
+        if purgar and vendor.subset_fuente(fuente, fonts / 'bootstrap-icons.woff',
+                                           codepoints, 'woff'):
+            try:
+                vendor.subset_fuente(fuente, fonts / 'bootstrap-icons.woff2', codepoints, 'woff2')
+                formatos.insert(0, 'woff2')
+            except ImportError:   # woff2 necesita el paquete brotli
+                pass
+        else:
+            if purgar:
+                self.stderr.write('fontTools no está instalado: se copia la fuente completa.')
+            shutil.copyfile(fuente, fonts / 'bootstrap-icons.woff')
+        self._escribir(iconos / 'bootstrap-icons.min.css',
+                       vendor.font_face(formatos) + css_iconos, antes=len(css.encode()))
+
+        self.stdout.write(self.style.SUCCESS(f'Assets en {destino}'))
+
+    def _escribir(self, ruta, texto, antes):
+        ruta.write_text(texto)
+        despues = len(texto.encode())
+        self.stdout.write(f'  {ruta.name}: {antes / 1024:.0f} KB → {despues / 1024:.0f} KB')
@@ -0,0 +1,162 @@
+"""
+index/prerender.py
+
+Modo "publicar a disco": renderiza las páginas públicas a HTML estático
+(con variantes precomprimidas .gz y, si está instalado brotli, .br) en
+settings.PRERENDER_ROOT, para que el servidor web las entregue sin pasar
+por Django.
+
+  /                   → <root>/index.html
+  /nosotros/          → <root>/nosotros/index.html
+  /servicios/         → <root>/servicios/index.html
+  /servicios/<pk>/    → <root>/servicios/<pk>/index.html
+  /novedades/         → <root>/novedades/index.html
+
+Ejemplo nginx (con gzip_static y el módulo brotli):
+
+    location / {
+        root /srv/pilates/prerender;
+        gzip_static on;  brotli_static on;
+        try_files $uri/index.html @django;
+    }
+
+Solo se re-renderizan las páginas afectadas por un cambio de Service o
+BlogPost (ver paginas_afectadas_* y index/signals.py).
+"""
+import gzip
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from administrador.models import Service
+from .catalogo import OTROS_EN_DETALLE
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli solo se generan .gz
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+PAGINAS_FIJAS = ['index:index', 'index:nosotros', 'index:servicios', 'index:novedades']
+
+
+def habilitado():
+    return getattr(settings, 'PRERENDER_ENABLED', False)
+
+
+def raiz():
+    return Path(getattr(settings, 'PRERENDER_ROOT', settings.BASE_DIR / 'prerender'))
+
+
+def ruta_archivo(path):
+    return raiz() / path.strip('/') / 'index.html'
+
+
+def todas_las_paginas():
+    paginas = [reverse(nombre) for nombre in PAGINAS_FIJAS]
+    for pk in Service.objects.filter(is_active=True).values_list('pk', flat=True):
+        paginas.append(reverse('index:servicio_detalle', args=[pk]))
+    return paginas
+
+
+def paginas_afectadas_servicio(servicio, estaba_destacado=False):
+    """
+    Un servicio aparece en la landing, en /servicios/, en su propio detalle
+    y en la barra "otros" de los demás detalles. Esa barra solo muestra
+    los primeros servicios activos, así que los demás detalles solo se
+    tocan si el servicio está (o estaba) entre ellos.
+    """
+    paginas = [reverse('index:index'), reverse('index:servicios'),
+               reverse('index:servicio_detalle', args=[servicio.pk])]
+    if estaba_destacado or es_destacado(servicio.pk):
+        activos = Service.objects.filter(is_active=True).exclude(pk=servicio.pk)
+        paginas += [reverse('index:servicio_detalle', args=[pk])
+                    for pk in activos.values_list('pk', flat=True)]
+    return paginas
+
+
+def paginas_afectadas_lote(pks):
+    """
+    Reordenar o activar/desactivar varios servicios puede cambiar la barra
+    "otros" de cualquier detalle: se re-publican todos los activos, más
+    los detalles de los servicios del lote (los desactivados se retiran).
+    """
+    activos = Service.objects.filter(is_active=True).values_list('pk', flat=True)
+    return ([reverse('index:index'), reverse('index:servicios')]
+            + [reverse('index:servicio_detalle', args=[pk]) for pk in [*pks, *activos]])
+
+
+def es_destacado(pk):
+    """True si el servicio sale en la barra "otros" de algún detalle."""
+    primeros = Service.objects.filter(is_active=True).order_by(
+        'order').values_list('pk', flat=True)[:OTROS_EN_DETALLE + 1]
+    return pk in list(primeros)
+
+
+def paginas_afectadas_post(post):
+    return [reverse('index:index'), reverse('index:novedades')]
+
+
+def renderizar(path):
+    """Ejecuta la vista como lo haría Django y devuelve el HTML (o None si 404)."""
+    request = RequestFactory().get(path)
+    match = resolve(path)
+    request.resolver_match = match
+    vista = match.func
+    if iscoroutinefunction(vista):
+        vista = async_to_sync(vista)
+    try:
+        response = vista(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+    if hasattr(response, 'render'):
+        response = response.render()
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def _escribir_atomico(destino, contenido):
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=destino.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contenido)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, destino)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _variantes(destino):
+    return [destino, destino.with_name(destino.name + '.gz'),
+            destino.with_name(destino.name + '.br')]
+
+
+def publicar(paginas):
+    """Renderiza y escribe cada página (y sus variantes comprimidas)."""
+    escritas = []
+    for path in dict.fromkeys(paginas):   # sin duplicados, en orden
+        destino = ruta_archivo(path)
+        html = renderizar(path)
+        if html is None:
+            # La página ya no existe (p.ej. servicio desactivado)
+            for archivo in _variantes(destino):
+                archivo.unlink(missing_ok=True)
+            continue
+        _escribir_atomico(destino, html)
+        _escribir_atomico(_variantes(destino)[1], gzip.compress(html, 9, mtime=0))
+        if brotli is not None:
+            _escribir_atomico(_variantes(destino)[2], brotli.compress(html))
+        escritas.append(path)
+    logger.info('Prerender: %d página(s) publicadas', len(escritas))
+    return escritas
@@ -0,0 +1,253 @@
+"""
+index/seo.py
+
+Sitemaps, feed Atom de novedades y datos estructurados (JSON-LD).
+
+  /sitemap.xml                    → índice de sitemaps
+  /sitemap-paginas-0.xml          → páginas fijas
+  /sitemap-servicios-<n>.xml      → detalles de servicios activos con
+                                    pk en [n*CHUNK_SIZE, (n+1)*CHUNK_SIZE)
+  /novedades/feed.xml             → Atom con las últimas FEED_SIZE publicaciones
+
+Cada documento se guarda ya serializado en la capa de cache
+(Pilatesreserva/cache.py) bajo un sello de versión propio. Al cambiar un
+Service solo se cambia el sello de su trozo (más el índice y las páginas
+fijas); al cambiar un BlogPost, el del feed y las páginas fijas
+(index/signals.py). El resto de los trozos se sigue sirviendo del cache.
+
+Los trozos van por rango de pk (no por posición): agregar o desactivar
+un servicio no corre a los demás de trozo.
+
+Las publicaciones no tienen página propia: suman al lastmod de
+/novedades/ y cada entrada del feed enlaza a su tarjeta (#post-<pk>).
+"""
+import hashlib
+import json
+from collections import namedtuple
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Max
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from administrador.models import BlogPost, Service
+from Pilatesreserva import cache as cache_contenido
+
+DEFAULTS = {
+    'CHUNK_SIZE': 1000,     # URLs por sitemap (el protocolo admite hasta 50.000)
+    'FEED_SIZE': 50,
+    'TIMEOUT': 24 * 60 * 60,
+    'MAX_AGE': 5 * 60,      # Cache-Control de las respuestas
+}
+
+SECCIONES = ('paginas', 'servicios')
+
+# contenido: str ya serializado; ultima_modificacion: datetime o None
+Documento = namedtuple('Documento', 'contenido ultima_modificacion etag')
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'SEO', {})}
+
+
+def base_url(request):
+    """Origen absoluto del sitio: settings.SITE_URL o el host del request."""
+    return (getattr(settings, 'SITE_URL', '')
+            or f'{request.scheme}://{request.get_host()}').rstrip('/')
+
+
+def _documento(contenido, ultima):
+    return Documento(contenido, ultima,
+                     '"%s"' % hashlib.md5(contenido.encode()).hexdigest())
+
+
+def _fecha(dt):
+    return dt.isoformat(timespec='seconds')
+
+
+def _mas_reciente(*fechas):
+    fechas = [f for f in fechas if f is not None]
+    return max(fechas) if fechas else None
+
+
+def _cacheado(base, nombre, calcular):
+    """Documento `nombre` del sitio `base`, cacheado bajo su sello actual."""
+    version = cache_contenido.version(f'seo:version:{nombre}')
+    sitio = hashlib.md5(base.encode()).hexdigest()[:10]
+    return cache_contenido.obtener(f'seo:{sitio}:{nombre}:{version}', calcular,
+                                   config()['TIMEOUT'])
+
+
+# ─────────────────────────────────────────────────────────────
+# SITEMAPS
+# ─────────────────────────────────────────────────────────────
+
+def _urlset(urls):
+    partes = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for loc, lastmod in urls:
+        partes.append('<url><loc>%s</loc>%s</url>\n' % (
+            escape(loc), f'<lastmod>{_fecha(lastmod)}</lastmod>' if lastmod else ''))
+    partes.append('</urlset>\n')
+    return ''.join(partes)
+
+
+def trozo_de(pk):
+    return pk // config()['CHUNK_SIZE']
+
+
+def _servicios_por_trozo():
+    """{trozo: lastmod más reciente} de los servicios activos."""
+    trozos = {}
+    for pk, actualizado in Service.objects.filter(is_active=True).values_list('pk', 'updated_at'):
+        n = trozo_de(pk)
+        trozos[n] = _mas_reciente(trozos.get(n), actualizado)
+    return trozos
+
+
+def _paginas(base):
+    servicios = Service.objects.aggregate(m=Max('updated_at'))['m']
+    posts = BlogPost.objects.aggregate(m=Max('updated_at'))['m']
+    urls = [
+        (reverse('index:index'), _mas_reciente(servicios, posts)),
+        (reverse('index:servicios'), servicios),
+        (reverse('index:novedades'), posts),
+        (reverse('index:nosotros'), None),
+        (reverse('index:contacto_publico'), None),
+    ]
+    urls = [(base + path, lastmod) for path, lastmod in urls]
+    return _documento(_urlset(urls), _mas_reciente(servicios, posts))
+
+
+def _servicios(base, n):
+    tamano = config()['CHUNK_SIZE']
+    filas = list(Service.objects.filter(
+        is_active=True, pk__gte=n * tamano, pk__lt=(n + 1) * tamano,
+    ).order_by('pk').values_list('pk', 'updated_at'))
+    if not filas:
+        return None
+    urls = [(base + reverse('index:servicio_detalle', args=[pk]), actualizado)
+            for pk, actualizado in filas]
+    return _documento(_urlset(urls), _mas_reciente(*(a for _pk, a in filas)))
+
+
+def _indice(base):
+    paginas = sitemap(base, 'paginas', 0)
+    entradas = [(base + reverse('index:sitemap_seccion', args=['paginas', 0]),
+                 paginas.ultima_modificacion)]
+    trozos = _servicios_por_trozo()
+    entradas += [(base + reverse('index:sitemap_seccion', args=['servicios', n]), trozos[n])
+                 for n in sorted(trozos)]
+    partes = ['<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for loc, lastmod in entradas:
+        partes.append('<sitemap><loc>%s</loc>%s</sitemap>\n' % (
+            escape(loc), f'<lastmod>{_fecha(lastmod)}</lastmod>' if lastmod else ''))
+    partes.append('</sitemapindex>\n')
+    return _documento(''.join(partes), _mas_reciente(*(l for _loc, l in entradas)))
+
+
+def sitemap_indice(base):
+    return _cacheado(base, 'indice', lambda: _indice(base))
+
+
+def sitemap(base, seccion, n):
+    """Documento de la sección/trozo, o None si no existe (→ 404)."""
+    if seccion == 'paginas':
+        return _cacheado(base, 'paginas', lambda: _paginas(base)) if n == 0 else None
+    if seccion == 'servicios':
+        return _cacheado(base, f'servicios:{n}', lambda: _servicios(base, n))
+    return None
+
+
+# ─────────────────────────────────────────────────────────────
+# FEED ATOM
+# ─────────────────────────────────────────────────────────────
+
+def _feed(base):
+    novedades = base + reverse('index:novedades')
+    posts = list(BlogPost.objects.filter(is_published=True)
+                 .order_by('-published_date')[:config()['FEED_SIZE']])
+    feed = Atom1Feed(
+        title='Novedades | PilatesReserva', link=novedades,
+        description='Artículos, tips y noticias de PilatesReserva',
+        language='es', feed_url=base + reverse('index:feed_novedades'),
+    )
+    for post in posts:
+        enlace = f'{novedades}#post-{post.pk}'
+        feed.add_item(title=post.title, link=enlace, unique_id=enlace,
+                      description=Truncator(post.content).words(60),
+                      pubdate=post.published_date, updateddate=post.updated_at)
+    return _documento(feed.writeString('utf-8'),
+                      _mas_reciente(*(p.updated_at for p in posts)))
+
+
+def feed_novedades(base):
+    return _cacheado(base, 'feed', lambda: _feed(base))
+
+
+# ─────────────────────────────────────────────────────────────
+# INVALIDACIÓN (index/signals.py)
+# ─────────────────────────────────────────────────────────────
+
+def invalidar_servicio(pk, using=None):
+    cache_contenido.cambiar_version(
+        'seo:version:indice', 'seo:version:paginas',
+        f'seo:version:servicios:{trozo_de(pk)}', using=using)
+
+
+def invalidar_servicios(pks, using=None):
+    """invalidar_servicio() para un lote: cada sello cambia una sola vez."""
+    trozos = sorted({trozo_de(pk) for pk in pks})
+    cache_contenido.cambiar_version(
+        'seo:version:indice', 'seo:version:paginas',
+        *[f'seo:version:servicios:{t}' for t in trozos], using=using)
+
+
+def invalidar_novedades(using=None):
+    cache_contenido.cambiar_version(
+        'seo:version:indice', 'seo:version:paginas', 'seo:version:feed', using=using)
+
+
+# ─────────────────────────────────────────────────────────────
+# DATOS ESTRUCTURADOS (index/templatetags/seo.py)
+# ─────────────────────────────────────────────────────────────
+
+def ld_servicio(servicio, base):
+    datos = {
+        '@context': 'https://schema.org',
+        '@type': 'Service',
+        'name': servicio.name,
+        'description': servicio.description,
+        'url': base + reverse('index:servicio_detalle', args=[servicio.pk]),
+        'provider': {'@type': 'Organization', 'name': 'PilatesReserva', 'url': base + '/'},
+        'offers': {'@type': 'Offer', 'price': str(servicio.price), 'priceCurrency': 'CLP'},
+    }
+    if servicio.imagen_visible:
+        datos['image'] = base + servicio.image.url
+    return datos
+
+
+def ld_novedades(posts, base):
+    novedades = base + reverse('index:novedades')
+    return {
+        '@context': 'https://schema.org',
+        '@type': 'Blog',
+        'name': 'Novedades | PilatesReserva',
+        'url': novedades,
+        'blogPost': [{
+            '@type': 'BlogPosting',
+            'headline': post.title,
+            'url': f'{novedades}#post-{post.pk}',
+            'datePublished': _fecha(post.published_date),
+            'dateModified': _fecha(post.updated_at),
+        } for post in posts],
+    }
+
+
+def json_ld(datos):
+    """JSON apto para <script type="application/ld+json"> (sin </script> posible)."""
+    texto = json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+    return texto.replace('<', '\\u003C').replace('>', '\\u003E').replace('&', '\\u0026')
@@ -0,0 +1,96 @@
+"""
+index/signals.py
+Mantiene al día las páginas pre-renderizadas (index/prerender.py) cuando
+cambia un Service o un BlogPost. Se publica después del commit, y solo
+las páginas afectadas. Los cambios de Service además invalidan el
+snapshot del catálogo (index/catalogo.py), y los de BlogPost las
+novedades cacheadas de la landing. Ambos invalidan su parte de los
+sitemaps y del feed (index/seo.py). Al borrarse una página se borra
+también su contador de visitas (index/visitas.py).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.urls import reverse
+
+from administrador.models import BlogPost, Service
+from administrador.signals import estado_alternado, lote_actualizado
+from Pilatesreserva import cache as cache_contenido
+from . import catalogo, prerender, seo, visitas
+from .views import CLAVE_NOVEDADES_LANDING
+
+
+def _publicar_al_commit(paginas):
+    transaction.on_commit(lambda: prerender.publicar(paginas))
+
+
+def _invalidar_novedades(using=None):
+    # Ya (este proceso ve su cambio) y al commit (otro pudo recalcular en medio)
+    cache_contenido.invalidar(CLAVE_NOVEDADES_LANDING)
+    transaction.on_commit(lambda: cache_contenido.invalidar(CLAVE_NOVEDADES_LANDING), using=using)
+
+
+@receiver(pre_save, sender=Service)
+@receiver(pre_delete, sender=Service)
+def servicio_antes_de_cambiar(sender, instance, **kwargs):
+    if prerender.habilitado() and instance.pk:
+        instance._prerender_destacado = prerender.es_destacado(instance.pk)
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def servicio_cambiado(sender, instance, using, **kwargs):
+    catalogo.invalidar(using)
+    seo.invalidar_servicio(instance.pk, using)
+    if prerender.habilitado():
+        _publicar_al_commit(prerender.paginas_afectadas_servicio(
+            instance, getattr(instance, '_prerender_destacado', False)))
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def post_cambiado(sender, instance, using, **kwargs):
+    _invalidar_novedades(using)
+    seo.invalidar_novedades(using)
+    if prerender.habilitado():
+        _publicar_al_commit(prerender.paginas_afectadas_post(instance))
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=BlogPost)
+def pagina_eliminada(sender, instance, using, **kwargs):
+    visitas.olvidar(sender, instance.pk, using)
+
+
+@receiver(estado_alternado, sender=Service)
+def servicio_alternado(sender, instance, **kwargs):
+    catalogo.invalidar()
+    seo.invalidar_servicio(instance.pk)
+    # Si quedó inactivo, antes estaba activo y pudo estar destacado
+    if prerender.habilitado():
+        _publicar_al_commit(prerender.paginas_afectadas_servicio(
+            instance, estaba_destacado=not instance.is_active))
+
+
+@receiver(lote_actualizado, sender=Service)
+def servicios_en_lote(sender, pks, **kwargs):
+    catalogo.invalidar()
+    seo.invalidar_servicios(pks)
+    if prerender.habilitado():
+        _publicar_al_commit(prerender.paginas_afectadas_lote(pks))
+
+
+@receiver(lote_actualizado, sender=BlogPost)
+def novedades_en_lote(sender, **kwargs):
+    _invalidar_novedades()
+    seo.invalidar_novedades()
+    if prerender.habilitado():
+        _publicar_al_commit([reverse('index:index'), reverse('index:novedades')])
+
+
+@receiver(estado_alternado, sender=BlogPost)
+def post_alternado(sender, instance, **kwargs):
+    _invalidar_novedades()
+    seo.invalidar_novedades()
+    if prerender.habilitado():
+        _publicar_al_commit(prerender.paginas_afectadas_post(instance))
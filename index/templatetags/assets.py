@@ -0,0 +1,42 @@
+"""
+{% load assets %}
+{% vendor_url 'bootstrap_css' %} → copia local en static/vendor (si existe) o el CDN.
+{% vendor_hints %}               → preconnect al CDN cuando hace falta.
+{% critical_css as critico %}    → CSS crítico inline de la página (index/critical.py).
+"""
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from index import critical, vendor
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor_url(nombre):
+    return vendor.url(nombre)
+
+
+@register.simple_tag
+def vendor_hints():
+    """
+    preconnect al CDN si algún asset todavía sale de ahí; con los íconos
+    locales, preload de la fuente (si no, se descubre recién al aplicar el CSS).
+    """
+    hints = []
+    if any(vendor.url(nombre).startswith('https://') for nombre in vendor.ASSETS):
+        hints.append('<link rel="preconnect" href="https://cdn.jsdelivr.net" crossorigin>')
+    if vendor._local(vendor.FUENTE_ICONOS):
+        hints.append(format_html(
+            '<link rel="preload" as="font" type="font/woff2" href="{}" crossorigin>',
+            static(vendor.FUENTE_ICONOS)))
+    return mark_safe('\n'.join(hints))
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context):
+    """CSS crítico de la página actual (ver index/critical.py), ya marcado seguro."""
+    match = getattr(context.get('request'), 'resolver_match', None)
+    return mark_safe(critical.inline(match.url_name)) if match else ''
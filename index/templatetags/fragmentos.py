@@ -0,0 +1,44 @@
+"""
+{% load fragmentos %}
+{% fragmento ttl nombre [vary ...] %} ... {% endfragmento %}
+
+Como {% cache %} de Django (misma sintaxis y misma clave,
+make_template_fragment_key), pero a través de Pilatesreserva/cache.py:
+cuando un fragmento vence, solo un request lo vuelve a renderizar y el
+resto sigue sirviendo el anterior. ttl=0 → sin cache.
+"""
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from Pilatesreserva import cache as cache_contenido
+
+register = template.Library()
+
+
+class FragmentoNode(template.Node):
+    def __init__(self, nodelist, ttl, nombre, vary):
+        self.nodelist = nodelist
+        self.ttl = ttl
+        self.nombre = nombre
+        self.vary = vary
+
+    def render(self, context):
+        try:
+            ttl = int(self.ttl.resolve(context))
+        except (ValueError, TypeError):
+            raise template.TemplateSyntaxError(
+                f'"fragmento": el ttl debe ser un entero, no {self.ttl.resolve(context)!r}')
+        clave = make_template_fragment_key(
+            self.nombre, [v.resolve(context) for v in self.vary])
+        return cache_contenido.obtener(clave, lambda: self.nodelist.render(context), ttl)
+
+
+@register.tag
+def fragmento(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f'"{bits[0]}" necesita al menos dos argumentos.')
+    nodelist = parser.parse(('endfragmento',))
+    parser.delete_first_token()
+    return FragmentoNode(nodelist, parser.compile_filter(bits[1]), bits[2],
+                         [parser.compile_filter(b) for b in bits[3:]])
@@ -0,0 +1,25 @@
+"""
+{% load seo %}
+{% ld_servicio servicio %} → <script type="application/ld+json"> con el Service (schema.org)
+{% ld_novedades posts %}   → ídem con el Blog y sus BlogPosting
+"""
+from django import template
+from django.utils.safestring import mark_safe
+
+from index import seo
+
+register = template.Library()
+
+
+def _script(datos):
+    return mark_safe(f'<script type="application/ld+json">{seo.json_ld(datos)}</script>')
+
+
+@register.simple_tag(takes_context=True)
+def ld_servicio(context, servicio):
+    return _script(seo.ld_servicio(servicio, seo.base_url(context['request'])))
+
+
+@register.simple_tag(takes_context=True)
+def ld_novedades(context, posts):
+    return _script(seo.ld_novedades(posts, seo.base_url(context['request'])))
@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from administrador.models import BlogPost
+from Pilatesreserva import cache as cache_contenido
+
+CAPA_TEST = {'GRACE': 60, 'WAIT': 1.0, 'POLL': 0.01}
+
+
+@override_settings(CACHE_LAYER=CAPA_TEST)
+class CapaCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _contador(self, valor='v', espera=0):
+        llamadas = []
+
+        def calcular():
+            llamadas.append(1)
+            time.sleep(espera)
+            return valor
+        return calcular, llamadas
+
+    def test_acierto_y_ttl_cero(self):
+        calcular, llamadas = self._contador()
+        self.assertEqual(cache_contenido.obtener('k', calcular, 60), 'v')
+        self.assertEqual(cache_contenido.obtener('k', calcular, 60), 'v')
+        self.assertEqual(len(llamadas), 1)
+        cache_contenido.obtener('sin', calcular, 0)
+        cache_contenido.obtener('sin', calcular, 0)
+        self.assertEqual(len(llamadas), 3)
+
+    def test_single_flight_en_miss(self):
+        calcular, llamadas = self._contador(espera=0.2)
+        resultados = []
+        hilos = [threading.Thread(target=lambda: resultados.append(
+            cache_contenido.obtener('k', calcular, 60))) for _ in range(5)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        self.assertEqual(resultados, ['v'] * 5)
+        self.assertEqual(len(llamadas), 1)
+
+    def test_vencida_con_candado_ajeno_sirve_lo_viejo(self):
+        cache.set('k', ('viejo', 0.01, time.time() - 5), 60)
+        cache.add('k:candado', 'otro', 30)
+        calcular, llamadas = self._contador('nuevo')
+        self.assertEqual(cache_contenido.obtener('k', calcular, 60), 'viejo')
+        self.assertEqual(llamadas, [])
+
+    def test_vencida_sin_candado_recalcula_y_suelta(self):
+        cache.set('k', ('viejo', 0.01, time.time() - 5), 60)
+        calcular, _ = self._contador('nuevo')
+        self.assertEqual(cache_contenido.obtener('k', calcular, 60), 'nuevo')
+        self.assertIsNone(cache.get('k:candado'))
+
+    def test_error_al_recalcular_sirve_lo_viejo(self):
+        cache.set('k', ('viejo', 0.01, time.time() - 5), 60)
+
+        def falla():
+            raise RuntimeError('bd caída')
+        with self.assertLogs('Pilatesreserva.cache', 'ERROR'):
+            self.assertEqual(cache_contenido.obtener('k', falla, 60), 'viejo')
+        with self.assertRaises(RuntimeError):
+            cache_contenido.obtener('otra', falla, 60)
+
+    def test_recalculo_temprano_probabilistico(self):
+        # Vence en 1 s y calcularla tomó 10 s: casi cualquier sorteo la recalcula
+        cache.set('k', ('viejo', 10.0, time.time() + 1), 60)
+        calcular, llamadas = self._contador('nuevo')
+        with mock.patch('Pilatesreserva.cache.random.random', return_value=0.5):
+            self.assertEqual(cache_contenido.obtener('k', calcular, 60), 'nuevo')
+        # Barata y lejos de vencer: no se recalcula
+        cache.set('k', ('viejo', 0.001, time.time() + 50), 60)
+        with mock.patch('Pilatesreserva.cache.random.random', return_value=0.5):
+            self.assertEqual(cache_contenido.obtener('k', calcular, 60), 'viejo')
+        self.assertEqual(len(llamadas), 1)
+
+    def test_backend_de_archivos(self):
+        carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, carpeta, ignore_errors=True)
+        backends = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                    'archivos': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                                 'LOCATION': carpeta}}
+        with self.settings(CACHES=backends):
+            calcular, llamadas = self._contador(espera=0.2)
+            hilos = [threading.Thread(target=cache_contenido.obtener,
+                                      args=('k', calcular, 60), kwargs={'alias': 'archivos'})
+                     for _ in range(4)]
+            for h in hilos:
+                h.start()
+            for h in hilos:
+                h.join()
+            self.assertEqual(len(llamadas), 1)
+            self.assertEqual(caches['archivos'].get('k')[0], 'v')
+            cache_contenido.invalidar('k', alias='archivos')
+            self.assertIsNone(caches['archivos'].get('k'))
+
+
+class FragmentoTagTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cachea_por_vary_y_ttl_cero_no_cachea(self):
+        t = Template('{% load fragmentos %}{% fragmento ttl nav pagina %}{{ texto }}{% endfragmento %}')
+        self.assertEqual(t.render(Context({'ttl': 60, 'pagina': 'a', 'texto': 'uno'})), 'uno')
+        self.assertEqual(t.render(Context({'ttl': 60, 'pagina': 'a', 'texto': 'dos'})), 'uno')
+        self.assertEqual(t.render(Context({'ttl': 60, 'pagina': 'b', 'texto': 'dos'})), 'dos')
+        self.assertEqual(t.render(Context({'ttl': 0, 'pagina': 'a', 'texto': 'tres'})), 'tres')
+
+
+class NovedadesLandingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_landing_cacheada_e_invalidada_al_publicar(self):
+        BlogPost.objects.create(title='Primera', content='.')
+        self.client.get(reverse('index:index'))
+        with self.assertNumQueries(0):
+            r = self.client.get(reverse('index:index'))
+        self.assertContains(r, 'Primera')
+        BlogPost.objects.create(title='Segunda', content='.')
+        self.assertContains(self.client.get(reverse('index:index')), 'Segunda')
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from administrador.models import Service
+from index import catalogo
+
+
+class CatalogoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.servicios = [Service.objects.create(name=f'S{i}', description='.', price=1, order=i)
+                          for i in range(5)]
+
+    def test_snapshot_ordenado_e_indexado(self):
+        activos = catalogo.actual()
+        self.assertEqual([s.name for s in activos.servicios], ['S0', 'S1', 'S2', 'S3', 'S4'])
+        self.assertEqual(activos.get(self.servicios[2].pk).name, 'S2')
+        self.assertEqual([s.name for s in activos.otros(self.servicios[0].pk)], ['S1', 'S2', 'S3'])
+        with self.assertRaises(TypeError):
+            activos.por_pk[0] = None
+
+    def test_vistas_sin_consultas_en_regimen(self):
+        s = self.servicios[1]
+        self.client.get(reverse('index:servicios'))      # calienta el snapshot
+        with self.assertNumQueries(0):
+            r = self.client.get(reverse('index:servicios'))
+        self.assertContains(r, 'S4')
+        with self.assertNumQueries(0):
+            r = self.client.get(reverse('index:servicio_detalle', args=[s.pk]))
+        self.assertContains(r, 'S1')
+        self.assertEqual([o.name for o in r.context['otros']], ['S0', 'S2', 'S3'])
+        with self.assertNumQueries(1):                   # solo el blog
+            self.client.get(reverse('index:index'))
+
+    def test_guardar_o_borrar_invalida(self):
+        antes = catalogo.actual()
+        s = self.servicios[0]
+        s.is_active = False
+        s.save()
+        self.assertIsNot(catalogo.actual(), antes)
+        self.assertEqual(self.client.get(
+            reverse('index:servicio_detalle', args=[s.pk])).status_code, 404)
+
+        self.servicios[1].delete()
+        self.assertEqual([x.name for x in catalogo.actual().servicios], ['S2', 'S3', 'S4'])
+
+    def test_sello_perdido_reconstruye(self):
+        antes = catalogo.actual()
+        cache.delete(catalogo.CLAVE_VERSION)
+        self.assertIsNot(catalogo.actual(), antes)
+        self.assertIs(catalogo.actual(), catalogo.actual())
+
+    def test_sello_cambia_de_nuevo_al_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.servicios[0].save()
+        sello = cache.get(catalogo.CLAVE_VERSION)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get(catalogo.CLAVE_VERSION), sello)
@@ -0,0 +1,120 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from Pilatesreserva import middleware as compresion
+from Pilatesreserva.middleware import CompressionMiddleware, elegir_encoding, minificar_html
+
+
+def _mw(response):
+    return CompressionMiddleware(lambda request: response)
+
+
+class NegociacionTests(TestCase):
+    def test_elegir_encoding(self):
+        self.assertEqual(elegir_encoding('gzip, deflate'), 'gzip')
+        self.assertIsNone(elegir_encoding('gzip;q=0'))
+        self.assertIsNone(elegir_encoding(''))
+        self.assertEqual(elegir_encoding('*'), 'gzip')
+        with mock.patch.object(compresion, 'brotli', object()):
+            self.assertEqual(elegir_encoding('gzip, br'), 'br')
+            self.assertEqual(elegir_encoding('br;q=0, gzip'), 'gzip')
+
+
+class MinificadorTests(TestCase):
+    def test_quita_comentarios_y_espacios(self):
+        html = ('<div>\n    <!-- nota -->\n    <p>Hola   mundo</p>\n</div>'
+                '<pre>  a\n   b  </pre><style>\n  /* x */\n  a { color: red; }\n</style>'
+                '<script>  var s = "  <!-- -->  ";  </script>')
+        salida = minificar_html(html)
+        self.assertNotIn('nota', salida)
+        self.assertIn('<p>Hola mundo</p>', salida)
+        self.assertIn('<pre>  a\n   b  </pre>', salida)
+        self.assertIn('<style> a { color: red; } </style>', salida)
+        self.assertIn('<script>  var s = "  <!-- -->  ";  </script>', salida)
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def test_pagina_publica_comprimida(self):
+        r = self.client.get(reverse('index:nosotros'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(r['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', r['Vary'])
+        self.assertIn(b'footer-neo', gzip.decompress(r.content))
+        self.assertEqual(int(r['Content-Length']), len(r.content))
+
+    def test_sin_accept_encoding_no_comprime(self):
+        r = self.client.get(reverse('index:nosotros'))
+        self.assertFalse(r.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', r['Vary'])
+
+    def test_umbral_y_tipos(self):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        chica = _mw(HttpResponse('x' * 100))(request)
+        self.assertFalse(chica.has_header('Content-Encoding'))
+        binaria = _mw(HttpResponse(b'x' * 5000, content_type='image/png'))(request)
+        self.assertFalse(binaria.has_header('Content-Encoding'))
+
+    def test_memo_evita_recomprimir(self):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        with mock.patch.object(compresion, 'comprimir', wraps=compresion.comprimir) as espia:
+            for _ in range(3):
+                r = _mw(HttpResponse('<p>hola</p>' * 500))(request)
+        self.assertEqual(espia.call_count, 1)
+        self.assertEqual(gzip.decompress(r.content), b'<p>hola</p>' * 500)
+
+    def test_pagina_con_csrf_no_se_memoiza(self):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        html = '<input name="csrfmiddlewaretoken" value="abc">' + 'x' * 2000
+        with mock.patch.object(compresion, 'comprimir', wraps=compresion.comprimir) as espia:
+            _mw(HttpResponse(html))(request)
+            _mw(HttpResponse(html))(request)
+        self.assertEqual(espia.call_count, 2)
+
+    def test_pagina_con_csrf_nunca_en_brotli(self):
+        html = '<input name="csrfmiddlewaretoken" value="abc">' + 'x' * 2000
+        with mock.patch.object(compresion, 'brotli', object()):
+            r = _mw(HttpResponse(html))(self.factory.get('/', HTTP_ACCEPT_ENCODING='br, gzip'))
+            self.assertEqual(r['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(r.content).decode(), html)
+            r = _mw(HttpResponse(html))(self.factory.get('/', HTTP_ACCEPT_ENCODING='br'))
+            self.assertFalse(r.has_header('Content-Encoding'))
+            self.assertEqual(r.content.decode(), html)
+
+    def test_etag_debil_si_se_reescribe_el_cuerpo(self):
+        def respuesta(cuerpo):
+            r = HttpResponse(cuerpo)
+            r['ETag'] = '"v1"'
+            return r
+        html = '<div>\n  <p>hola</p>\n</div>' * 100
+        sin_encoding = self.factory.get('/')
+        with self.settings(HTML_MINIFY=True):
+            self.assertEqual(_mw(respuesta(html))(sin_encoding)['ETag'], 'W/"v1"')
+            # Nada que minificar ni comprimir: el ETag sigue fuerte
+            self.assertEqual(_mw(respuesta('x' * 2000))(sin_encoding)['ETag'], '"v1"')
+        con_gzip = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(_mw(respuesta(html))(con_gzip)['ETag'], 'W/"v1"')
+
+    def test_streaming(self):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        r = _mw(StreamingHttpResponse(iter([b'a' * 1000, b'b' * 1000])))(request)
+        self.assertEqual(r['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(r.streaming_content)),
+                         b'a' * 1000 + b'b' * 1000)
+
+    def test_minifica_sin_compresion(self):
+        with self.settings(HTML_MINIFY=False):
+            original = self.client.get(reverse('index:nosotros'))
+        with self.settings(HTML_MINIFY=True):
+            r = self.client.get(reverse('index:nosotros'))
+        self.assertFalse(r.has_header('Content-Encoding'))
+        self.assertLess(len(r.content), len(original.content))
+        self.assertIn(b'<head> <meta', r.content)
+        self.assertContains(r, 'footer-neo')
@@ -0,0 +1,41 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from index import critical
+
+
+class CriticalCssTests(TestCase):
+    def setUp(self):
+        critical._leer.cache_clear()
+
+    def test_html_sobre_el_pliegue(self):
+        html = ('<html><head><style>.x{}</style></head><body><nav class="nb"></nav>'
+                '<section class="hero"></section><section class="abajo"></section></body>')
+        fold = critical.html_sobre_el_pliegue(html)
+        self.assertIn('hero', fold)
+        self.assertNotIn('abajo', fold)
+        self.assertNotIn('<style>', fold)
+
+    def test_landing_inline_y_hojas_asincronas(self):
+        r = self.client.get(reverse('index:index'))
+        html = r.content.decode()
+        self.assertIn('<style>' + critical.inline('index'), html)
+        self.assertIn('rel="preload" as="style"', html)
+        self.assertIn('<noscript>', html)
+        self.assertIn('rel="preload" as="image"', html)
+
+    def test_pagina_sin_css_critico_carga_normal(self):
+        r = self.client.get(reverse('index:novedades'))
+        self.assertNotContains(r, 'rel="preload" as="style"')
+        self.assertContains(r, 'rel="stylesheet" href="/static/css/site.css')
+
+    def test_css_critico_solo_reglas_del_hero(self):
+        css = critical.inline('index')
+        self.assertIn('#navbar', css)
+        self.assertNotIn('.footer-neo', css)
+        self.assertLess(len(css), 20 * 1024)
+
+    def test_archivos_generados_al_dia(self):
+        # Falla si se cambió site.css/navbar.css o un hero sin regenerar
+        call_command('critical_css', check=True)
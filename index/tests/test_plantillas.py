@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from monitoreo.registro import registro
+
+
+class FragmentosCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(TEMPLATE_FRAGMENT_CACHE={'TIMEOUT': 300, 'VERSION': 'r1'})
+    def test_navbar_cacheada_por_pagina(self):
+        self.client.get(reverse('index:nosotros'))
+        self.assertIsNotNone(cache.get(make_template_fragment_key('pub_navbar', ['nosotros', 'r1'])))
+        self.assertIsNotNone(cache.get(make_template_fragment_key('pub_footer', ['r1'])))
+        r = self.client.get(reverse('index:nosotros'))
+        self.assertContains(r, 'id="navbar"')
+        self.assertContains(r, 'footer-neo')
+        # La navbar varía según la página activa
+        r = self.client.get(reverse('index:novedades'))
+        self.assertRegex(r.content.decode(),
+                         r'nav-link[^"]*active"\s+href="%s"' % reverse('index:novedades'))
+
+    @override_settings(TEMPLATE_FRAGMENT_CACHE={'TIMEOUT': 300, 'VERSION': 'r1'})
+    def test_la_version_invalida_fragmentos(self):
+        self.client.get(reverse('index:nosotros'))
+        claves = len(cache._cache)
+        with self.settings(TEMPLATE_FRAGMENT_CACHE={'TIMEOUT': 300, 'VERSION': 'r2'}):
+            self.client.get(reverse('index:nosotros'))
+        self.assertGreater(len(cache._cache), claves)
+
+    def test_modo_produccion_usa_loader_cacheado(self):
+        from django.template.backends.django import DjangoTemplates
+        motor = DjangoTemplates({
+            'NAME': 'prod', 'DIRS': [], 'APP_DIRS': False,
+            'OPTIONS': {'loaders': [('django.template.loaders.cached.Loader', [
+                'django.template.loaders.app_directories.Loader'])]},
+        })
+        loader = motor.engine.template_loaders[0]
+        motor.get_template('index/nosotros.html')
+        self.assertIn('index/nosotros.html', {k.split('-')[0] for k in loader.get_template_cache})
+
+
+class MedicionTemplatesTests(TestCase):
+    def setUp(self):
+        registro.reiniciar()
+
+    @override_settings(MONITOREO_SERVER_TIMING=True)
+    def test_server_timing_con_templates_lentos(self):
+        r = self.client.get(reverse('index:nosotros'))
+        header = r['Server-Timing']
+        self.assertIn('tpl;dur=', header)
+        self.assertIn('index/nosotros.html', header)
+
+    def test_desglose_por_template_y_bloque(self):
+        self.client.get(reverse('index:nosotros'))
+        muestra = registro.ultimas(1)[0]
+        self.assertIn('index/nosotros.html', muestra.plantillas)
+        self.assertIn('block:content', muestra.bloques)
+        nombres = [n for n, _ in registro.templates_lentos()]
+        self.assertIn('index/nosotros.html', nombres)
+        self.assertIn('pilates_template_render_seconds_total{template="index/nosotros.html"}',
+                      registro.prometheus())
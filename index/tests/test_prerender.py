@@ -0,0 +1,73 @@
+import gzip
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from administrador.models import BlogPost, Service
+from index import prerender
+
+
+class PrerenderTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        ajustes = override_settings(PRERENDER_ROOT=self.root, PRERENDER_ENABLED=True)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def _servicio(self, nombre, orden, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Service.objects.create(name=nombre, description='.', price=1000,
+                                          image='services/a.jpg', order=orden, **extra)
+
+    def test_comando_publica_todo_con_gzip(self):
+        s = Service.objects.create(name='Reformer', description='.', price=1000,
+                                   image='services/a.jpg')
+        call_command('prerender', stdout=StringIO())
+        for path in ('/', '/nosotros/', '/servicios/', '/novedades/', f'/servicios/{s.pk}/'):
+            html = prerender.ruta_archivo(path).read_bytes()
+            self.assertIn(b'<html', html)
+            gz = prerender.ruta_archivo(path).with_name('index.html.gz').read_bytes()
+            self.assertEqual(gzip.decompress(gz), html)
+        self.assertIn(b'Reformer', prerender.ruta_archivo('/servicios/').read_bytes())
+
+    def test_cambio_de_post_solo_republica_sus_paginas(self):
+        with patch('index.prerender.publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                BlogPost.objects.create(title='Nuevo', content='texto')
+        publicar.assert_called_once_with(['/', '/novedades/'])
+
+    def test_servicio_no_destacado_no_toca_otros_detalles(self):
+        primeros = [self._servicio(f'S{i}', i) for i in range(4)]
+        ultimo = self._servicio('Último', 99)
+        with patch('index.prerender.publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                ultimo.name = 'Último editado'
+                ultimo.save()
+        paginas = publicar.call_args.args[0]
+        self.assertIn(f'/servicios/{ultimo.pk}/', paginas)
+        self.assertNotIn(f'/servicios/{primeros[0].pk}/', paginas)
+
+    def test_servicio_destacado_republica_la_barra_de_otros(self):
+        primero = self._servicio('Primero', 0)
+        otro = self._servicio('Otro', 5)
+        with patch('index.prerender.publicar') as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                primero.name = 'Primero editado'
+                primero.save()
+        self.assertIn(f'/servicios/{otro.pk}/', publicar.call_args.args[0])
+
+    def test_desactivar_borra_el_detalle(self):
+        s = self._servicio('Zumba Acuática', 1)
+        detalle = prerender.ruta_archivo(f'/servicios/{s.pk}/')
+        self.assertTrue(detalle.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            s.is_active = False
+            s.save()
+        self.assertFalse(detalle.exists())
+        self.assertNotIn('Zumba Acuática'.encode(), prerender.ruta_archivo('/servicios/').read_bytes())
@@ -0,0 +1,124 @@
+import json
+import re
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from administrador.models import BlogPost, Service
+from index import seo
+
+User = get_user_model()
+
+
+@override_settings(SEO={'CHUNK_SIZE': 10, 'FEED_SIZE': 2}, SITE_URL='https://pilates.test',
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SitemapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _servicio(self, pk, **extra):
+        return Service.objects.create(pk=pk, name=f'S{pk}', description='.', price=1, **extra)
+
+    def test_indice_con_trozos_por_rango_de_pk(self):
+        for pk in (1, 2, 25):
+            self._servicio(pk)
+        self._servicio(40, is_active=False)
+        r = self.client.get(reverse('index:sitemap'))
+        self.assertEqual(r['Content-Type'], 'application/xml; charset=utf-8')
+        locs = re.findall(r'<loc>([^<]+)</loc>', r.content.decode())
+        self.assertEqual(locs, ['https://pilates.test/sitemap-paginas-0.xml',
+                                'https://pilates.test/sitemap-servicios-0.xml',
+                                'https://pilates.test/sitemap-servicios-2.xml'])
+        self.assertIn('<lastmod>', r.content.decode())
+
+        r = self.client.get(reverse('index:sitemap_seccion', args=['servicios', 0]))
+        self.assertContains(r, '<loc>https://pilates.test/servicios/2/</loc>')
+        self.assertNotContains(r, '/servicios/25/')
+        self.assertEqual(self.client.get(
+            reverse('index:sitemap_seccion', args=['servicios', 4])).status_code, 404)
+        self.assertEqual(self.client.get(
+            reverse('index:sitemap_seccion', args=['otra', 0])).status_code, 404)
+
+    def test_get_condicional(self):
+        self._servicio(1)
+        url = reverse('index:sitemap_seccion', args=['servicios', 0])
+        r = self.client.get(url)
+        self.assertIn('max-age=300', r['Cache-Control'])
+        r304 = self.client.get(url, HTTP_IF_NONE_MATCH=r['ETag'])
+        self.assertEqual(r304.status_code, 304)
+        r304 = self.client.get(url, HTTP_IF_MODIFIED_SINCE=r['Last-Modified'])
+        self.assertEqual(r304.status_code, 304)
+        self.assertEqual(self.client.post(url).status_code, 405)
+
+    def test_solo_se_regenera_el_trozo_que_cambio(self):
+        s1, s2 = self._servicio(1), self._servicio(25)
+        for n in (0, 2):
+            self.client.get(reverse('index:sitemap_seccion', args=['servicios', n]))
+        s2.name = 'Otro'
+        s2.save()
+        with mock.patch('index.seo._servicios', wraps=seo._servicios) as generar:
+            for n in (0, 2):
+                self.client.get(reverse('index:sitemap_seccion', args=['servicios', n]))
+        self.assertEqual([c.args[1] for c in generar.call_args_list], [2])
+
+        # El toggle del panel (UPDATE directo, sin post_save) también invalida
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+        self.client.login(username='admin1', password='x')
+        self.client.post(reverse('administrador:servicio_toggle', args=[s1.pk]))
+        self.assertEqual(self.client.get(
+            reverse('index:sitemap_seccion', args=['servicios', 0])).status_code, 404)
+
+    def test_sin_cambios_cero_consultas(self):
+        self._servicio(1)
+        self.client.get(reverse('index:sitemap'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('index:sitemap'))
+            self.client.get(reverse('index:sitemap_seccion', args=['paginas', 0]))
+
+
+@override_settings(SEO={'FEED_SIZE': 2}, SITE_URL='https://pilates.test')
+class FeedYDatosEstructuradosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_atom_ultimas_publicaciones(self):
+        for i in range(3):
+            BlogPost.objects.create(title=f'Post {i}', content='texto ' * 100,
+                                    published_date=f'2026-01-0{i + 1}T10:00Z')
+        BlogPost.objects.create(title='Borrador', content='.', is_published=False)
+        r = self.client.get(reverse('index:feed_novedades'))
+        self.assertEqual(r['Content-Type'], 'application/atom+xml; charset=utf-8')
+        xml = r.content.decode()
+        self.assertIn('xmlns="http://www.w3.org/2005/Atom"', xml)
+        self.assertEqual(re.findall(r'<title>(Post \d)</title>', xml), ['Post 2', 'Post 1'])
+        self.assertNotIn('Borrador', xml)
+        self.assertIn('https://pilates.test/novedades/#post-', xml)
+
+        BlogPost.objects.create(title='Nuevo', content='.')
+        self.assertContains(self.client.get(reverse('index:feed_novedades')), 'Nuevo')
+        self.assertEqual(self.client.get(reverse('index:feed_novedades'),
+                                         HTTP_IF_NONE_MATCH=r['ETag']).status_code, 200)
+
+    def test_json_ld(self):
+        s = Service.objects.create(name='Reformer </script>', description='.', price=15000)
+        r = self.client.get(reverse('index:servicio_detalle', args=[s.pk]))
+        bloque = re.search(r'<script type="application/ld\+json">(.*?)</script>',
+                           r.content.decode(), re.S).group(1)
+        datos = json.loads(bloque)
+        self.assertEqual(datos['@type'], 'Service')
+        self.assertEqual(datos['offers'], {'@type': 'Offer', 'price': '15000',
+                                           'priceCurrency': 'CLP'})
+        self.assertEqual(datos['name'], 'Reformer </script>')
+
+        post = BlogPost.objects.create(title='Hola', content='.')
+        r = self.client.get(reverse('index:novedades'))
+        self.assertContains(r, f'id="post-{post.pk}"')
+        self.assertContains(r, '"@type":"BlogPosting"')
+        self.assertContains(r, 'rel="alternate" type="application/atom+xml"')
+
+    def test_robots(self):
+        r = self.client.get('/robots.txt')
+        self.assertContains(r, 'Sitemap: https://pilates.test/sitemap.xml')
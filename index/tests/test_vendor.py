@@ -0,0 +1,109 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from index import vendor
+
+BOOTSTRAP_CSS = ('/*! Bootstrap v5.3.3 | MIT */:root{--bs-blue:#0d6efd}'
+                 '.btn{padding:1px}.btn-primary:hover,.accordion{color:red}'
+                 '@media (min-width:768px){.col-md-6{flex:0 0 auto}.offcanvas-md{x:y}}'
+                 '@keyframes spin{to{transform:rotate(360deg)}}'
+                 '.fade{opacity:0}.tabla-inexistente td{a:b}')
+ICONOS_CSS = ('@font-face { font-family: "bootstrap-icons"; '
+              'src: url("./fonts/bootstrap-icons.woff2?x") format("woff2"); }\n'
+              '.bi::before, [class^="bi-"]::before { font-family: bootstrap-icons !important; }\n'
+              '.bi-alarm::before { content: "\\f101"; }\n'
+              '.bi-whatsapp::before { content: "\\f618"; }\n')
+
+
+class PurgadoTests(SimpleTestCase):
+    def test_purgar_css(self):
+        salida = vendor.purgar_css(BOOTSTRAP_CSS, {'btn', 'btn-primary', 'col-md-6'})
+        self.assertTrue(salida.startswith('/*! Bootstrap v5.3.3 | MIT */'))
+        self.assertIn(':root{--bs-blue:#0d6efd}', salida)
+        self.assertIn('.btn-primary:hover{color:red}', salida)
+        self.assertNotIn('accordion', salida)
+        self.assertIn('@media (min-width:768px){.col-md-6{flex:0 0 auto}.offcanvas-md{x:y}}', salida)
+        self.assertIn('@keyframes spin', salida)
+        self.assertIn('.fade{opacity:0}', salida)          # safelist (lo pone el JS)
+        self.assertNotIn('tabla-inexistente', salida)
+
+    def test_recortar_iconos(self):
+        css, codepoints = vendor.recortar_iconos(ICONOS_CSS, {'bi', 'bi-whatsapp'})
+        self.assertEqual(codepoints, [0xf618])
+        self.assertNotIn('bi-alarm', css)
+        self.assertNotIn('@font-face', css)
+        self.assertIn('[class^="bi-"]::before', css)
+        self.assertIn('fonts/bootstrap-icons.woff2', vendor.font_face())
+
+    def test_clases_usadas_incluye_templates(self):
+        usadas = vendor.clases_usadas()
+        self.assertIn('bi-whatsapp', usadas)
+        self.assertIn('form-control', usadas)
+
+
+class VendorAssetsTests(TestCase):
+    def setUp(self):
+        vendor._local.cache_clear()
+        self.addCleanup(vendor._local.cache_clear)
+
+    def test_cae_al_cdn_sin_copia_local(self):
+        with mock.patch.object(vendor.finders, 'find', return_value=None):
+            r = self.client.get(reverse('index:nosotros'))
+        self.assertContains(r, vendor.ASSETS['bootstrap_css'][1])
+
+    def test_usa_copia_local(self):
+        with mock.patch.object(vendor.finders, 'find', return_value='/x'):
+            r = self.client.get(reverse('index:nosotros'))
+        self.assertContains(r, '/static/vendor/bootstrap/bootstrap.min.css')
+        self.assertContains(r, '/static/vendor/bootstrap/bootstrap.bundle.min.js')
+        self.assertNotContains(r, 'cdn.jsdelivr.net/npm/bootstrap@')
+
+    def test_comando_con_source(self):
+        with tempfile.TemporaryDirectory() as origen, tempfile.TemporaryDirectory() as destino:
+            origen, destino = Path(origen), Path(destino)
+            (origen / 'bootstrap.min.css').write_text(BOOTSTRAP_CSS)
+            (origen / 'bootstrap.bundle.min.js').write_text('/* js */')
+            (origen / 'bootstrap-icons.css').write_text(ICONOS_CSS)
+            (origen / 'bootstrap-icons.woff').write_bytes(b'wOFF')
+            with mock.patch.object(vendor, 'subset_fuente', return_value=False):
+                call_command('vendor_assets', source=str(origen), dest=str(destino),
+                             stdout=mock.MagicMock(), stderr=mock.MagicMock())
+            css = (destino / 'bootstrap' / 'bootstrap.min.css').read_text()
+            self.assertNotIn('tabla-inexistente', css)
+            iconos = (destino / 'bootstrap-icons' / 'bootstrap-icons.min.css').read_text()
+            self.assertIn('bi-whatsapp', iconos)
+            self.assertNotIn('bi-alarm', iconos)
+            self.assertIn('format("woff")', iconos)
+            self.assertNotIn('woff2', iconos)
+            self.assertTrue((destino / 'bootstrap-icons' / 'fonts' / 'bootstrap-icons.woff').exists())
+            self.assertTrue((destino / 'bootstrap' / 'bootstrap.bundle.min.js').exists())
+
+
+class ManifestProduccionTests(TestCase):
+    """Fuera de DEBUG, con el manifest: un estático que falta no rompe la página."""
+
+    def setUp(self):
+        raiz = tempfile.TemporaryDirectory()
+        self.addCleanup(raiz.cleanup)
+        ajustes = override_settings(
+            DEBUG=False, STATIC_ROOT=raiz.name,
+            STORAGES={'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                      'staticfiles': {'BACKEND': 'Pilatesreserva.storage.'
+                                                 'ManifestStaticFilesStorageNoEstricto'}})
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        vendor._local.cache_clear()
+        self.addCleanup(vendor._local.cache_clear)
+
+    def test_paginas_publicas_renderizan(self):
+        for nombre in ('index:index', 'index:nosotros'):
+            r = self.client.get(reverse(nombre))
+            self.assertEqual(r.status_code, 200, nombre)
+        self.assertContains(r, '/static/favicon.ico')          # sin hash: no está en static/
+        self.assertRegex(r.content.decode(), r'/static/css/site\.[0-9a-f]{12}\.css')
@@ -0,0 +1,51 @@
+from django.test import AsyncRequestFactory, TestCase
+from django.http import Http404
+
+from administrador.models import BlogPost, ContactMessage, Service
+from index import views_async
+
+
+class VistasAsyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.s1 = Service.objects.create(name='Reformer', description='.', price=1000,
+                                        image='services/a.jpg', order=1)
+        cls.s2 = Service.objects.create(name='Mat', description='.', price=900,
+                                        image='services/b.jpg', order=2)
+        Service.objects.create(name='Oculto', description='.', price=1,
+                               image='services/c.jpg', is_active=False)
+        BlogPost.objects.create(title='Tips de postura', content='texto')
+
+    def setUp(self):
+        self.rf = AsyncRequestFactory()
+
+    async def test_index(self):
+        r = await views_async.index(self.rf.get('/'))
+        self.assertContains(r, 'Reformer')
+        self.assertContains(r, 'Tips de postura')
+        self.assertNotContains(r, 'Oculto')
+
+    async def test_servicios_y_novedades(self):
+        self.assertContains(await views_async.servicios(self.rf.get('/servicios/')), 'Mat')
+        self.assertContains(await views_async.novedades(self.rf.get('/novedades/')),
+                            'Tips de postura')
+
+    async def test_servicio_detalle(self):
+        r = await views_async.servicio_detalle(self.rf.get('/'), pk=self.s1.pk)
+        self.assertContains(r, 'Reformer')
+        self.assertContains(r, 'Mat')   # barra de otros servicios
+        with self.assertRaises(Http404):
+            await views_async.servicio_detalle(self.rf.get('/'), pk=999)
+
+    async def test_contacto_post_crea_mensaje(self):
+        request = self.rf.post('/contacto/', {
+            'nombre': 'Ana', 'email': 'ana@test.cl', 'mensaje': 'Hola'})
+        r = await views_async.contacto_publico(request)
+        self.assertEqual(r.status_code, 302)
+        self.assertTrue(await ContactMessage.objects.filter(email='ana@test.cl').aexists())
+
+    async def test_contacto_post_invalido(self):
+        request = self.rf.post('/contacto/', {'nombre': '', 'email': 'x', 'mensaje': ''})
+        r = await views_async.contacto_publico(request)
+        self.assertContains(r, 'El email no es válido.')
+        self.assertFalse(await ContactMessage.objects.aexists())
@@ -0,0 +1,123 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import AsyncRequestFactory, Client, TestCase, override_settings
+from django.urls import reverse
+
+from administrador.models import BlogPost, Service, ViewCounter
+from index import views_async, visitas
+
+
+def _vistas():
+    return dict(((k, pk), n) for k, pk, n in
+                ViewCounter.objects.values_list('kind', 'object_id', 'views'))
+
+
+@override_settings(VISITAS={'FLUSH_MODE': 'sync', 'FLUSH_HITS': 1000, 'FLUSH_INTERVAL': 3600})
+class VisitasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reformer = Service.objects.create(name='Reformer', description='.', price=1000,
+                                              image='services/a.jpg', order=1)
+        cls.mat = Service.objects.create(name='Mat', description='.', price=900,
+                                         image='services/b.jpg', order=2)
+        cls.oculto = Service.objects.create(name='Oculto', description='.', price=1,
+                                            image='services/c.jpg', is_active=False)
+        cls.post = BlogPost.objects.create(title='Tips', content='texto')
+
+    def setUp(self):
+        visitas.reiniciar()
+        cache.clear()
+        self.addCleanup(visitas.reiniciar)
+
+    def _beacon(self, tipo, pk, cliente=None):
+        return (cliente or self.client).post(reverse('index:visita', args=[tipo, pk]))
+
+    def test_beacon_suma_en_memoria_y_escribe_en_lote(self):
+        # Sin token CSRF: el beacon sale también de páginas pre-renderizadas
+        cliente = Client(enforce_csrf_checks=True)
+        for _ in range(3):
+            self.assertEqual(self._beacon('servicio', self.mat.pk, cliente).status_code, 204)
+        self._beacon('novedad', self.post.pk)
+        self.assertFalse(ViewCounter.objects.exists())
+        self.assertEqual(visitas.acumulador().pendientes(), 4)
+
+        with self.assertNumQueries(8):   # por tipo: existentes, INSERT OR IGNORE, UPDATE (+ savepoint)
+            self.assertEqual(visitas.vaciar(), 4)
+        self.assertEqual(_vistas(), {('servicio', self.mat.pk): 3, ('novedad', self.post.pk): 1})
+        self.assertEqual(visitas.acumulador().pendientes(), 0)
+
+    def test_beacon_invalido(self):
+        self.assertEqual(self.client.get(reverse('index:visita', args=['servicio', self.mat.pk]))
+                         .status_code, 405)
+        self.assertEqual(self._beacon('usuario', 1).status_code, 404)
+        self.assertEqual(self._beacon('servicio', self.oculto.pk).status_code, 404)
+        # Las novedades se validan al escribir: un pk inventado no deja fila
+        self.assertEqual(self._beacon('novedad', 9999).status_code, 204)
+        self.assertEqual(visitas.vaciar(), 0)
+        self.assertFalse(ViewCounter.objects.exists())
+        self.assertEqual(visitas.estadisticas()['descartadas'], 1)
+
+    def test_varios_procesos_suman_sin_pisarse(self):
+        a, b = visitas.Acumulador(), visitas.Acumulador()
+        for _ in range(2):
+            a.registrar('servicio', self.reformer.pk)
+        b.registrar('servicio', self.reformer.pk)
+        b.registrar('servicio', self.mat.pk)
+        a.vaciar()
+        b.vaciar()
+        a.registrar('servicio', self.reformer.pk)
+        a.vaciar()
+        self.assertEqual(_vistas(), {('servicio', self.reformer.pk): 4,
+                                     ('servicio', self.mat.pk): 1})
+
+    @override_settings(VISITAS={'FLUSH_MODE': 'sync', 'FLUSH_HITS': 3, 'FLUSH_INTERVAL': 3600})
+    def test_vacia_al_juntar_flush_hits(self):
+        for _ in range(2):
+            self._beacon('servicio', self.mat.pk)
+        self.assertFalse(ViewCounter.objects.exists())
+        self._beacon('servicio', self.mat.pk)
+        self.assertEqual(_vistas(), {('servicio', self.mat.pk): 3})
+
+    def test_fallo_de_escritura_conserva_el_lote(self):
+        visitas.registrar('servicio', self.mat.pk)
+        with mock.patch('index.visitas.escribir', side_effect=DatabaseError('bloqueada')), \
+                self.assertLogs('index.visitas', 'ERROR'):
+            self.assertEqual(visitas.vaciar(), 0)
+        visitas.registrar('servicio', self.mat.pk)
+        self.assertEqual(visitas.vaciar(), 2)
+        self.assertEqual(visitas.estadisticas()['errores'], 1)
+
+    @override_settings(VISITAS={'ENABLED': False})
+    def test_desactivadas(self):
+        self.assertEqual(self._beacon('servicio', self.mat.pk).status_code, 204)
+        self.assertEqual(visitas.acumulador().pendientes(), 0)
+
+    def test_orden_por_populares(self):
+        ViewCounter.objects.create(kind='servicio', object_id=self.mat.pk, views=10)
+        url = reverse('index:servicios')
+        r = self.client.get(url)
+        self.assertLess(r.content.index(b'Reformer'), r.content.index(b'Mat'))
+        r = self.client.get(url + '?orden=populares')
+        self.assertLess(r.content.index(b'servicio-%d' % self.mat.pk),
+                        r.content.index(b'servicio-%d' % self.reformer.pk))
+        self.assertContains(r, 'aria-current="page">Más vistos')
+
+    def test_borrar_la_pagina_borra_su_contador(self):
+        ViewCounter.objects.create(kind='servicio', object_id=self.mat.pk, views=5)
+        ViewCounter.objects.create(kind='novedad', object_id=self.mat.pk, views=2)
+        self.mat.delete()
+        self.assertEqual(list(ViewCounter.objects.values_list('kind', flat=True)), ['novedad'])
+
+    def test_paginas_incluyen_el_beacon(self):
+        r = self.client.get(reverse('index:servicio_detalle', args=[self.mat.pk]))
+        self.assertContains(r, reverse('index:visita', args=['servicio', self.mat.pk]))
+        r = self.client.get(reverse('index:novedades'))
+        self.assertContains(r, f'data-visita="{reverse("index:visita", args=["novedad", self.post.pk])}"')
+
+    async def test_beacon_async(self):
+        rf = AsyncRequestFactory()
+        r = await views_async.visita(rf.post('/'), tipo='servicio', pk=self.mat.pk)
+        self.assertEqual(r.status_code, 204)
+        self.assertEqual(visitas.acumulador().pendientes(), 1)
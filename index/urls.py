@@ -8,9 +8,22 @@ index/urls.py — URLs públicas de la landing page.
   /servicios/<pk>/        → servicio_detalle
   /contacto/              → contacto_publico
   /contacto/exito/        → contacto_exito
+  /visita/<tipo>/<pk>/    → beacon de visita (POST, index/visitas.py)
+  /novedades/feed.xml     → feed Atom de novedades
+  /sitemap.xml            → índice de sitemaps (index/seo.py)
+  /sitemap-<sección>-<n>.xml
+  /robots.txt
+
+Con PUBLIC_ASYNC_VIEWS (despliegue ASGI) se enrutan las versiones async
+de index/views_async.py; bajo WSGI se usan las vistas síncronas.
 """
+from django.conf import settings
 from django.urls import path
-from . import views
+
+if getattr(settings, 'PUBLIC_ASYNC_VIEWS', False):
+    from . import views_async as views
+else:
+    from . import views
 
 app_name = 'index'
 
@@ -22,4 +35,10 @@ urlpatterns = [
     path('servicios/<int:pk>/',     views.servicio_detalle, name='servicio_detalle'),
     path('contacto/',               views.contacto_publico, name='contacto_publico'),
     path('contacto/exito/',         views.contacto_exito,   name='contacto_exito'),
+    path('visita/<str:tipo>/<int:pk>/', views.visita,   name='visita'),
+    path('novedades/feed.xml',      views.feed_novedades,   name='feed_novedades'),
+    path('sitemap.xml',             views.sitemap_indice,   name='sitemap'),
+    path('sitemap-<str:seccion>-<int:trozo>.xml',
+         views.sitemap_seccion, name='sitemap_seccion'),
+    path('robots.txt',              views.robots_txt,       name='robots'),
 ]
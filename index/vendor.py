@@ -0,0 +1,242 @@
+"""
+index/vendor.py
+
+Dependencias front-end servidas desde static/ en lugar del CDN:
+
+  vendor/bootstrap/bootstrap.min.css          → purgado contra los templates
+  vendor/bootstrap/bootstrap.bundle.min.js    → copia tal cual
+  vendor/bootstrap-icons/bootstrap-icons.min.css
+  vendor/bootstrap-icons/fonts/bootstrap-icons.woff2|woff
+                                              → solo los bi-* que usamos
+
+Se generan con `python manage.py vendor_assets` en el deploy (no se
+versionan; ver el comando). Los templates piden cada asset con
+{% vendor_url 'bootstrap_css' %}: si el archivo existe en static/ se usa
+(y pasa por ManifestStaticFilesStorage, que le agrega el hash al nombre);
+si no, se cae al CDN de siempre.
+
+El purgado es conservador: se toma como "usada" cualquier palabra que
+aparezca en templates, .py y .js de las apps del proyecto (así entran las
+clases que agrega el JS inline o los widgets de los forms), más las de
+los templates de crispy y SAFELIST (clases que solo pone
+bootstrap.bundle.js en runtime).
+"""
+import functools
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+BOOTSTRAP = '5.3.3'
+BOOTSTRAP_ICONS = '1.10.5'
+_CDN = 'https://cdn.jsdelivr.net/npm/'
+
+# nombre → (ruta en static/, URL del CDN)
+ASSETS = {
+    'bootstrap_css': ('vendor/bootstrap/bootstrap.min.css',
+                      f'{_CDN}bootstrap@{BOOTSTRAP}/dist/css/bootstrap.min.css'),
+    'bootstrap_js': ('vendor/bootstrap/bootstrap.bundle.min.js',
+                     f'{_CDN}bootstrap@{BOOTSTRAP}/dist/js/bootstrap.bundle.min.js'),
+    'bootstrap_icons': ('vendor/bootstrap-icons/bootstrap-icons.min.css',
+                        f'{_CDN}bootstrap-icons@{BOOTSTRAP_ICONS}/font/bootstrap-icons.css'),
+}
+
+# Fuente de íconos recortada (la que se precarga; ver {% vendor_hints %})
+FUENTE_ICONOS = 'vendor/bootstrap-icons/fonts/bootstrap-icons.woff2'
+
+# Fuentes sin minificar/recortar que descarga el comando
+FUENTES = {
+    'bootstrap.min.css': ASSETS['bootstrap_css'][1],
+    'bootstrap.bundle.min.js': ASSETS['bootstrap_js'][1],
+    'bootstrap-icons.css': ASSETS['bootstrap_icons'][1],
+    'bootstrap-icons.woff': f'{_CDN}bootstrap-icons@{BOOTSTRAP_ICONS}/font/fonts/bootstrap-icons.woff',
+}
+
+# Clases que bootstrap.bundle.js agrega en runtime (prefijos, sin punto)
+SAFELIST = (
+    'show', 'showing', 'hiding', 'fade', 'collapse', 'collapsing', 'collapsed',
+    'active', 'disabled', 'modal', 'offcanvas', 'dropdown', 'dropup', 'dropend',
+    'dropstart', 'tooltip', 'popover', 'bs-', 'carousel', 'was-validated',
+    'is-valid', 'is-invalid', 'navbar', 'toast', 'btn-close',
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _local(ruta):
+    return finders.find(ruta) is not None
+
+
+def url(nombre):
+    """URL del asset: la copia local si fue generada, si no el CDN."""
+    ruta, cdn = ASSETS[nombre]
+    if getattr(settings, 'VENDOR_ASSETS_LOCAL', True) and _local(ruta):
+        return static(ruta)
+    return cdn
+
+
+# ─────────────────────────────────────────────────────────────
+# CLASES USADAS
+# ─────────────────────────────────────────────────────────────
+
+_re_palabra = re.compile(r'[A-Za-z][A-Za-z0-9_-]*')
+
+
+def _archivos_a_escanear():
+    base = Path(settings.BASE_DIR)
+    for config in apps.get_app_configs():
+        ruta = Path(config.path)
+        if base in ruta.parents:
+            # App del proyecto: templates, código y JS
+            for patron in ('**/*.html', '**/*.py', '**/*.js'):
+                yield from ruta.glob(patron)
+        elif config.name.startswith('crispy'):
+            yield from ruta.glob('templates/**/*.html')
+    for directorio in (d for t in settings.TEMPLATES for d in t.get('DIRS', [])):
+        yield from Path(directorio).glob('**/*.html')
+
+
+def clases_usadas(archivos=None):
+    usadas = set()
+    for archivo in archivos if archivos is not None else _archivos_a_escanear():
+        partes = Path(archivo).parts
+        if 'migrations' in partes or 'tests' in partes or partes[-1] == 'tests.py':
+            continue
+        usadas.update(clases_usadas_en(Path(archivo).read_text(errors='ignore')))
+    return usadas
+
+
+def clases_usadas_en(texto):
+    return set(_re_palabra.findall(texto))
+
+
+# ─────────────────────────────────────────────────────────────
+# PURGADO DE CSS
+# ─────────────────────────────────────────────────────────────
+
+_re_clase = re.compile(r'\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)')
+_re_comentario = re.compile(r'/\*.*?\*/', re.S)
+_re_licencia = re.compile(r'/\*!.*?\*/', re.S)
+# At-rules cuyo contenido son reglas (se purgan por dentro)
+_AGRUPADORES = ('@media', '@supports', '@container', '@layer')
+
+
+def _cerrar(css, i):
+    """Índice de la '}' que balancea la '{' en i-1 (salta strings)."""
+    profundidad = 1
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            i = css.index(c, i + 1) + 1
+            continue
+        if c == '{':
+            profundidad += 1
+        elif c == '}':
+            profundidad -= 1
+            if profundidad == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def _reglas(css):
+    """Recorre el nivel superior: (preludio, cuerpo) o (sentencia, None)."""
+    i = 0
+    while i < len(css):
+        llave, punto_coma = css.find('{', i), css.find(';', i)
+        if llave == -1:
+            resto = css[i:].strip()
+            if resto:
+                yield resto, None
+            return
+        if punto_coma != -1 and punto_coma < llave and css[i:].lstrip().startswith('@'):
+            yield css[i:punto_coma + 1].strip(), None
+            i = punto_coma + 1
+            continue
+        fin = _cerrar(css, llave + 1)
+        yield css[i:llave].strip(), css[llave + 1:fin]
+        i = fin + 1
+
+
+def _dividir_selectores(preludio):
+    partes, profundidad, actual = [], 0, []
+    for c in preludio:
+        if c == ',' and profundidad == 0:
+            partes.append(''.join(actual))
+            actual = []
+            continue
+        profundidad += (c == '(') - (c == ')')
+        actual.append(c)
+    partes.append(''.join(actual))
+    return [p.strip() for p in partes if p.strip()]
+
+
+def _selector_usado(selector, usadas, safelist):
+    if '\\' in selector:
+        return True  # clases escapadas: no se arriesga
+    for clase in _re_clase.findall(selector):
+        if clase not in usadas and not clase.startswith(safelist):
+            return False
+    return True
+
+
+def purgar_css(css, usadas, safelist=SAFELIST):
+    """Quita las reglas cuyos selectores usan clases que no aparecen en `usadas`."""
+    salida = _re_licencia.findall(css)   # los /*! … */ de licencia se conservan
+    for preludio, cuerpo in _reglas(_re_comentario.sub('', css)):
+        if cuerpo is None:
+            salida.append(preludio)
+        elif preludio.startswith(_AGRUPADORES):
+            interno = purgar_css(cuerpo, usadas, safelist)
+            if interno:
+                salida.append(f'{preludio}{{{interno}}}')
+        elif preludio.startswith('@'):
+            salida.append(f'{preludio}{{{cuerpo}}}')   # @font-face, @keyframes…
+        else:
+            selectores = [s for s in _dividir_selectores(preludio)
+                          if _selector_usado(s, usadas, safelist)]
+            if selectores:
+                salida.append(f'{",".join(selectores)}{{{cuerpo.strip()}}}')
+    return ''.join(salida)
+
+
+# ─────────────────────────────────────────────────────────────
+# ÍCONOS
+# ─────────────────────────────────────────────────────────────
+
+_re_codepoint = re.compile(r'content:\s*"\\([0-9a-fA-F]+)"')
+_re_font_face = re.compile(r'@font-face\s*\{.*?\}', re.S)
+
+
+def recortar_iconos(css, usadas):
+    """
+    Deja solo las reglas .bi-* usadas (sin el @font-face original).
+    Devuelve (css, codepoints) para hacer el subset de la fuente.
+    """
+    css = purgar_css(_re_font_face.sub('', css), usadas, safelist=())
+    return css, sorted({int(cp, 16) for cp in _re_codepoint.findall(css)})
+
+
+def font_face(formatos=('woff2', 'woff')):
+    """@font-face apuntando a fonts/bootstrap-icons.<formato> (relativo al CSS)."""
+    src = ','.join(f'url("fonts/bootstrap-icons.{f}") format("{f}")' for f in formatos)
+    return f'@font-face{{font-display:block;font-family:"bootstrap-icons";src:{src}}}'
+
+
+def subset_fuente(origen, destino, codepoints, formato):
+    """Subset con fontTools (opcional). Devuelve False si no está instalado."""
+    try:
+        from fontTools import subset
+    except ImportError:
+        return False
+    opciones = subset.Options()
+    opciones.flavor = formato
+    opciones.layout_features = ['*']
+    fuente = subset.load_font(str(origen), opciones)
+    subsetter = subset.Subsetter(opciones)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(fuente)
+    subset.save_font(fuente, str(destino), opciones)
+    return True
@@ -1,12 +1,34 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from administrador.models import Service, BlogPost, ContactMessage
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import render, redirect
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST, require_safe
+from administrador.models import BlogPost, ContactMessage
+from Pilatesreserva import cache as cache_contenido
+from . import catalogo, seo, visitas
+
+# Clave de las últimas novedades de la landing (la invalida index/signals.py)
+CLAVE_NOVEDADES_LANDING = 'landing:novedades'
+
+
+def ultimas_novedades():
+    """Las 3 últimas publicaciones, vía la capa de cache (single-flight + SWR)."""
+    return cache_contenido.obtener(
+        CLAVE_NOVEDADES_LANDING,
+        lambda: list(BlogPost.objects.filter(is_published=True).order_by('-published_date')[:3]),
+        settings.LANDING_CACHE_TIMEOUT)
 
 
 def index(request):
     """Página principal con servicios y blog desde la BD."""
     context = {
-        'services': Service.objects.filter(is_active=True).order_by('order'),
-        'blog_posts': BlogPost.objects.filter(is_published=True).order_by('-published_date')[:3],
+        'services': catalogo.actual().servicios,
+        'blog_posts': ultimas_novedades(),
     }
     return render(request, 'index/index.html', context)
 
@@ -24,52 +46,84 @@ def novedades(request):
 
 
 def servicios(request):
-    """Página pública de todos los servicios."""
-    todos = Service.objects.filter(is_active=True).order_by('order')
-    return render(request, 'index/servicios.html', {'servicios': todos})
+    """Página pública de todos los servicios (?orden=populares: por visitas)."""
+    servicios = catalogo.actual().servicios
+    orden = request.GET.get('orden', '')
+    if orden == 'populares':
+        servicios = visitas.populares(servicios)
+    return render(request, 'index/servicios.html', {'servicios': servicios, 'orden': orden})
 
 
 def servicio_detalle(request, pk):
     """Detalle de un servicio específico."""
-    servicio = get_object_or_404(Service, pk=pk, is_active=True)
-    otros = Service.objects.filter(is_active=True).exclude(
-        pk=pk).order_by('order')[:3]
+    activos = catalogo.actual()
+    servicio = activos.get(pk)
+    if servicio is None:
+        raise Http404('Servicio no encontrado.')
     return render(request, 'index/servicio_detalle.html', {
         'servicio': servicio,
-        'otros': otros,
+        'otros': activos.otros(pk),
     })
 
 
+def validar_visita(tipo, pk, activos):
+    """Valida el beacon; los servicios, contra el catálogo en memoria (sin consultas)."""
+    if tipo not in visitas.TIPOS:
+        raise Http404('Tipo de página desconocido.')
+    if tipo == 'servicio' and activos.get(pk) is None:
+        raise Http404('Servicio no encontrado.')
+
+
+@csrf_exempt            # lo mandan también las páginas pre-renderizadas, sin token
+@require_POST
+@never_cache
+def visita(request, tipo, pk):
+    """Beacon de visita (navigator.sendBeacon): suma en memoria y responde 204."""
+    validar_visita(tipo, pk, catalogo.actual())
+    visitas.registrar(tipo, pk)
+    return HttpResponse(status=204)
+
+
+def validar_contacto(post):
+    """Limpia y valida el POST del formulario. Devuelve (datos, errores)."""
+    datos = {
+        'nombre':   post.get('nombre',   '').strip(),
+        'email':    post.get('email',    '').strip(),
+        'telefono': post.get('telefono', '').strip(),
+        'mensaje':  post.get('mensaje',  '').strip(),
+    }
+    errores = []
+    if not datos['nombre']:
+        errores.append('El nombre es obligatorio.')
+    if not datos['email'] or '@' not in datos['email']:
+        errores.append('El email no es válido.')
+    if not datos['mensaje']:
+        errores.append('El mensaje es obligatorio.')
+    return datos, errores
+
+
+def guardar_contacto(datos):
+    """
+    Crea el ContactMessage. Sus señales (aviso en el outbox, rollups)
+    escriben en la misma transacción: o queda todo o nada.
+    """
+    with transaction.atomic():
+        return ContactMessage.objects.create(
+            name=datos['nombre'], email=datos['email'],
+            phone=datos['telefono'], message=datos['mensaje'],
+            status='new',
+        )
+
+
 def contacto_publico(request):
     """Formulario de contacto público."""
     if request.method == 'POST':
-        nombre = request.POST.get('nombre',   '').strip()
-        email = request.POST.get('email',    '').strip()
-        telefono = request.POST.get('telefono', '').strip()
-        mensaje = request.POST.get('mensaje',  '').strip()
-
-        errores = []
-        if not nombre:
-            errores.append('El nombre es obligatorio.')
-        if not email or '@' not in email:
-            errores.append('El email no es válido.')
-        if not mensaje:
-            errores.append('El mensaje es obligatorio.')
-
+        datos, errores = validar_contacto(request.POST)
         if errores:
-            return render(request, 'index/contacto_form.html', {
-                'errores':  errores,
-                'nombre':   nombre,
-                'email':    email,
-                'telefono': telefono,
-                'mensaje':  mensaje,
-            })
-
-        ContactMessage.objects.create(
-            name=nombre, email=email,
-            phone=telefono, message=mensaje,
-            status='new',
-        )
+            return render(request, 'index/contacto_form.html',
+                          {'errores': errores, **datos})
+
+        guardar_contacto(datos)
         return redirect('index:contacto_exito')
 
     return render(request, 'index/contacto_form.html')
@@ -78,3 +132,47 @@ def contacto_publico(request):
 def contacto_exito(request):
     """Confirmación tras enviar el formulario de contacto."""
     return render(request, 'index/contacto_exito.html')
+
+
+# ─────────────────────────────────────────────────────────────
+# SITEMAPS, FEED Y ROBOTS (index/seo.py)
+# ─────────────────────────────────────────────────────────────
+
+def _respuesta_documento(request, documento, content_type):
+    """Documento pre-serializado con ETag/Last-Modified y GET condicional (304)."""
+    respuesta = HttpResponse(documento.contenido, content_type=content_type)
+    respuesta['ETag'] = documento.etag
+    ultima = documento.ultima_modificacion
+    if ultima is not None:
+        respuesta['Last-Modified'] = http_date(ultima.timestamp())
+    patch_cache_control(respuesta, public=True, max_age=seo.config()['MAX_AGE'])
+    return get_conditional_response(
+        request, etag=documento.etag,
+        last_modified=int(ultima.timestamp()) if ultima else None, response=respuesta)
+
+
+@require_safe
+def sitemap_indice(request):
+    return _respuesta_documento(request, seo.sitemap_indice(seo.base_url(request)),
+                                'application/xml; charset=utf-8')
+
+
+@require_safe
+def sitemap_seccion(request, seccion, trozo):
+    documento = seo.sitemap(seo.base_url(request), seccion, trozo)
+    if documento is None:
+        raise Http404('Sitemap inexistente.')
+    return _respuesta_documento(request, documento, 'application/xml; charset=utf-8')
+
+
+@require_safe
+def feed_novedades(request):
+    return _respuesta_documento(request, seo.feed_novedades(seo.base_url(request)),
+                                'application/atom+xml; charset=utf-8')
+
+
+@require_safe
+def robots_txt(request):
+    sitemap = seo.base_url(request) + reverse('index:sitemap')
+    return HttpResponse(f'User-agent: *\nDisallow: /administrador/\nDisallow: /login/\n'
+                        f'\nSitemap: {sitemap}\n', content_type='text/plain')
@@ -0,0 +1,91 @@
+"""
+index/views_async.py — versiones async de las vistas públicas.
+
+Se usan cuando el sitio corre bajo ASGI (PUBLIC_ASYNC_VIEWS, ver
+Pilatesreserva/asgi.py). Mismos templates y contexto que index/views.py,
+pero la BD se consulta con el ORM async (aget, acreate, async for), así
+un INSERT lento de contacto_publico no bloquea un worker completo.
+
+Los querysets se materializan antes de renderizar: el template no puede
+disparar consultas desde el event loop. Los servicios salen del snapshot
+en memoria (index/catalogo.py).
+
+Nota: con SQLite el ORM async igual ejecuta cada consulta en un hilo
+(sync_to_async); la ganancia está en que el worker ASGI sigue atendiendo
+otras conexiones mientras tanto.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect, render
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from administrador.models import BlogPost
+from . import catalogo, visitas
+from .views import (  # noqa: F401
+    contacto_exito, feed_novedades, guardar_contacto, nosotros, robots_txt,
+    sitemap_indice, sitemap_seccion, ultimas_novedades, validar_contacto, validar_visita,
+)
+
+
+async def index(request):
+    """Página principal con servicios y blog desde la BD."""
+    context = {
+        'services': (await catalogo.aactual()).servicios,
+        'blog_posts': await sync_to_async(ultimas_novedades)(),
+    }
+    return render(request, 'index/index.html', context)
+
+
+async def novedades(request):
+    """Página de blog/novedades completa."""
+    posts = [p async for p in
+             BlogPost.objects.filter(is_published=True).order_by('-published_date')]
+    return render(request, 'index/novedades.html', {'posts': posts})
+
+
+async def servicios(request):
+    """Página pública de todos los servicios (?orden=populares: por visitas)."""
+    servicios = (await catalogo.aactual()).servicios
+    orden = request.GET.get('orden', '')
+    if orden == 'populares':
+        servicios = await sync_to_async(visitas.populares)(servicios)
+    return render(request, 'index/servicios.html', {'servicios': servicios, 'orden': orden})
+
+
+async def servicio_detalle(request, pk):
+    """Detalle de un servicio específico."""
+    activos = await catalogo.aactual()
+    servicio = activos.get(pk)
+    if servicio is None:
+        raise Http404('Servicio no encontrado.')
+    return render(request, 'index/servicio_detalle.html', {
+        'servicio': servicio,
+        'otros': activos.otros(pk),
+    })
+
+
+@csrf_exempt
+@require_POST
+@never_cache
+async def visita(request, tipo, pk):
+    """Beacon de visita: suma en memoria y responde 204."""
+    validar_visita(tipo, pk, await catalogo.aactual())
+    await visitas.aregistrar(tipo, pk)
+    return HttpResponse(status=204)
+
+
+async def contacto_publico(request):
+    """Formulario de contacto público."""
+    if request.method == 'POST':
+        datos, errores = validar_contacto(request.POST)
+        if errores:
+            return render(request, 'index/contacto_form.html',
+                          {'errores': errores, **datos})
+
+        # atomic() no existe en async: la transacción corre en un hilo
+        await sync_to_async(guardar_contacto)(datos)
+        return redirect('index:contacto_exito')
+
+    return render(request, 'index/contacto_form.html')
@@ -0,0 +1,281 @@
+"""
+index/visitas.py
+
+Conteo de visitas de servicios y novedades con poco costo por request:
+
+  - Las páginas públicas avisan la visita con un beacon (POST a
+    /visita/<tipo>/<pk>/, ver index/views.py). Así se cuentan también
+    las páginas pre-renderizadas que nginx sirve sin pasar por Django
+    (index/prerender.py), y no las que se renderizan para publicar.
+  - registrar() solo suma en un Counter en memoria, por proceso.
+  - Cada FLUSH_INTERVAL segundos o FLUSH_HITS visitas, el lote se
+    escribe en ViewCounter con un UPDATE aditivo (views = views + n) por
+    cada incremento distinto, después de crear las filas que falten
+    (bulk_create con ignore_conflicts). Como cada proceso solo suma lo
+    suyo, varios workers escriben sobre las mismas filas sin pisarse.
+  - Al escribir se descartan los pk que no existen (o no se publican):
+    un beacon inventado no deja filas.
+  - Si la escritura falla, el lote vuelve a la memoria y se reintenta en
+    el siguiente vaciado. Al terminar el proceso (atexit) se escribe lo
+    pendiente; un SIGKILL pierde a lo sumo el último intervalo.
+
+populares() ordena los servicios por visitas, con el ranking cacheado
+RANKING_TTL segundos (Pilatesreserva/cache.py): /servicios/?orden=populares.
+Con PRERENDER_ENABLED, nginx debe mandar a Django los requests con query
+string (p.ej. `if ($args) { ... @django }`), o se serviría el orden normal.
+
+VISITAS['FLUSH_MODE']: "thread" (hilo de fondo, default) o "sync" (en el
+mismo hilo que registra; útil en tests).
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from administrador.models import BlogPost, Service, ViewCounter
+from Pilatesreserva import cache as cache_contenido
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'FLUSH_MODE': 'thread',
+    'FLUSH_INTERVAL': 30,       # segundos máximos que una visita espera en memoria
+    'FLUSH_HITS': 200,          # o antes, al juntar estas visitas
+    'MAX_KEYS': 5000,           # tope de páginas distintas en memoria (beacons basura)
+    'RANKING_TTL': 5 * 60,
+    'RANKING_SIZE': 100,
+}
+
+# tipo del beacon → páginas que cuentan
+TIPOS = {
+    ViewCounter.SERVICIO: lambda: Service.objects.filter(is_active=True),
+    ViewCounter.NOVEDAD: lambda: BlogPost.objects.filter(is_published=True),
+}
+MODELOS = {Service: ViewCounter.SERVICIO, BlogPost: ViewCounter.NOVEDAD}
+
+_stats = Counter()
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'VISITAS', {})}
+
+
+def _contar(evento, n=1):
+    _stats[evento] += n
+
+
+def estadisticas():
+    """Visitas de este proceso: registradas, escritas, descartadas y errores de escritura."""
+    return {evento: _stats[evento]
+            for evento in ('registradas', 'escritas', 'descartadas', 'errores')}
+
+
+# ─────────────────────────────────────────────────────────────
+# ESCRITURA DE UN LOTE
+# ─────────────────────────────────────────────────────────────
+
+def escribir(lote, using=None):
+    """
+    Suma el lote {(tipo, pk): visitas} a ViewCounter. Devuelve cuántas
+    visitas escribió (las de páginas inexistentes se descartan).
+    """
+    por_tipo = defaultdict(dict)
+    for (tipo, pk), n in lote.items():
+        if tipo in TIPOS:
+            por_tipo[tipo][pk] = n
+    ahora = timezone.now()
+    escritas = 0
+    contadores = ViewCounter.objects.using(using)
+    with transaction.atomic(using=using):
+        for tipo, conteos in por_tipo.items():
+            existentes = set(TIPOS[tipo]().using(using).filter(pk__in=list(conteos))
+                             .values_list('pk', flat=True))
+            conteos = {pk: n for pk, n in conteos.items() if pk in existentes}
+            if not conteos:
+                continue
+            contadores.bulk_create([ViewCounter(kind=tipo, object_id=pk) for pk in conteos],
+                                   ignore_conflicts=True)
+            # Un UPDATE por incremento distinto (casi siempre unos pocos: 1, 2, 3…)
+            por_incremento = defaultdict(list)
+            for pk, n in conteos.items():
+                por_incremento[n].append(pk)
+            for n, pks in por_incremento.items():
+                contadores.filter(kind=tipo, object_id__in=pks).update(
+                    views=F('views') + n, updated_at=ahora)
+            escritas += sum(conteos.values())
+    return escritas
+
+
+# ─────────────────────────────────────────────────────────────
+# ACUMULADOR EN MEMORIA (uno por proceso)
+# ─────────────────────────────────────────────────────────────
+
+class Acumulador:
+    def __init__(self):
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pendientes = Counter()
+        self._hits = 0
+        self._desde = None          # monotonic de la visita más vieja sin escribir
+        self._timer = None
+        self._pool = None
+        self._programado = False    # ya hay un vaciado en la cola del hilo
+
+    def pendientes(self):
+        with self._lock:
+            return sum(self._pendientes.values())
+
+    def registrar(self, tipo, pk):
+        cfg = config()
+        clave = (tipo, pk)
+        with self._lock:
+            if clave not in self._pendientes and len(self._pendientes) >= cfg['MAX_KEYS']:
+                _contar('descartadas')
+                return
+            self._pendientes[clave] += 1
+            self._hits += 1
+            if self._desde is None:
+                self._desde = time.monotonic()
+            toca = (self._hits >= cfg['FLUSH_HITS']
+                    or time.monotonic() - self._desde >= cfg['FLUSH_INTERVAL'])
+            en_hilo = cfg['FLUSH_MODE'] != 'sync'
+            if en_hilo and not toca and self._timer is None:
+                # Proceso sin más tráfico: igual se escribe al cumplirse el intervalo
+                self._timer = threading.Timer(cfg['FLUSH_INTERVAL'], self._disparar)
+                self._timer.daemon = True
+                self._timer.start()
+        _contar('registradas')
+        if toca and en_hilo:
+            self._disparar()
+        elif toca:
+            self.vaciar()
+
+    def _disparar(self):
+        with self._lock:
+            if self._programado:
+                return
+            self._programado = True
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='visitas')
+            pool = self._pool
+        pool.submit(self._vaciar_en_hilo)
+
+    def _vaciar_en_hilo(self):
+        close_old_connections()
+        try:
+            self.vaciar()
+        finally:
+            close_old_connections()
+
+    def _tomar(self):
+        with self._lock:
+            lote, self._pendientes = self._pendientes, Counter()
+            self._hits, self._desde = 0, None
+            self._programado = False
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return lote
+
+    def vaciar(self, using=None):
+        """Escribe lo pendiente. Devuelve las visitas escritas."""
+        lote = self._tomar()
+        if not lote:
+            return 0
+        try:
+            escritas = escribir(lote, using)
+        except Exception:
+            logger.exception('No se pudieron escribir %s visitas; se reintenta',
+                             sum(lote.values()))
+            _contar('errores')
+            with self._lock:
+                self._pendientes.update(lote)
+                if self._desde is None:
+                    self._desde = time.monotonic()
+            return 0
+        _contar('escritas', escritas)
+        _contar('descartadas', sum(lote.values()) - escritas)
+        return escritas
+
+
+_acumulador = None
+_acumulador_lock = threading.Lock()
+
+
+def acumulador():
+    """El acumulador de este proceso (uno nuevo después de un fork)."""
+    global _acumulador
+    with _acumulador_lock:
+        if _acumulador is None or _acumulador.pid != os.getpid():
+            _acumulador = Acumulador()
+        return _acumulador
+
+
+def reiniciar():
+    """Descarta lo pendiente sin escribirlo (tests)."""
+    global _acumulador
+    with _acumulador_lock:
+        _acumulador = None
+    _stats.clear()
+
+
+def registrar(tipo, pk):
+    if config()['ENABLED']:
+        acumulador().registrar(tipo, pk)
+
+
+async def aregistrar(tipo, pk):
+    # En modo "sync" el vaciado toca la BD: fuera del event loop
+    if config()['FLUSH_MODE'] == 'sync':
+        await sync_to_async(registrar)(tipo, pk)
+    else:
+        registrar(tipo, pk)
+
+
+def vaciar(using=None):
+    return acumulador().vaciar(using)
+
+
+@atexit.register
+def _al_salir():
+    if _acumulador is not None and _acumulador.pid == os.getpid():
+        try:
+            _acumulador.vaciar()
+        except Exception:           # BD ya cerrada, etc.: no romper el apagado
+            pass
+
+
+def olvidar(modelo, pk, using=None):
+    """Borra el contador de una página eliminada (index/signals.py)."""
+    ViewCounter.objects.using(using).filter(kind=MODELOS[modelo], object_id=pk).delete()
+
+
+# ─────────────────────────────────────────────────────────────
+# LECTURA
+# ─────────────────────────────────────────────────────────────
+
+def ranking(tipo):
+    """Los pk más visitados de `tipo`, de más a menos (cacheado)."""
+    cfg = config()
+    return cache_contenido.obtener(
+        f'visitas:ranking:{tipo}',
+        lambda: list(ViewCounter.objects.filter(kind=tipo, views__gt=0)
+                     .order_by('-views', 'object_id')
+                     .values_list('object_id', flat=True)[:cfg['RANKING_SIZE']]),
+        cfg['RANKING_TTL'])
+
+
+def populares(servicios):
+    """Los servicios ordenados por visitas; los sin visitas quedan en su orden."""
+    posicion = {pk: i for i, pk in enumerate(ranking(ViewCounter.SERVICIO))}
+    return sorted(servicios, key=lambda s: posicion.get(s.pk, len(posicion)))
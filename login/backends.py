@@ -1,12 +1,26 @@
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
 UserModel = get_user_model()
 
+USER_CACHE_KEY = 'login:user:{pk}'
+
+
+def invalidar_usuario_cacheado(pk):
+    """Elimina del cache el usuario (se llama desde las señales de User)."""
+    cache.delete(USER_CACHE_KEY.format(pk=pk))
+
 
 class EmailOrUsernameModelBackend(ModelBackend):
     """
     Permite autenticarse con username O con email (case-insensitive).
+
+    get_user() se apoya en el cache: AuthenticationMiddleware lo llama en
+    cada request autenticado, así que el panel no consulta la tabla de
+    usuarios en cada página. El cache se invalida al guardar/eliminar
+    el usuario (login/signals.py).
     """
 
     def authenticate(self, request, username=None, password=None, **kwargs):
@@ -24,3 +38,16 @@ class EmailOrUsernameModelBackend(ModelBackend):
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
+
+    def get_user(self, user_id):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+        if not timeout:
+            return super().get_user(user_id)
+
+        key = USER_CACHE_KEY.format(pk=user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout)
+        return user
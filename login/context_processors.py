@@ -0,0 +1,16 @@
+"""
+login/context_processors.py
+Expone el Principal del request a los templates como {{ principal }}.
+Los templates del panel lo usan en vez de request.user para no forzar
+la carga del usuario desde la BD.
+
+Es perezoso: las páginas públicas no lo usan y así no tocan la sesión
+(importante en las vistas async, que no pueden consultar la BD al renderizar).
+"""
+from django.utils.functional import SimpleLazyObject
+
+from .principal import get_principal
+
+
+def principal(request):
+    return {'principal': SimpleLazyObject(lambda: get_principal(request))}
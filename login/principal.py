@@ -0,0 +1,125 @@
+"""
+login/principal.py
+
+"Principal": foto liviana de quién hace el request y qué puede hacer.
+
+Todos los chequeos de rol (solo_admin, solo_superadmin, rol_requerido,
+_es_admin) pasan por aquí para que la regla sea la misma en todo el
+proyecto y se calcule una sola vez:
+
+  - Por request: queda guardado en request._principal.
+  - Por sesión: se guarda en la sesión junto a una versión. Mientras la
+    versión del usuario en el cache no cambie, los decoradores ni
+    siquiera evalúan request.user (cero consultas).
+  - Al guardar/eliminar un User (p.ej. UsuarioEditarForm) se invalida
+    la versión → el siguiente request lo recalcula desde la BD.
+  - La versión vence a los PRINCIPAL_CACHE_TIMEOUT segundos (por defecto
+    AUTH_USER_CACHE_TIMEOUT): con un cache por proceso (locmem) la
+    invalidación solo llega a un worker, así que en los demás un usuario
+    desactivado o degradado conserva sus permisos a lo más ese tiempo,
+    igual que el usuario cacheado en login/backends.py. 0 = no se usa el
+    principal guardado en la sesión.
+"""
+import uuid
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+
+SESSION_PRINCIPAL_KEY = '_principal'
+VERSION_CACHE_KEY = 'login:principal-version:{pk}'
+
+
+@dataclass(frozen=True)
+class Principal:
+    pk: object = None
+    username: str = ''
+    nombre: str = ''
+    is_authenticated: bool = False
+    is_superuser: bool = False
+    is_active: bool = False
+    rol: str = ''
+
+    @classmethod
+    def desde_usuario(cls, user):
+        if user is None or not user.is_authenticated:
+            return ANONIMO
+        return cls(
+            pk=user.pk,
+            username=user.get_username(),
+            nombre=user.get_full_name() or user.get_username(),
+            is_authenticated=True,
+            is_superuser=user.is_superuser,
+            is_active=user.is_active,
+            rol=getattr(user, 'rol', '') or '',
+        )
+
+    @property
+    def es_administrador(self):
+        """rol = 'administrador' y cuenta activa (login privado)."""
+        return self.is_active and self.rol == 'administrador'
+
+    @property
+    def puede_usar_panel(self):
+        """Superusuario o administrador activo (panel CMS)."""
+        return self.is_active and (self.is_superuser or self.rol == 'administrador')
+
+    @property
+    def es_superadmin(self):
+        return self.is_active and self.is_superuser
+
+
+ANONIMO = Principal()
+
+
+def _timeout():
+    timeout = getattr(settings, 'PRINCIPAL_CACHE_TIMEOUT', None)
+    if timeout is None:
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+    return timeout
+
+
+def _version(pk, timeout):
+    key = VERSION_CACHE_KEY.format(pk=pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout)
+        version = cache.get(key)
+    return version
+
+
+def invalidar_principal(pk):
+    """Fuerza a recalcular el principal del usuario en su próximo request."""
+    cache.delete(VERSION_CACHE_KEY.format(pk=pk))
+
+
+def get_principal(request):
+    """Devuelve el Principal del request, resolviéndolo a lo más una vez."""
+    principal = getattr(request, '_principal', None)
+    if principal is not None:
+        return principal
+
+    session = getattr(request, 'session', None)
+    user_id = session.get(SESSION_KEY) if session is not None else None
+    principal = None
+
+    timeout = _timeout()
+    if user_id is not None and timeout:
+        guardado = session.get(SESSION_PRINCIPAL_KEY)
+        version = _version(user_id, timeout)
+        if (guardado and version is not None
+                and guardado.get('version') == version
+                and str(guardado['datos'].get('pk')) == str(user_id)):
+            principal = Principal(**guardado['datos'])
+        else:
+            principal = Principal.desde_usuario(getattr(request, 'user', None))
+            if principal.is_authenticated:
+                session[SESSION_PRINCIPAL_KEY] = {
+                    'version': version, 'datos': asdict(principal)}
+
+    if principal is None:
+        principal = Principal.desde_usuario(getattr(request, 'user', None))
+
+    request._principal = principal
+    return principal
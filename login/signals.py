@@ -0,0 +1,20 @@
+"""
+login/signals.py
+Invalida el usuario cacheado por el backend y el Principal guardado en
+sesión cuando el usuario cambia en la BD (p.ej. UsuarioEditarForm.save).
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidar_usuario_cacheado
+from .principal import invalidar_principal
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def usuario_modificado(sender, instance, **kwargs):
+    invalidar_usuario_cacheado(instance.pk)
+    invalidar_principal(instance.pk)
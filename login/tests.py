@@ -1,3 +1,141 @@
-from django.test import TestCase
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from administrador.forms import UsuarioEditarForm
+from login import throttling
+from login.principal import VERSION_CACHE_KEY, Principal, get_principal
+
+User = get_user_model()
+
+
+@override_settings(
+    LOGIN_THROTTLE={'LIMIT_IP': 10, 'LIMIT_USERNAME': 3, 'WINDOW': 300},
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class LoginThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('login:login')
+        User.objects.create_user(
+            username='ana', password='clave-segura-123', rol='administrador')
+
+    def _post(self, username='ana', password='mala', ip='10.0.0.1'):
+        return self.client.post(self.url, {
+            'username': username, 'password': password,
+        }, REMOTE_ADDR=ip)
+
+    def test_bloquea_por_usuario_sin_hashear(self):
+        for _ in range(3):
+            self.assertEqual(self._post().status_code, 200)
+        with patch('login.views.authenticate') as auth:
+            r = self._post(password='clave-segura-123')
+        self.assertEqual(r.status_code, 429)
+        auth.assert_not_called()
+
+    def test_usuario_normalizado(self):
+        for nombre in ('ana', ' ANA ', 'Ana'):
+            self._post(username=nombre)
+        self.assertEqual(self._post(username='aNa').status_code, 429)
+
+    def test_bloquea_por_ip_aunque_rote_usuarios(self):
+        for i in range(10):
+            self._post(username=f'u{i}')
+        self.assertEqual(self._post(username='otro').status_code, 429)
+        self.assertEqual(self._post(username='otro', ip='10.0.0.2').status_code, 200)
+
+    def test_login_exitoso_limpia_fallos_del_usuario(self):
+        self._post()
+        self._post()
+        r = self._post(password='clave-segura-123')
+        self.assertEqual(r.status_code, 302)
+        self.client.logout()
+        for _ in range(2):
+            self.assertEqual(self._post().status_code, 200)
+
+    def test_metricas_de_bloqueo(self):
+        for _ in range(5):
+            self._post()
+        stats = throttling.estadisticas()
+        self.assertEqual(stats['bloqueados'], 2)
+        self.assertGreater(stats['ms_ahorrados'], 0)
+
+    def test_ventana_deslizante_pondera_la_previa(self):
+        clave = f'{throttling.PREFIX}:ip:10.9.9.9'
+        cache.set(f'{clave}:2', 3)   # ventana [600, 900)
+        # Mitad de la ventana siguiente → cuenta la mitad de la previa
+        self.assertAlmostEqual(throttling._conteo(clave, ahora=1050.0), 1.5)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTH_USER_CACHE_TIMEOUT=0,
+    PRINCIPAL_CACHE_TIMEOUT=300,
+)
+class PrincipalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='ana', password='x', rol='administrador',
+            first_name='Ana', last_name='Pérez')
+        self.client.login(username='ana', password='x')
+
+    def test_se_resuelve_una_vez_por_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.admin
+        request.session = self.client.session
+        self.assertIs(get_principal(request), get_principal(request))
+
+    def test_panel_no_carga_el_usuario_desde_la_bd(self):
+        url = reverse('administrador:servicios_list')
+        self.client.get(url)   # primer request: guarda el principal en sesión
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(url)
+        self.assertContains(r, 'Ana Pérez')
+        self.assertFalse([q for q in ctx.captured_queries if 'login_user' in q['sql']])
+
+    def test_usuario_editar_form_invalida_el_principal(self):
+        url = reverse('administrador:home')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        form = UsuarioEditarForm({
+            'username': 'ana', 'first_name': 'Ana', 'last_name': 'Pérez',
+            'email': '', 'is_active': False,
+        }, instance=self.admin)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_la_version_vence(self):
+        # Sin vencimiento, un worker que no vio la invalidación (cache por
+        # proceso) confiaría para siempre en el principal de la sesión.
+        url = reverse('administrador:home')
+        self.client.get(url)
+        clave = cache.make_and_validate_key(
+            VERSION_CACHE_KEY.format(pk=self.admin.pk))
+        self.assertIsNotNone(cache._expire_info[clave])
+        # Vencida la versión, el principal se recalcula desde la BD
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        cache._expire_info[clave] = 0
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    @override_settings(PRINCIPAL_CACHE_TIMEOUT=0)
+    def test_timeout_cero_no_usa_la_sesion(self):
+        url = reverse('administrador:home')
+        self.client.get(url)
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_reglas_de_rol(self):
+        admin = Principal.desde_usuario(self.admin)
+        self.assertTrue(admin.es_administrador and admin.puede_usar_panel)
+        self.assertFalse(admin.es_superadmin)
+        root = User(username='root', is_superuser=True, is_active=True, rol='')
+        self.assertTrue(Principal.desde_usuario(root).puede_usar_panel)
+        self.assertFalse(Principal.desde_usuario(root).es_administrador)
+        self.assertFalse(Principal.desde_usuario(None).is_authenticated)
@@ -0,0 +1,164 @@
+"""
+login/throttling.py
+
+Limitador de intentos para el login privado (/login/pr-gestion-k7x/).
+
+Cada POST al login termina en authenticate() → check_password() (PBKDF2),
+que es deliberadamente caro. Un atacante que martillee la URL puede
+saturar la CPU. Este módulo corta esos intentos ANTES de hashear:
+
+  - Ventana deslizante (aproximada con dos contadores de ventana fija)
+    por IP y por nombre de usuario normalizado.
+  - Los contadores viven en el cache compartido (settings.CACHES), así
+    todos los workers ven los mismos números.
+  - Métricas: intentos bloqueados y tiempo de hashing ahorrado (estimado
+    con el promedio móvil de lo que tarda authenticate()).
+
+Configuración (settings.LOGIN_THROTTLE, todas opcionales):
+  LIMIT_IP        → intentos fallidos permitidos por IP en la ventana
+  LIMIT_USERNAME  → intentos fallidos permitidos por usuario en la ventana
+  WINDOW          → tamaño de la ventana en segundos
+  CACHE_ALIAS     → alias de cache a usar
+  TRUST_X_FORWARDED_FOR → usar X-Forwarded-For (solo detrás de un proxy propio)
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'LIMIT_IP': 20,
+    'LIMIT_USERNAME': 5,
+    'WINDOW': 300,
+    'CACHE_ALIAS': 'default',
+    'TRUST_X_FORWARDED_FOR': False,
+}
+
+PREFIX = 'login-throttle'
+STATS_BLOCKED = f'{PREFIX}:stats:blocked'
+STATS_SAVED_MS = f'{PREFIX}:stats:saved_ms'
+
+# Promedio móvil (EWMA) del costo de authenticate(), por proceso.
+# Arranca en un valor conservador para PBKDF2 con los parámetros de Django.
+_hash_cost_ms = 250.0
+_EWMA_ALPHA = 0.2
+
+
+def _config():
+    return {**DEFAULTS, **getattr(settings, 'LOGIN_THROTTLE', {})}
+
+
+def _cache():
+    return caches[_config()['CACHE_ALIAS']]
+
+
+def normalizar_usuario(username):
+    """Mismo criterio que el backend (iexact): sin espacios y en minúsculas."""
+    return (username or '').strip().casefold()
+
+
+def ip_cliente(request):
+    if _config()['TRUST_X_FORWARDED_FOR']:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '') or 'desconocida'
+
+
+def _claves(request, username):
+    # El usuario se hashea para no dejar nombres en claro en el cache
+    usuario = hashlib.sha256(
+        normalizar_usuario(username).encode()).hexdigest()[:32]
+    cfg = _config()
+    return [
+        (f'{PREFIX}:ip:{ip_cliente(request)}', cfg['LIMIT_IP']),
+        (f'{PREFIX}:user:{usuario}', cfg['LIMIT_USERNAME']),
+    ]
+
+
+def _ventana(ahora=None):
+    window = _config()['WINDOW']
+    ahora = time.time() if ahora is None else ahora
+    actual = int(ahora // window)
+    # Fracción de la ventana actual ya transcurrida
+    transcurrido = (ahora % window) / window
+    return actual, transcurrido
+
+
+def _conteo(clave, ahora=None):
+    """
+    Estimación de la ventana deslizante:
+        previa * (1 - transcurrido) + actual
+    Dos lecturas en un solo get_many, sin listas de timestamps.
+    """
+    actual, transcurrido = _ventana(ahora)
+    k_actual, k_previa = f'{clave}:{actual}', f'{clave}:{actual - 1}'
+    valores = _cache().get_many([k_actual, k_previa])
+    return valores.get(k_previa, 0) * (1 - transcurrido) + valores.get(k_actual, 0)
+
+
+def esta_bloqueado(request, username):
+    """
+    True si la IP o el usuario superaron el límite.
+    No toca la base de datos ni hashea nada: solo lee el cache.
+    """
+    for clave, limite in _claves(request, username):
+        if _conteo(clave) >= limite:
+            _registrar_bloqueo(request, clave)
+            return True
+    return False
+
+
+def registrar_fallo(request, username):
+    """Suma un intento fallido a la ventana actual de la IP y del usuario."""
+    cache = _cache()
+    actual, _ = _ventana()
+    # Vive dos ventanas: la actual y la siguiente (donde actúa como "previa")
+    ttl = _config()['WINDOW'] * 2
+    for clave, _limite in _claves(request, username):
+        k = f'{clave}:{actual}'
+        if not cache.add(k, 1, ttl):
+            try:
+                cache.incr(k)
+            except ValueError:
+                # Expiró entre add() e incr()
+                cache.set(k, 1, ttl)
+
+
+def limpiar_usuario(request, username):
+    """Login exitoso → se olvidan los fallos de ese usuario (no los de la IP)."""
+    actual, _ = _ventana()
+    clave = _claves(request, username)[1][0]
+    _cache().delete_many([f'{clave}:{actual}', f'{clave}:{actual - 1}'])
+
+
+def medir_autenticacion(segundos):
+    """Actualiza el costo promedio de authenticate() usado en las métricas."""
+    global _hash_cost_ms
+    _hash_cost_ms += _EWMA_ALPHA * (segundos * 1000 - _hash_cost_ms)
+
+
+def _registrar_bloqueo(request, clave):
+    cache = _cache()
+    for k, delta in ((STATS_BLOCKED, 1), (STATS_SAVED_MS, int(_hash_cost_ms))):
+        if not cache.add(k, delta, None):
+            try:
+                cache.incr(k, delta)
+            except ValueError:
+                cache.set(k, delta, None)
+    logger.warning('Login bloqueado por throttling (%s) desde %s',
+                   clave.split(':')[1], ip_cliente(request))
+
+
+def estadisticas():
+    """Métricas acumuladas: bloqueos y milisegundos de hashing evitados."""
+    valores = _cache().get_many([STATS_BLOCKED, STATS_SAVED_MS])
+    return {
+        'bloqueados': valores.get(STATS_BLOCKED, 0),
+        'ms_ahorrados': valores.get(STATS_SAVED_MS, 0),
+        'costo_hash_ms': round(_hash_cost_ms, 1),
+    }
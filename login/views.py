@@ -9,12 +9,20 @@ ARQUITECTURA:
 
 El login secreto SOLO acepta usuarios con rol == 'administrador'.
 Los superusuarios NO pueden entrar por aquí (son cuentas técnicas).
+
+Los intentos fallidos se limitan por IP y por usuario (ver throttling.py);
+al superar el límite se responde 429 sin llegar a hashear la contraseña.
 """
+import time
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.cache import never_cache
 
+from . import throttling
+from .principal import Principal, get_principal
+
 
 @never_cache
 @require_http_methods(["GET", "POST"])
@@ -22,8 +30,9 @@ def login_admin(request):
     """Acceso privado exclusivo para usuarios con rol = 'administrador'."""
 
     # Ya está logueado como administrador → directo al panel
-    if request.user.is_authenticated:
-        if _es_admin(request.user):
+    principal = get_principal(request)
+    if principal.is_authenticated:
+        if principal.es_administrador:
             return redirect('administrador:home')
         # Logueado pero sin rol admin (ej: superusuario perdido aquí)
         logout(request)
@@ -41,10 +50,20 @@ def login_admin(request):
                 'username': username,
             })
 
+        # Corte temprano: ni consulta a la BD ni PBKDF2 si ya se pasó el límite
+        if throttling.esta_bloqueado(request, username):
+            return render(request, 'login/login_admin.html', {
+                'error': 'Demasiados intentos. Espera unos minutos e inténtalo de nuevo.',
+                'username': username,
+            }, status=429)
+
+        inicio = time.perf_counter()
         user = authenticate(request, username=username, password=password)
+        throttling.medir_autenticacion(time.perf_counter() - inicio)
 
         if user is not None:
             if _es_admin(user):
+                throttling.limpiar_usuario(request, username)
                 login(request, user)
                 next_url = request.POST.get('next') or request.GET.get('next')
                 if next_url and next_url.startswith('/'):
@@ -58,6 +77,7 @@ def login_admin(request):
                     'username': username,
                 })
         else:
+            throttling.registrar_fallo(request, username)
             return render(request, 'login/login_admin.html', {
                 'error': 'Usuario o contraseña incorrectos.',
                 'username': username,
@@ -81,6 +101,4 @@ def _es_admin(user):
     Devuelve True SOLO si el usuario tiene rol = 'administrador'.
     Los superusuarios (dev/técnicos) NO tienen acceso por aquí.
     """
-    if not user or not user.is_active:
-        return False
-    return getattr(user, 'rol', None) == 'administrador'
+    return Principal.desde_usuario(user).es_administrador
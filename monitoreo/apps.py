@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class MonitoreoConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoreo'
+    verbose_name = 'Monitoreo'
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from .medicion import instalar_en_conexion, instalar_medicion_templates
+        instalar_medicion_templates()
+        connection_created.connect(instalar_en_conexion)
+        # Conexiones que ya estuvieran abiertas al arrancar
+        for conn in connections.all(initialized_only=True):
+            instalar_en_conexion(None, conn)
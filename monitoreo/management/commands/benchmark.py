@@ -0,0 +1,287 @@
+"""
+manage.py benchmark
+
+Benchmark reproducible de las rutas calientes (públicas y del panel).
+
+  1. Siembra N servicios, publicaciones y mensajes marcados con el
+     prefijo "[bench]" (se borran al final salvo --keep).
+  2. Levanta un servidor WSGI local con hilos (o usa --url para apuntar
+     a un servidor ya corriendo, p.ej. uvicorn/gunicorn).
+  3. Recorre cada escenario con --concurrency clientes concurrentes.
+  4. Imprime JSON con p50/p95/p99, promedio y throughput por escenario.
+
+Ejemplos:
+  python manage.py benchmark --seed 200 --requests 500 --concurrency 16
+  python manage.py benchmark --output base.json
+  python manage.py benchmark --compare base.json      # muestra deltas
+
+WSGI vs ASGI (capacidad con muchas conexiones concurrentes):
+  gunicorn Pilatesreserva.wsgi -w 2 -b 127.0.0.1:8000 &
+  uvicorn Pilatesreserva.asgi:application --workers 2 --port 8001 &
+  python manage.py benchmark --url http://127.0.0.1:8000 --sweep 8,64,256 --output wsgi.json
+  python manage.py benchmark --url http://127.0.0.1:8001 --sweep 8,64,256 --compare wsgi.json
+"""
+import json
+import math
+import platform
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from administrador import estadisticas
+from administrador.models import BlogPost, ContactMessage, Service
+
+PREFIJO = '[bench]'
+BENCH_USER = 'bench-admin'
+
+# (nombre, método, url_name, requiere sesión de admin)
+ESCENARIOS = [
+    ('landing', 'GET', 'index:index', False),
+    ('novedades', 'GET', 'index:novedades', False),
+    ('servicios', 'GET', 'index:servicios', False),
+    ('contacto_post', 'POST', 'index:contacto_publico', False),
+    ('admin_home', 'GET', 'administrador:home', True),
+    ('mensajes_list', 'GET', 'administrador:mensajes_list', True),
+]
+
+
+class _HandlerSilencioso(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores:
+        return 0.0
+    k = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[k]
+
+
+def resumir(latencias, errores, duracion):
+    latencias = sorted(latencias)
+    ms = lambda s: round(s * 1000, 2)  # noqa: E731
+    return {
+        'requests': len(latencias) + errores,
+        'errores': errores,
+        'p50_ms': ms(percentil(latencias, 50)),
+        'p95_ms': ms(percentil(latencias, 95)),
+        'p99_ms': ms(percentil(latencias, 99)),
+        'promedio_ms': ms(sum(latencias) / len(latencias)) if latencias else 0.0,
+        'max_ms': ms(latencias[-1]) if latencias else 0.0,
+        'throughput_rps': round(len(latencias) / duracion, 1) if duracion else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de latencia y throughput de las vistas públicas y del panel.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=50,
+                            help='Servicios, publicaciones y mensajes a sembrar (c/u).')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests por escenario.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--sweep', default='',
+                            help='Niveles de concurrencia separados por coma (p.ej. 8,64,256).')
+        parser.add_argument('--warmup', type=int, default=10,
+                            help='Requests de calentamiento por escenario (no se miden).')
+        parser.add_argument('--url', default='',
+                            help='Servidor ya levantado (p.ej. http://127.0.0.1:8000).')
+        parser.add_argument('--only', default='',
+                            help='Escenarios separados por coma.')
+        parser.add_argument('--output', default='', help='Archivo JSON de salida.')
+        parser.add_argument('--compare', default='', help='JSON previo para comparar.')
+        parser.add_argument('--keep', action='store_true',
+                            help='No borrar los datos sembrados.')
+
+    # ── Orquestación ─────────────────────────────────────────
+    def handle(self, *args, **opts):
+        escenarios = ESCENARIOS
+        if opts['only']:
+            nombres = {n.strip() for n in opts['only'].split(',')}
+            escenarios = [e for e in ESCENARIOS if e[0] in nombres]
+            if not escenarios:
+                raise CommandError(f'Ningún escenario coincide con {opts["only"]!r}.')
+
+        self.sembrar(opts['seed'])
+        servidor = None
+        try:
+            base = opts['url'].rstrip('/')
+            if not base:
+                servidor, base = self.levantar_servidor()
+            cookie_admin = self.sesion_admin()
+
+            niveles = [int(c) for c in opts['sweep'].split(',') if c.strip()]
+            barrido = {}
+            for concurrencia in niveles or [opts['concurrency']]:
+                resultados = {}
+                for nombre, metodo, url_name, admin in escenarios:
+                    url = base + reverse(url_name)
+                    cookies = cookie_admin if admin else ''
+                    resultados[nombre] = self.correr(
+                        metodo, url, cookies, opts['requests'],
+                        concurrencia, opts['warmup'])
+                    self.stderr.write(
+                        f'  c={concurrencia:<4} {nombre:<15} '
+                        f'p95={resultados[nombre]["p95_ms"]} ms')
+                barrido[str(concurrencia)] = resultados
+        finally:
+            if servidor is not None:
+                servidor.shutdown()
+                servidor.server_close()
+            if not opts['keep']:
+                self.limpiar()
+
+        reporte = {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'parametros': {k: opts[k] for k in
+                           ('seed', 'requests', 'concurrency', 'sweep', 'url')},
+            'session_engine': settings.SESSION_ENGINE,
+            'escenarios': resultados,
+        }
+        if niveles:
+            # Con --sweep, "escenarios" es el nivel más alto y "barrido" trae todos
+            reporte['barrido'] = barrido
+        if opts['compare']:
+            with open(opts['compare'], encoding='utf-8') as f:
+                reporte['comparacion'] = self.comparar(json.load(f), resultados)
+
+        salida = json.dumps(reporte, indent=2, ensure_ascii=False)
+        if opts['output']:
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                f.write(salida + '\n')
+        self.stdout.write(salida)
+
+    # ── Datos ────────────────────────────────────────────────
+    def sembrar(self, n):
+        self.desde = timezone.localdate()
+        Service.objects.bulk_create(
+            Service(name=f'{PREFIJO} Servicio {i}', description='Descripción ' * 20,
+                    price=15000 + i, image='services/bench.jpg', order=i)
+            for i in range(n))
+        BlogPost.objects.bulk_create(
+            BlogPost(title=f'{PREFIJO} Publicación {i}', content='Contenido ' * 80)
+            for i in range(n))
+        ContactMessage.objects.bulk_create(
+            ContactMessage(name=f'{PREFIJO} Cliente {i}', email=f'c{i}@bench.cl',
+                           message='Consulta ' * 15)
+            for i in range(n))
+        # bulk_create no dispara post_save: los rollups del dashboard no
+        # verían los mensajes sembrados, y limpiar() (que sí dispara
+        # post_delete) los dejaría negativos
+        estadisticas.recalcular(desde=self.desde)
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(
+            username=BENCH_USER, defaults={'rol': 'administrador', 'is_active': True})
+        self.bench_user = user
+
+    def limpiar(self):
+        Service.objects.filter(name__startswith=PREFIJO).delete()
+        BlogPost.objects.filter(title__startswith=PREFIJO).delete()
+        ContactMessage.objects.filter(name__startswith=PREFIJO).delete()
+        estadisticas.recalcular(desde=self.desde)
+        get_user_model().objects.filter(username=BENCH_USER).delete()
+
+    def sesion_admin(self):
+        client = Client()
+        client.force_login(self.bench_user)
+        morsel = client.cookies[settings.SESSION_COOKIE_NAME]
+        return f'{settings.SESSION_COOKIE_NAME}={morsel.value}'
+
+    # ── Servidor local ───────────────────────────────────────
+    def levantar_servidor(self):
+        # Las conexiones del hilo principal no deben quedar abiertas
+        # mientras los hilos del servidor usan la BD (SQLite).
+        connections.close_all()
+        servidor = ThreadedWSGIServer(('127.0.0.1', 0), _HandlerSilencioso,
+                                      allow_reuse_address=True)
+        servidor.set_app(get_wsgi_application())
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        host, port = servidor.server_address[:2]
+        return servidor, f'http://{host}:{port}'
+
+    # ── Carga ────────────────────────────────────────────────
+    def _token_csrf(self, url):
+        """GET al formulario para obtener la cookie y el token CSRF."""
+        with urllib.request.urlopen(url, timeout=30) as r:
+            cookie = SimpleCookie()
+            for header in r.headers.get_all('Set-Cookie') or []:
+                cookie.load(header)
+            html = r.read().decode('utf-8', 'replace')
+        token = cookie[settings.CSRF_COOKIE_NAME].value
+        m = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html)
+        return token, (m.group(1) if m else token)
+
+    def correr(self, metodo, url, cookies, total, concurrencia, warmup):
+        cuerpo = None
+        headers = {'Cookie': cookies} if cookies else {}
+        if metodo == 'POST':
+            cookie_csrf, token = self._token_csrf(url)
+            headers['Cookie'] = f'{settings.CSRF_COOKIE_NAME}={cookie_csrf}'
+            headers['Referer'] = url
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            cuerpo = urllib.parse.urlencode({
+                'csrfmiddlewaretoken': token, 'nombre': f'{PREFIJO} Cliente',
+                'email': 'bench@bench.cl', 'telefono': '', 'mensaje': 'Hola',
+            }).encode()
+
+        class _SinRedireccion(urllib.request.HTTPRedirectHandler):
+            def redirect_request(self, *args, **kwargs):
+                return None
+
+        opener = urllib.request.build_opener(_SinRedireccion)
+
+        def uno(_):
+            req = urllib.request.Request(url, data=cuerpo, method=metodo, headers=headers)
+            inicio = time.perf_counter()
+            try:
+                with opener.open(req, timeout=30) as r:
+                    r.read()
+                    ok = r.status < 400
+            except urllib.error.HTTPError as e:
+                ok = e.code in (301, 302, 303)   # el POST de contacto redirige
+            except OSError:
+                ok = False
+            return time.perf_counter() - inicio, ok
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            list(pool.map(uno, range(warmup)))
+            inicio = time.perf_counter()
+            muestras = list(pool.map(uno, range(total)))
+            duracion = time.perf_counter() - inicio
+
+        latencias = [s for s, ok in muestras if ok]
+        return resumir(latencias, len(muestras) - len(latencias), duracion)
+
+    @staticmethod
+    def comparar(anterior, actual):
+        """Delta porcentual de p95 y throughput respecto a una corrida previa."""
+        previos = anterior.get('escenarios', {})
+        delta = {}
+        for nombre, r in actual.items():
+            p = previos.get(nombre)
+            if not p:
+                continue
+            pct = lambda a, b: round((a - b) / b * 100, 1) if b else None  # noqa: E731
+            delta[nombre] = {
+                'p95_pct': pct(r['p95_ms'], p['p95_ms']),
+                'throughput_pct': pct(r['throughput_rps'], p['throughput_rps']),
+            }
+        return delta
@@ -0,0 +1,126 @@
+"""
+monitoreo/medicion.py
+
+Medición por request: consultas SQL, tiempo en BD, tiempo de render de
+templates y latencia total. El middleware abre una Medicion y la deja en
+un ContextVar; los hooks de BD y templates suman sobre ella.
+
+El hook de BD se instala en cada conexión nueva (señal connection_created)
+y lee el ContextVar, así funciona igual en vistas async: sync_to_async
+copia el contexto al hilo donde corre el ORM.
+"""
+import contextvars
+import time
+from dataclasses import dataclass, field
+
+from django.template.base import Template
+from django.template.loader_tags import BlockNode
+
+_actual = contextvars.ContextVar('monitoreo_medicion', default=None)
+
+
+@dataclass
+class Medicion:
+    vista: str = ''
+    consultas: int = 0
+    db_s: float = 0.0
+    template_s: float = 0.0
+    total_s: float = 0.0
+    status: int = 0
+    inicio: float = field(default_factory=time.perf_counter)
+    # Tiempos inclusivos por template y por bloque ("block:<nombre>")
+    plantillas: dict = field(default_factory=dict)
+    bloques: dict = field(default_factory=dict)
+    # Profundidad de render: solo se mide el template más externo
+    _profundidad: int = 0
+
+    def mas_lentos(self, n=3):
+        """[(nombre, segundos)] de los templates y bloques más lentos."""
+        todos = list(self.plantillas.items()) + list(self.bloques.items())
+        return sorted(todos, key=lambda kv: kv[1], reverse=True)[:n]
+
+
+def medicion_actual():
+    return _actual.get()
+
+
+def iniciar():
+    medicion = Medicion()
+    token = _actual.set(medicion)
+    return medicion, token
+
+
+def terminar(token):
+    _actual.reset(token)
+
+
+def contar_consulta(execute, sql, params, many, context):
+    """execute_wrapper permanente: cuenta y cronometra si hay medición activa."""
+    medicion = _actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.consultas += 1
+        medicion.db_s += time.perf_counter() - inicio
+
+
+def instalar_en_conexion(sender, connection, **kwargs):
+    """Receptor de connection_created."""
+    if contar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(contar_consulta)
+
+
+def _nombre(template):
+    origen = getattr(template, 'origin', None)
+    return getattr(origen, 'template_name', None) or template.name or '<string>'
+
+
+def instalar_medicion_templates():
+    """
+    Envuelve Template.render y BlockNode.render una sola vez (idempotente).
+
+    template_s solo suma el template más externo (los incluidos se
+    renderizan dentro de él); el desglose por template y por bloque es
+    inclusivo, para encontrar dónde se va el tiempo.
+    """
+    if getattr(Template.render, '_monitoreo', False):
+        return
+    render_template = Template.render
+    render_bloque = BlockNode.render
+
+    def render(self, context):
+        medicion = _actual.get()
+        if medicion is None:
+            return render_template(self, context)
+        medicion._profundidad += 1
+        inicio = time.perf_counter()
+        try:
+            return render_template(self, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            medicion._profundidad -= 1
+            if medicion._profundidad == 0:
+                medicion.template_s += duracion
+            nombre = _nombre(self)
+            medicion.plantillas[nombre] = medicion.plantillas.get(nombre, 0.0) + duracion
+
+    def render_block(self, context):
+        medicion = _actual.get()
+        if medicion is None:
+            return render_bloque(self, context)
+        inicio = time.perf_counter()
+        try:
+            return render_bloque(self, context)
+        finally:
+            # El nodo es el del template base; el contenido puede venir de
+            # un hijo que lo sobreescribe, por eso se identifica solo por nombre.
+            nombre = f'block:{self.name}'
+            medicion.bloques[nombre] = (medicion.bloques.get(nombre, 0.0)
+                                        + time.perf_counter() - inicio)
+
+    render._monitoreo = True
+    Template.render = render
+    BlockNode.render = render_block
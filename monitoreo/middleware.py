@@ -0,0 +1,107 @@
+"""
+monitoreo/middleware.py
+
+InstrumentationMiddleware: mide cada request (consultas, tiempo en BD,
+render de templates, latencia total) y lo deja en el registro en memoria.
+
+Presupuestos de consultas por vista (settings.QUERY_BUDGETS), con el
+nombre completo de la URL como clave:
+
+    QUERY_BUDGETS = {'index:index': 4, 'administrador:home': 12}
+
+Si una vista se pasa del presupuesto se loguea un warning; con
+QUERY_BUDGETS_STRICT = True (tests) se lanza PresupuestoExcedido.
+Debe ir primero en MIDDLEWARE para que la latencia incluya todo lo demás.
+Soporta WSGI y ASGI (las vistas async de index se miden igual).
+
+Con MONITOREO_SERVER_TIMING cada respuesta lleva un header Server-Timing
+(db, tpl, total y los templates/bloques más lentos), visible en la
+pestaña Network del navegador. Renders sobre MONITOREO_TEMPLATE_LENTO_MS
+se loguean con su desglose.
+"""
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .medicion import iniciar, terminar
+from .registro import registro
+
+logger = logging.getLogger(__name__)
+
+
+class PresupuestoExcedido(AssertionError):
+    """Una vista hizo más consultas de las declaradas en QUERY_BUDGETS."""
+
+
+def presupuesto(vista):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(vista)
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'MONITOREO_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        medicion, token = iniciar()
+        try:
+            response = self.get_response(request)
+        finally:
+            terminar(token)
+        return self._cerrar(request, medicion, response)
+
+    async def __acall__(self, request):
+        medicion, token = iniciar()
+        try:
+            response = await self.get_response(request)
+        finally:
+            terminar(token)
+        return self._cerrar(request, medicion, response)
+
+    def _cerrar(self, request, medicion, response):
+        medicion.total_s = time.perf_counter() - medicion.inicio
+        medicion.status = response.status_code
+        match = getattr(request, 'resolver_match', None)
+        medicion.vista = match.view_name if match else '<sin-ruta>'
+
+        limite = presupuesto(medicion.vista)
+        excedido = limite is not None and medicion.consultas > limite
+        registro.registrar(medicion, excedido=excedido)
+        self._reportar_templates(medicion, response)
+
+        if excedido:
+            mensaje = (f'{medicion.vista} hizo {medicion.consultas} consultas '
+                       f'(presupuesto: {limite})')
+            if getattr(settings, 'QUERY_BUDGETS_STRICT', False):
+                raise PresupuestoExcedido(mensaje)
+            logger.warning(mensaje)
+        return response
+
+    def _reportar_templates(self, medicion, response):
+        lentos = medicion.mas_lentos(getattr(settings, 'MONITOREO_TOP_TEMPLATES', 3))
+        if getattr(settings, 'MONITOREO_SERVER_TIMING', False):
+            partes = [f'db;dur={medicion.db_s * 1000:.1f}',
+                      f'tpl;dur={medicion.template_s * 1000:.1f}',
+                      f'total;dur={medicion.total_s * 1000:.1f}']
+            for i, (nombre, segundos) in enumerate(lentos, 1):
+                desc = nombre.replace('"', "'")
+                partes.append(f'tpl{i};desc="{desc}";dur={segundos * 1000:.1f}')
+            response['Server-Timing'] = ', '.join(partes)
+
+        umbral = getattr(settings, 'MONITOREO_TEMPLATE_LENTO_MS', 200)
+        if umbral and medicion.template_s * 1000 > umbral:
+            logger.warning('Render lento en %s (%.0f ms): %s', medicion.vista,
+                           medicion.template_s * 1000,
+                           ', '.join(f'{n}={t * 1000:.0f}ms' for n, t in lentos))
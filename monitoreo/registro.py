@@ -0,0 +1,149 @@
+"""
+monitoreo/registro.py
+
+Registro en memoria (por proceso) de las mediciones:
+
+  - Un ring buffer con las últimas N muestras (settings.MONITOREO_BUFFER).
+  - Agregados acumulados por vista (contadores y un histograma de
+    latencia), que es lo que se exporta en formato Prometheus.
+
+Con varios workers cada proceso expone lo suyo; Prometheus los suma al
+scrapear cada instancia.
+"""
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+
+# Límites del histograma de latencia (segundos), estilo Prometheus
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Agregado:
+    __slots__ = ('requests', 'consultas', 'db_s', 'template_s', 'total_s',
+                 'buckets', 'excedidos')
+
+    def __init__(self):
+        self.requests = 0
+        self.consultas = 0
+        self.db_s = 0.0
+        self.template_s = 0.0
+        self.total_s = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.excedidos = 0
+
+
+class Registro:
+    def __init__(self, tamano=None):
+        self._lock = threading.Lock()
+        self._tamano = tamano
+        self.reiniciar()
+
+    def reiniciar(self):
+        tamano = self._tamano or getattr(settings, 'MONITOREO_BUFFER', 1000)
+        with self._lock:
+            self.muestras = deque(maxlen=tamano)
+            self.por_vista = defaultdict(_Agregado)
+            # Tiempo acumulado (inclusivo) por template y por bloque
+            self.por_template = defaultdict(float)
+            self.por_bloque = defaultdict(float)
+            # Métricas extra (nombre → (tipo, ayuda, {labels: valor}))
+            self.extras = {}
+
+    def registrar(self, medicion, excedido=False):
+        with self._lock:
+            self.muestras.append(medicion)
+            agg = self.por_vista[medicion.vista]
+            agg.requests += 1
+            agg.consultas += medicion.consultas
+            agg.db_s += medicion.db_s
+            agg.template_s += medicion.template_s
+            agg.total_s += medicion.total_s
+            agg.excedidos += int(excedido)
+            for i, limite in enumerate(BUCKETS):
+                if medicion.total_s <= limite:
+                    agg.buckets[i] += 1
+            for nombre, segundos in medicion.plantillas.items():
+                self.por_template[nombre] += segundos
+            for nombre, segundos in medicion.bloques.items():
+                self.por_bloque[nombre] += segundos
+
+    def ultimas(self, n=None):
+        with self._lock:
+            muestras = list(self.muestras)
+        return muestras if n is None else muestras[-n:]
+
+    def templates_lentos(self, n=10):
+        """Templates y bloques con más tiempo acumulado: [(nombre, segundos)]."""
+        with self._lock:
+            todos = list(self.por_template.items()) + list(self.por_bloque.items())
+        return sorted(todos, key=lambda kv: kv[1], reverse=True)[:n]
+
+    def fijar(self, nombre, valor, tipo='gauge', ayuda='', **labels):
+        """Publica una métrica externa (p.ej. bloqueos del login, cola de tareas)."""
+        with self._lock:
+            _t, _a, valores = self.extras.setdefault(nombre, (tipo, ayuda, {}))
+            valores[tuple(sorted(labels.items()))] = valor
+
+    def prometheus(self):
+        """Texto en formato de exposición de Prometheus (0.0.4)."""
+        with self._lock:
+            vistas = sorted(self.por_vista.items())
+            templates = sorted(self.por_template.items())
+            extras = sorted(self.extras.items())
+            lineas = []
+
+            def serie(nombre, tipo, ayuda, valores):
+                lineas.append(f'# HELP {nombre} {ayuda}')
+                lineas.append(f'# TYPE {nombre} {tipo}')
+                for labels, valor in valores:
+                    lineas.append(f'{nombre}{_labels(labels)} {_num(valor)}')
+
+            serie('pilates_requests_total', 'counter', 'Requests atendidos por vista.',
+                  [({'view': v}, a.requests) for v, a in vistas])
+            serie('pilates_db_queries_total', 'counter', 'Consultas SQL por vista.',
+                  [({'view': v}, a.consultas) for v, a in vistas])
+            serie('pilates_db_seconds_total', 'counter', 'Tiempo en BD por vista.',
+                  [({'view': v}, a.db_s) for v, a in vistas])
+            serie('pilates_template_seconds_total', 'counter',
+                  'Tiempo de render de templates por vista.',
+                  [({'view': v}, a.template_s) for v, a in vistas])
+            serie('pilates_template_render_seconds_total', 'counter',
+                  'Tiempo de render inclusivo por template.',
+                  [({'template': t}, seg) for t, seg in templates])
+            serie('pilates_query_budget_exceeded_total', 'counter',
+                  'Requests que superaron el presupuesto de consultas.',
+                  [({'view': v}, a.excedidos) for v, a in vistas])
+
+            lineas.append('# HELP pilates_request_seconds Latencia total por vista.')
+            lineas.append('# TYPE pilates_request_seconds histogram')
+            for v, a in vistas:
+                for limite, acumulado in zip(BUCKETS, a.buckets):
+                    lineas.append(
+                        f'pilates_request_seconds_bucket{_labels({"view": v, "le": limite})} {acumulado}')
+                lineas.append(
+                    f'pilates_request_seconds_bucket{_labels({"view": v, "le": "+Inf"})} {a.requests}')
+                lineas.append(f'pilates_request_seconds_sum{_labels({"view": v})} {_num(a.total_s)}')
+                lineas.append(f'pilates_request_seconds_count{_labels({"view": v})} {a.requests}')
+
+            for nombre, (tipo, ayuda, valores) in extras:
+                serie(nombre, tipo, ayuda or nombre,
+                      [(dict(labels), valor) for labels, valor in sorted(valores.items())])
+        return '\n'.join(lineas) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    partes = []
+    for k, v in labels.items():
+        v = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{k}="{v}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _num(valor):
+    return repr(round(valor, 6)) if isinstance(valor, float) else str(valor)
+
+
+registro = Registro()
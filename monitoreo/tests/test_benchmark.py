@@ -0,0 +1,44 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from administrador.models import ContactMessage, ContactStatusDaily, Service
+from monitoreo.management.commands.benchmark import percentil, resumir
+
+
+class PercentilesTests(SimpleTestCase):
+    def test_percentil_rango_mas_cercano(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50)
+        self.assertEqual(percentil(valores, 95), 95)
+        self.assertEqual(percentil(valores, 99), 99)
+        self.assertEqual(percentil([], 50), 0.0)
+
+    def test_resumen(self):
+        r = resumir([0.01, 0.02, 0.03], errores=1, duracion=1.0)
+        self.assertEqual(r['requests'], 4)
+        self.assertEqual(r['p50_ms'], 20.0)
+        self.assertEqual(r['throughput_rps'], 3.0)
+
+
+class BenchmarkCommandTests(LiveServerTestCase):
+    def test_reporta_json_y_limpia(self):
+        out = StringIO()
+        # concurrency=1: los hilos del live server comparten la conexión a la
+        # BD en memoria, y dos transaction.atomic() a la vez (el POST de
+        # contacto) se pisan los savepoints
+        call_command('benchmark', seed=3, requests=4, concurrency=1, warmup=1,
+                     url=self.live_server_url, stdout=out, stderr=StringIO())
+        reporte = json.loads(out.getvalue())
+        self.assertEqual(set(reporte['escenarios']), {
+            'landing', 'novedades', 'servicios', 'contacto_post',
+            'admin_home', 'mensajes_list'})
+        for nombre, r in reporte['escenarios'].items():
+            self.assertEqual(r['errores'], 0, nombre)
+            self.assertLessEqual(r['p50_ms'], r['p99_ms'])
+        self.assertFalse(Service.objects.exists())
+        self.assertFalse(ContactMessage.objects.exists())
+        # Los rollups del dashboard quedan como antes, no negativos
+        self.assertFalse(ContactStatusDaily.objects.exclude(messages=0).exists())
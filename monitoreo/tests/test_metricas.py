@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from administrador.models import Service
+from monitoreo.registro import Registro, registro
+
+User = get_user_model()
+
+
+class RegistroMetricasTests(TestCase):
+    def setUp(self):
+        registro.reiniciar()
+
+    def test_middleware_registra_consultas_y_tiempos(self):
+        Service.objects.create(name='S', description='.', price=1, image='services/a.jpg')
+        self.client.get(reverse('index:servicios'))
+        muestra = registro.ultimas(1)[0]
+        self.assertEqual(muestra.vista, 'index:servicios')
+        self.assertEqual(muestra.status, 200)
+        self.assertGreaterEqual(muestra.consultas, 1)
+        self.assertGreater(muestra.template_s, 0)
+        self.assertGreaterEqual(muestra.total_s, muestra.template_s)
+
+    def test_ring_buffer_acotado(self):
+        reg = Registro(tamano=3)
+        for _ in range(5):
+            self.client.get(reverse('index:nosotros'))
+        for m in registro.ultimas():
+            reg.registrar(m)
+        self.assertEqual(len(reg.ultimas()), 3)
+        self.assertIn('pilates_requests_total{view="index:nosotros"} 5', reg.prometheus())
+
+    @override_settings(METRICS_TOKEN='secreto')
+    def test_endpoint_prometheus(self):
+        self.client.get(reverse('index:nosotros'))
+        r = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r['Content-Type'].startswith('text/plain; version=0.0.4'))
+        texto = r.content.decode()
+        self.assertIn('# TYPE pilates_request_seconds histogram', texto)
+        self.assertIn('pilates_request_seconds_count{view="index:nosotros"} 1', texto)
+        self.assertIn('pilates_login_throttled_total', texto)
+
+    @override_settings(METRICS_TOKEN='secreto', METRICS_ALLOWED_IPS=[])
+    def test_endpoint_restringido(self):
+        # Detrás de un proxy todo llega desde 127.0.0.1: no alcanza para entrar
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1')
+                         .status_code, 403)
+        for header in ('Bearer otro', 'secreto', 'Basic secreto'):
+            r = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION=header)
+            self.assertEqual(r.status_code, 403, header)
+
+    @override_settings(METRICS_TOKEN='', METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_token_vacio_no_autoriza_y_ip_permitida(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ')
+                         .status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.5')
+                         .status_code, 200)
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from administrador.models import BlogPost, ContactMessage, ContactNotification, Service
+from monitoreo.middleware import PresupuestoExcedido
+from monitoreo.registro import registro
+
+User = get_user_model()
+
+PUBLICAS = ['index:index', 'index:nosotros', 'index:novedades',
+            'index:servicios', 'index:contacto_publico']
+
+
+@override_settings(
+    QUERY_BUDGETS_STRICT=True,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class PresupuestoConsultasTests(TestCase):
+    """Cada vista con presupuesto en settings.QUERY_BUDGETS debe cumplirlo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            Service.objects.create(name=f'S{i}', description='.', price=1000,
+                                   image='services/a.jpg', order=i)
+            BlogPost.objects.create(title=f'P{i}', content='texto')
+            ContactMessage.objects.create(name='A', email='a@a.cl', message='hola')
+        User.objects.create_user(username='admin1', password='x', rol='administrador')
+
+    def setUp(self):
+        cache.clear()
+        registro.reiniciar()
+
+    def test_presupuestos_declarados_para_vistas_publicas(self):
+        for vista in PUBLICAS:
+            self.assertIn(vista, settings.QUERY_BUDGETS)
+
+    def test_vistas_publicas_dentro_del_presupuesto(self):
+        for vista in PUBLICAS:
+            with self.subTest(vista=vista):
+                self.assertEqual(self.client.get(reverse(vista)).status_code, 200)
+
+    def test_vistas_admin_dentro_del_presupuesto(self):
+        self.client.login(username='admin1', password='x')
+        vistas = [v for v in settings.QUERY_BUDGETS if v.startswith('administrador:')]
+        for vista in vistas:
+            with self.settings(QUERY_BUDGETS_STRICT=False):
+                self.client.get(reverse(vista))   # calienta sesión/principal
+            with self.subTest(vista=vista):
+                self.assertEqual(self.client.get(reverse(vista)).status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={'index:index': 0})
+    def test_exceso_falla_en_modo_estricto(self):
+        with self.assertRaises(PresupuestoExcedido):
+            self.client.get(reverse('index:index'))
+
+    @override_settings(QUERY_BUDGETS={'index:index': 0}, QUERY_BUDGETS_STRICT=False)
+    def test_exceso_solo_advierte_en_produccion(self):
+        with self.assertLogs('monitoreo.middleware', 'WARNING'):
+            self.assertEqual(self.client.get(reverse('index:index')).status_code, 200)
+        self.assertIn('pilates_query_budget_exceeded_total{view="index:index"} 1',
+                      registro.prometheus())
+
+
+@override_settings(QUERY_BUDGETS_STRICT=True)
+class PresupuestoContactoTests(TransactionTestCase):
+    """
+    El POST del formulario, con commits reales: los on_commit (programar el
+    aviso) corren dentro del request y cuentan para el presupuesto.
+    """
+
+    def setUp(self):
+        registro.reiniciar()
+
+    def _enviar(self, n):
+        r = self.client.post(reverse('index:contacto_publico'),
+                             {'nombre': f'Ana {n}', 'email': 'ana@a.cl', 'mensaje': 'hola'})
+        self.assertRedirects(r, reverse('index:contacto_exito'))
+
+    def test_post_dentro_del_presupuesto(self):
+        self._enviar(1)             # el primero programa el envío
+        self._enviar(2)             # el segundo se suma al resumen pendiente
+        self.assertEqual(ContactMessage.objects.count(), 2)
+        self.assertEqual(ContactNotification.objects.count(), 2)
@@ -0,0 +1,86 @@
+"""
+monitoreo/views.py
+Endpoint /metrics en formato de exposición de Prometheus.
+
+Acceso (cualquiera de los tres):
+  - header `Authorization: Bearer <settings.METRICS_TOKEN>` (en Prometheus,
+    `authorization: {credentials: ...}` en el scrape_config);
+  - REMOTE_ADDR en settings.METRICS_ALLOWED_IPS (vacío por defecto);
+  - un superusuario con sesión iniciada.
+
+Detrás de nginx u otro proxy en el mismo host, REMOTE_ADDR de todos los
+requests es 127.0.0.1: poner localhost en METRICS_ALLOWED_IPS abriría
+/metrics a todo internet. En ese caso usar el token (o cortar /metrics
+en el proxy); la lista de IPs solo sirve cuando Django recibe la
+conexión directa del scraper.
+"""
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.cache import never_cache
+
+from login import throttling
+from index import visitas
+from Pilatesreserva import cache as cache_contenido
+from login.principal import get_principal
+from tareas import cola
+from .registro import registro
+
+
+def _token_valido(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    esquema, _, enviado = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and esquema.lower() == 'bearer' and hmac.compare_digest(
+        enviado.strip().encode(), token.encode())
+
+
+def _autorizado(request):
+    ips = getattr(settings, 'METRICS_ALLOWED_IPS', [])
+    return (_token_valido(request) or request.META.get('REMOTE_ADDR') in ips
+            or get_principal(request).es_superadmin)
+
+
+def _recolectar_externas():
+    """Métricas que viven fuera del middleware y se leen al scrapear."""
+    stats = throttling.estadisticas()
+    registro.fijar('pilates_login_throttled_total', stats['bloqueados'], 'counter',
+                   'Intentos de login rechazados antes de hashear.')
+    registro.fijar('pilates_login_hash_seconds_saved_total', stats['ms_ahorrados'] / 1000,
+                   'counter', 'Tiempo de PBKDF2 evitado por el throttling (estimado).')
+    for evento, total in cache_contenido.estadisticas().items():
+        registro.fijar('pilates_content_cache_events_total', total, 'counter',
+                       'Lecturas de la capa de cache por resultado (este proceso).',
+                       evento=evento)
+    for evento, total in visitas.estadisticas().items():
+        registro.fijar('pilates_page_views_total', total, 'counter',
+                       'Visitas de páginas por destino (este proceso).', result=evento)
+    registro.fijar('pilates_page_views_pending', visitas.acumulador().pendientes(), 'gauge',
+                   'Visitas en memoria todavía sin escribir (este proceso).')
+    _recolectar_tareas()
+
+
+def _recolectar_tareas():
+    estado = cola.metricas()
+    for status, total in estado['por_estado'].items():
+        registro.fijar('pilates_tasks', total, 'gauge',
+                       'Tareas en la cola por estado.', status=status)
+    for nombre_cola, segundos in estado['lag'].items():
+        registro.fijar('pilates_task_queue_lag_seconds', segundos, 'gauge',
+                       'Espera de la tarea lista más antigua, por cola.', queue=nombre_cola)
+    for status in ('done', 'failed'):
+        registro.fijar('pilates_tasks_finished_last_minute', estado['ultimo_minuto'].get(status, 0),
+                       'gauge', 'Tareas terminadas en los últimos 60 s (todos los workers).',
+                       status=status)
+    for resultado, total in cola.estadisticas().items():
+        registro.fijar('pilates_tasks_executed_total', total, 'counter',
+                       'Tareas ejecutadas por este proceso, por resultado.', result=resultado)
+
+
+@never_cache
+def metrics(request):
+    if not _autorizado(request):
+        return HttpResponseForbidden('No autorizado.')
+    _recolectar_externas()
+    return HttpResponse(registro.prometheus(),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import Task, TaskSchedule
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """
+    Inspección de la cola (soporte técnico). Para reintentar una fallida:
+    estado "Pendiente", intentos en 0 y guardar.
+    """
+    list_display = ['name', 'queue', 'status', 'attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'queue', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'worker', 'last_error']
+    date_hierarchy = 'created_at'
+
+
+@admin.register(TaskSchedule)
+class TaskScheduleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'next_run']
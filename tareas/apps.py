@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class TareasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tareas'
+    verbose_name = 'Tareas en segundo plano'
+
+    def ready(self):
+        # Cada app declara sus tareas en <app>/tareas.py (como admin.py)
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tareas')
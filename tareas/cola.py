@@ -0,0 +1,336 @@
+"""
+tareas/cola.py
+
+Cola de tareas guardada en la BD, sin broker externo. Sirve para el
+trabajo que no tiene por qué hacerse dentro del request.
+
+  @tarea(reintentos=3)
+  def enviar_resumen(pk): ...
+
+  enviar_resumen.encolar(pk)                        # dentro de la transacción actual
+  enviar_resumen.encolar_al_commit(pk)              # recién después del commit
+  enviar_resumen.programar([pk], retraso=60)        # o en=<datetime>, cola='…'
+
+Los argumentos se guardan como JSON, así que se pasan pks y no
+instancias. Las tareas se declaran en <app>/tareas.py, que
+tareas/apps.py importa al arrancar.
+
+El worker es `manage.py procesar_tareas`. Toma cada tarea con un UPDATE
+condicional (compare-and-swap sobre status y started_at). Eso funciona
+igual en SQLite y en Postgres, y garantiza que dos workers nunca tomen
+la misma tarea. Si el worker de una tarea "running" murió, otro la
+retoma pasado VISIBILITY_TIMEOUT.
+
+  - Reintentos: si la función lanza una excepción, la tarea vuelve a
+    "pending" con run_at = ahora + backoff exponencial con jitter
+    (BACKOFF_BASE * 2^(intento-1), con tope BACKOFF_MAX). Agotados los
+    intentos queda "failed", con el traceback en last_error.
+  - Periódicas: @tarea(cada=segundos). TaskSchedule guarda la próxima
+    ejecución. Solo encola el worker cuyo UPDATE condicional logra
+    adelantarla. TAREAS['PERIODIC'] cambia el intervalo por nombre
+    (0 la desactiva).
+  - MODE "sync": encolar crea la fila y la ejecuta en el acto, en el
+    mismo proceso. Pensado para tests y desarrollo sin worker.
+"""
+import functools
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .models import Task, TaskSchedule
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MODE': 'worker',               # "sync" = se ejecuta al encolar
+    'POLL_INTERVAL': 1.0,           # segundos entre consultas con la cola vacía
+    'VISIBILITY_TIMEOUT': 10 * 60,  # una tarea "running" más vieja se retoma
+    'BACKOFF_BASE': 10,
+    'BACKOFF_MAX': 60 * 60,
+    'RETENTION_DAYS': 7,            # las hechas se purgan pasado este plazo
+    'PERIODIC': {},                 # nombre → segundos (0 = desactivada)
+}
+
+# Resultado de ejecutar(): hecha, fallida o reintento (volvió a "pending")
+REINTENTO = 'retry'
+
+_registro = {}
+_eventos = Counter()
+_eventos_lock = threading.Lock()
+
+
+def config():
+    return {**DEFAULTS, **getattr(settings, 'TAREAS', {})}
+
+
+def _contar(evento):
+    with _eventos_lock:
+        _eventos[evento] += 1
+
+
+def estadisticas():
+    """Tareas ejecutadas por este proceso, por resultado."""
+    with _eventos_lock:
+        return dict(_eventos)
+
+
+# ─────────────────────────────────────────────────────────────
+# REGISTRO Y ENCOLADO
+# ─────────────────────────────────────────────────────────────
+
+class TareaRegistrada:
+    """Función registrada con @tarea. Se puede llamar directo, como siempre."""
+
+    def __init__(self, funcion, nombre, cola, reintentos, cada):
+        functools.update_wrapper(self, funcion)
+        self.funcion = funcion
+        self.nombre = nombre
+        self.cola = cola
+        self.reintentos = reintentos
+        self.cada = cada
+
+    def __call__(self, *args, **kwargs):
+        return self.funcion(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<tarea {self.nombre}>'
+
+    def encolar(self, *args, **kwargs):
+        """
+        Inserta la tarea en la transacción en curso: si hay rollback, la
+        tarea desaparece junto con los datos.
+        """
+        return self.programar(args, kwargs)
+
+    def encolar_al_commit(self, *args, **kwargs):
+        """Encola recién después del commit (en autocommit, en el acto)."""
+        transaction.on_commit(lambda: self.programar(args, kwargs))
+
+    def programar(self, args=(), kwargs=None, *, retraso=None, en=None, cola=None):
+        """Encola con opciones: retraso (segundos), en (datetime) o cola."""
+        ahora = timezone.now()
+        tarea = Task.objects.create(
+            name=self.nombre, args=list(args), kwargs=dict(kwargs or {}),
+            queue=cola or self.cola, max_attempts=self.reintentos + 1,
+            run_at=en or ahora + timedelta(seconds=retraso or 0),
+        )
+        if config()['MODE'] == 'sync' and tarea.run_at <= ahora:
+            tomada = _reclamar(tarea.pk, Task.PENDIENTE, None, 'sync', ahora)
+            if tomada is not None:
+                ejecutar(tomada)
+        return tarea
+
+
+def tarea(funcion=None, *, nombre=None, cola='default', reintentos=3, cada=None):
+    """
+    Registra una tarea. nombre: por defecto "<módulo>.<función>" (es lo
+    que queda en la BD; cambiarlo deja huérfanas las filas pendientes).
+    reintentos: ejecuciones extra ante una excepción. cada: segundos,
+    para las periódicas.
+    """
+    def registrar(f):
+        definicion = TareaRegistrada(f, nombre or f'{f.__module__}.{f.__name__}',
+                                     cola, reintentos, cada)
+        _registro[definicion.nombre] = definicion
+        return definicion
+    return registrar(funcion) if funcion is not None else registrar
+
+
+def registradas():
+    return dict(_registro)
+
+
+# ─────────────────────────────────────────────────────────────
+# EJECUCIÓN
+# ─────────────────────────────────────────────────────────────
+
+def espera_reintento(intento):
+    """Segundos hasta el próximo intento: exponencial, con tope y jitter."""
+    cfg = config()
+    tope = min(cfg['BACKOFF_MAX'], cfg['BACKOFF_BASE'] * 2 ** (intento - 1))
+    # Jitter: las que fallaron juntas (p.ej. SMTP caído) no reintentan juntas
+    return random.uniform(tope / 2, tope)
+
+
+def _reclamar(pk, estado, tomada, worker, ahora):
+    tomadas = Task.objects.filter(pk=pk, status=estado, started_at=tomada).update(
+        status=Task.EN_CURSO, started_at=ahora, worker=worker, attempts=F('attempts') + 1)
+    return Task.objects.get(pk=pk) if tomadas else None
+
+
+def tomar(colas=None, worker=''):
+    """La próxima tarea lista de `colas` (todas si es None), ya marcada como propia."""
+    ahora = timezone.now()
+    perdidas = ahora - timedelta(seconds=config()['VISIBILITY_TIMEOUT'])
+    listas = Task.objects.filter(
+        Q(status=Task.PENDIENTE, run_at__lte=ahora)
+        | Q(status=Task.EN_CURSO, started_at__lt=perdidas))
+    if colas:
+        listas = listas.filter(queue__in=colas)
+    candidatas = listas.order_by('run_at', 'pk').values_list('pk', 'status', 'started_at')[:10]
+    for pk, estado, tomada in candidatas:
+        # Si otro worker la tomó entre el SELECT y el UPDATE, se pasa a la siguiente
+        tarea_tomada = _reclamar(pk, estado, tomada, worker, ahora)
+        if tarea_tomada is not None:
+            return tarea_tomada
+    return None
+
+
+def ejecutar(tarea_tomada):
+    """
+    Corre una tarea ya tomada y guarda el resultado: HECHA, FALLIDA o
+    REINTENTO. Las actualizaciones filtran por started_at: si la tarea
+    tardó más que VISIBILITY_TIMEOUT y otro worker la retomó, no se pisa
+    su estado.
+    """
+    t = tarea_tomada
+    propia = Task.objects.filter(pk=t.pk, started_at=t.started_at)
+    definicion = _registro.get(t.name)
+    if definicion is None:
+        error = f'Tarea no registrada: {t.name}'
+    elif t.attempts > t.max_attempts:
+        error = 'Intentos agotados: el worker se detuvo a mitad de la ejecución'
+    else:
+        inicio = time.perf_counter()
+        try:
+            definicion.funcion(*t.args, **t.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+        else:
+            propia.update(status=Task.HECHA, finished_at=timezone.now(), last_error='')
+            logger.info('Tarea %s #%s hecha en %.3fs', t.name, t.pk,
+                        time.perf_counter() - inicio)
+            _contar(Task.HECHA)
+            return Task.HECHA
+        if t.attempts < t.max_attempts:
+            espera = espera_reintento(t.attempts)
+            propia.update(status=Task.PENDIENTE, last_error=error,
+                          run_at=timezone.now() + timedelta(seconds=espera))
+            logger.warning('Tarea %s #%s falló (intento %s/%s); reintento en %.0fs',
+                           t.name, t.pk, t.attempts, t.max_attempts, espera)
+            _contar(REINTENTO)
+            return REINTENTO
+    propia.update(status=Task.FALLIDA, finished_at=timezone.now(), last_error=error)
+    logger.error('Tarea %s #%s fallida: %s', t.name, t.pk, error.strip().splitlines()[-1])
+    _contar(Task.FALLIDA)
+    return Task.FALLIDA
+
+
+# ─────────────────────────────────────────────────────────────
+# PERIÓDICAS
+# ─────────────────────────────────────────────────────────────
+
+def intervalo(definicion):
+    return config()['PERIODIC'].get(definicion.nombre, definicion.cada)
+
+
+def programar_periodicas(ahora=None):
+    """Encola las periódicas que vencieron. Devuelve las Task creadas."""
+    ahora = ahora or timezone.now()
+    periodicas = {d.nombre: (d, intervalo(d)) for d in _registro.values() if intervalo(d)}
+    if not periodicas:
+        return []
+    proximas = dict(TaskSchedule.objects.filter(name__in=periodicas)
+                    .values_list('name', 'next_run'))
+    nuevas = [TaskSchedule(name=n, next_run=ahora) for n in periodicas if n not in proximas]
+    if nuevas:
+        TaskSchedule.objects.bulk_create(nuevas, ignore_conflicts=True)
+    encoladas = []
+    for nombre, (definicion, cada) in periodicas.items():
+        if proximas.get(nombre, ahora) > ahora:
+            continue
+        adelantada = TaskSchedule.objects.filter(name=nombre, next_run__lte=ahora).update(
+            next_run=ahora + timedelta(seconds=cada))
+        if not adelantada:              # la encoló otro worker
+            continue
+        # Con la anterior todavía en la cola (worker atrasado) no se apila otra
+        if Task.objects.filter(name=nombre,
+                               status__in=[Task.PENDIENTE, Task.EN_CURSO]).exists():
+            continue
+        encoladas.append(definicion.programar())
+    return encoladas
+
+
+# ─────────────────────────────────────────────────────────────
+# WORKER (manage.py procesar_tareas)
+# ─────────────────────────────────────────────────────────────
+
+def _refrescar_conexion():
+    # Como request_started/finished en el servidor web: descarta conexiones
+    # caídas o viejas (CONN_MAX_AGE). Dentro de un atomic (tests) no se toca.
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def trabajar(colas=None, *, una_vez=False, max_tareas=None, detener=None, intervalo_poll=None,
+             periodicas=True):
+    """
+    Bucle del worker: programa las periódicas (como mucho una vez por
+    segundo), toma la próxima tarea lista y la ejecuta.
+
+    una_vez: termina cuando la cola queda vacía. detener: threading.Event
+    que corta el bucle después de la tarea en curso (SIGTERM).
+    periodicas=False: no las programa (otro worker se encarga).
+    Devuelve {resultado: cantidad}.
+    """
+    cfg = config()
+    espera = cfg['POLL_INTERVAL'] if intervalo_poll is None else intervalo_poll
+    detener = detener or threading.Event()
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    resultados = Counter()
+    ultima_programacion = None
+    while not detener.is_set():
+        _refrescar_conexion()
+        if periodicas and (ultima_programacion is None
+                           or time.monotonic() - ultima_programacion >= 1):
+            programar_periodicas()
+            ultima_programacion = time.monotonic()
+        tarea_tomada = tomar(colas, worker)
+        if tarea_tomada is None:
+            if una_vez:
+                break
+            detener.wait(espera)
+            continue
+        resultados[ejecutar(tarea_tomada)] += 1
+        if max_tareas and sum(resultados.values()) >= max_tareas:
+            break
+    _refrescar_conexion()
+    return dict(resultados)
+
+
+# ─────────────────────────────────────────────────────────────
+# MÉTRICAS (/metrics)
+# ─────────────────────────────────────────────────────────────
+
+def metricas():
+    """
+    Estado de la cola leído de la BD (vale para todos los workers):
+      por_estado    → {status: filas} (todos los estados, aunque sea 0)
+      lag           → {cola: segundos que lleva esperando la tarea lista
+                       más vieja; 0 si no hay ninguna}
+      ultimo_minuto → {status: tareas terminadas en los últimos 60 s}
+    """
+    ahora = timezone.now()
+    por_estado = dict.fromkeys((s for s, _n in Task.STATUS_CHOICES), 0)
+    lag = {}
+    for nombre_cola, status, n in (Task.objects.order_by().values_list('queue', 'status')
+                                   .annotate(n=Count('pk'))):
+        por_estado[status] = por_estado.get(status, 0) + n
+        lag[nombre_cola] = 0.0
+    lag.update({nombre_cola: max(0.0, (ahora - desde).total_seconds()) for nombre_cola, desde in
+                Task.objects.filter(status=Task.PENDIENTE, run_at__lte=ahora)
+                .order_by().values_list('queue').annotate(desde=Min('run_at'))})
+    ultimo_minuto = dict(Task.objects.filter(finished_at__gte=ahora - timedelta(seconds=60))
+                         .order_by().values_list('status').annotate(n=Count('pk')))
+    return {'por_estado': por_estado, 'lag': lag, 'ultimo_minuto': ultimo_minuto}
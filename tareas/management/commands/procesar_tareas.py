@@ -0,0 +1,63 @@
+"""
+manage.py procesar_tareas
+Worker de la cola de tareas (ver tareas/cola.py). Correr uno o más por
+máquina, junto a los workers web:
+
+  python manage.py procesar_tareas                    # todas las colas
+  python manage.py procesar_tareas --cola imagenes    # solo esa (repetible)
+  python manage.py procesar_tareas --una-vez          # vacía la cola y termina (cron)
+  python manage.py procesar_tareas --sin-periodicas   # solo ejecuta; otro worker programa
+
+SIGTERM / Ctrl+C: termina la tarea en curso y sale.
+"""
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from tareas import cola
+
+
+class Command(BaseCommand):
+    help = 'Procesa las tareas en segundo plano encoladas en la BD.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cola', action='append', dest='colas',
+                            help='Cola a procesar (repetible). Por defecto, todas.')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa lo que esté listo y termina.')
+        parser.add_argument('--max-tareas', type=int, default=None,
+                            help='Termina después de N tareas (reinicio periódico).')
+        parser.add_argument('--sin-periodicas', action='store_true',
+                            help='No programa las tareas periódicas.')
+        parser.add_argument('--intervalo', type=float, default=None,
+                            help='Segundos de espera con la cola vacía (TAREAS["POLL_INTERVAL"]).')
+
+    def handle(self, *args, **opts):
+        detener = threading.Event()
+
+        def al_recibir(signum, frame):
+            self.stdout.write('Terminando después de la tarea en curso…')
+            detener.set()
+
+        anteriores = {sig: signal.signal(sig, al_recibir)
+                      for sig in (signal.SIGTERM, signal.SIGINT)}
+
+        self.stdout.write(f'Tareas registradas: {", ".join(sorted(cola.registradas())) or "-"}')
+        inicio = time.monotonic()
+        try:
+            resultados = cola.trabajar(opts['colas'], una_vez=opts['una_vez'],
+                                       max_tareas=opts['max_tareas'], detener=detener,
+                                       intervalo_poll=opts['intervalo'],
+                                       periodicas=not opts['sin_periodicas'])
+        finally:
+            for sig, anterior in anteriores.items():
+                signal.signal(sig, anterior)
+        total = sum(resultados.values())
+        duracion = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} tarea(s) en {duracion:.1f}s '
+            f'({total / duracion if duracion else 0:.1f}/s): '
+            f'{resultados.get("done", 0)} hecha(s), {resultados.get("retry", 0)} a reintentar, '
+            f'{resultados.get("failed", 0)} fallida(s)'))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True, verbose_name='Tarea')),
+                ('next_run', models.DateTimeField(verbose_name='Próxima ejecución')),
+            ],
+            options={
+                'verbose_name': 'Programación periódica',
+                'verbose_name_plural': 'Programaciones periódicas',
+            },
+        ),
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Tarea')),
+                ('args', models.JSONField(blank=True, default=list, verbose_name='Argumentos')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Argumentos con nombre')),
+                ('queue', models.CharField(default='default', max_length=50, verbose_name='Cola')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En curso'), ('done', 'Hecha'), ('failed', 'Fallida')], default='pending', max_length=10, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('max_attempts', models.PositiveIntegerField(default=3, verbose_name='Máximo de intentos')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Ejecutar desde')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Encolada')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Tomada')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminada')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último error')),
+            ],
+            options={
+                'verbose_name': 'Tarea',
+                'verbose_name_plural': 'Tareas',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'queue', 'run_at'], name='tarea_cola_idx'), models.Index(fields=['status', 'finished_at'], name='tarea_terminada_idx')],
+            },
+        ),
+    ]
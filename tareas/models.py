@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    Una ejecución pendiente (o ya hecha) de una tarea registrada con
+    @tarea (ver tareas/cola.py). La procesa `manage.py procesar_tareas`.
+    """
+    PENDIENTE, EN_CURSO, HECHA, FALLIDA = 'pending', 'running', 'done', 'failed'
+    STATUS_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_CURSO, 'En curso'),
+        (HECHA, 'Hecha'),
+        (FALLIDA, 'Fallida'),
+    ]
+
+    name = models.CharField(max_length=200, verbose_name="Tarea")
+    args = models.JSONField(default=list, blank=True, verbose_name="Argumentos")
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name="Argumentos con nombre")
+    queue = models.CharField(max_length=50, default='default', verbose_name="Cola")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDIENTE,
+                              verbose_name="Estado")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Intentos")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="Máximo de intentos")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Ejecutar desde")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Encolada")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Tomada")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Terminada")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+    last_error = models.TextField(blank=True, verbose_name="Último error")
+
+    class Meta:
+        verbose_name = "Tarea"
+        verbose_name_plural = "Tareas"
+        ordering = ['-created_at']
+        indexes = [
+            # La consulta del worker: pendientes de una cola, por run_at
+            models.Index(fields=['status', 'queue', 'run_at'], name='tarea_cola_idx'),
+            models.Index(fields=['status', 'finished_at'], name='tarea_terminada_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+
+
+class TaskSchedule(models.Model):
+    """Próxima ejecución de cada tarea periódica (compartida entre workers)."""
+    name = models.CharField(max_length=200, unique=True, verbose_name="Tarea")
+    next_run = models.DateTimeField(verbose_name="Próxima ejecución")
+
+    class Meta:
+        verbose_name = "Programación periódica"
+        verbose_name_plural = "Programaciones periódicas"
+
+    def __str__(self):
+        return f"{self.name} → {self.next_run:%Y-%m-%d %H:%M:%S}"
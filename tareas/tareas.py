@@ -0,0 +1,18 @@
+"""
+tareas/tareas.py
+Mantenimiento de la propia cola.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .cola import config, tarea
+from .models import Task
+
+
+@tarea(cada=60 * 60, reintentos=0)
+def purgar_terminadas():
+    """Borra las tareas hechas hace más de RETENTION_DAYS (las fallidas quedan)."""
+    limite = timezone.now() - timedelta(days=config()['RETENTION_DAYS'])
+    borradas, _detalle = Task.objects.filter(status=Task.HECHA, finished_at__lt=limite).delete()
+    return borradas
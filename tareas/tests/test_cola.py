@@ -0,0 +1,180 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tareas import cola
+from tareas.models import Task, TaskSchedule
+from tareas.tareas import purgar_terminadas
+
+ejecutadas = []
+
+
+@cola.tarea(nombre='pruebas.anotar')
+def anotar(valor, sufijo=''):
+    ejecutadas.append(f'{valor}{sufijo}')
+
+
+@cola.tarea(nombre='pruebas.falla', reintentos=1)
+def falla():
+    raise RuntimeError('SMTP caído')
+
+
+@cola.tarea(nombre='pruebas.periodica', cada=60)
+def periodica():
+    ejecutadas.append('periodica')
+
+
+def _procesar(colas=None):
+    return cola.trabajar(colas, una_vez=True, periodicas=False)
+
+
+@override_settings(TAREAS={'BACKOFF_BASE': 10, 'VISIBILITY_TIMEOUT': 60})
+class ColaTests(TestCase):
+    def setUp(self):
+        ejecutadas.clear()
+
+    def test_encolar_y_procesar(self):
+        tarea = anotar.encolar('a', sufijo='!')
+        self.assertEqual((tarea.status, tarea.args, tarea.kwargs), ('pending', ['a'], {'sufijo': '!'}))
+        self.assertEqual(ejecutadas, [])
+
+        anotar.programar(['tarde'], retraso=3600)
+        anotar.programar(['otra cola'], cola='emails')
+        self.assertEqual(_procesar(['default']), {'done': 1})
+        self.assertEqual(ejecutadas, ['a!'])
+        tarea.refresh_from_db()
+        self.assertEqual((tarea.status, tarea.attempts), ('done', 1))
+        self.assertIsNotNone(tarea.finished_at)
+        self.assertEqual(Task.objects.filter(status='pending').count(), 2)
+
+    def test_encolar_respeta_la_transaccion(self):
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic():
+                anotar.encolar('x')
+                1 / 0
+        self.assertFalse(Task.objects.exists())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            anotar.encolar_al_commit('y')
+            self.assertFalse(Task.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(Task.objects.get().args, ['y'])
+
+    def test_reintento_con_backoff_y_luego_fallida(self):
+        tarea = falla.encolar()
+        antes = timezone.now()
+        self.assertEqual(_procesar(), {'retry': 1})
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.status, 'pending')
+        self.assertIn('RuntimeError: SMTP caído', tarea.last_error)
+        self.assertGreaterEqual(tarea.run_at, antes + timedelta(seconds=5))
+        self.assertLessEqual(tarea.run_at, timezone.now() + timedelta(seconds=10))
+
+        # Todavía no toca: el worker no la toma
+        self.assertEqual(_procesar(), {})
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(_procesar(), {'failed': 1})
+        tarea.refresh_from_db()
+        self.assertEqual((tarea.status, tarea.attempts), ('failed', 2))
+
+    def test_backoff_exponencial_con_tope(self):
+        with self.settings(TAREAS={'BACKOFF_BASE': 10, 'BACKOFF_MAX': 60}):
+            for intento, tope in ((1, 10), (2, 20), (3, 40), (8, 60)):
+                espera = cola.espera_reintento(intento)
+                self.assertTrue(tope / 2 <= espera <= tope, (intento, espera))
+
+    def test_una_tarea_no_se_toma_dos_veces(self):
+        anotar.encolar('unica')
+        primera = cola.tomar(worker='w1')
+        self.assertEqual(primera.worker, 'w1')
+        self.assertIsNone(cola.tomar(worker='w2'))
+
+    def test_tarea_de_worker_muerto_se_retoma(self):
+        anotar.encolar('huerfana')
+        cola.tomar(worker='w1')
+        self.assertIsNone(cola.tomar(worker='w2'))
+        Task.objects.update(started_at=timezone.now() - timedelta(seconds=120))
+        retomada = cola.tomar(worker='w2')
+        self.assertEqual((retomada.worker, retomada.attempts), ('w2', 2))
+        cola.ejecutar(retomada)
+        self.assertEqual(ejecutadas, ['huerfana'])
+
+        # Sin intentos disponibles se marca fallida en vez de ejecutarse otra vez
+        tarea = falla.encolar()
+        Task.objects.filter(pk=tarea.pk).update(status='running', attempts=2,
+                                                started_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(_procesar(), {'failed': 1})
+        self.assertIn('Intentos agotados', Task.objects.get(pk=tarea.pk).last_error)
+
+    def test_tarea_no_registrada(self):
+        Task.objects.create(name='no.existe')
+        self.assertEqual(_procesar(), {'failed': 1})
+        self.assertEqual(Task.objects.get().last_error, 'Tarea no registrada: no.existe')
+
+    def test_periodicas(self):
+        # Solo la de prueba: las del proyecto quedan desactivadas
+        solo_prueba = {n: 0 for n in cola.registradas() if n != 'pruebas.periodica'}
+        self.enterContext(self.settings(TAREAS={'PERIODIC': solo_prueba}))
+        ahora = timezone.now()
+        encoladas = cola.programar_periodicas(ahora)
+        self.assertEqual([t.name for t in encoladas], ['pruebas.periodica'])
+        self.assertEqual(TaskSchedule.objects.get(name='pruebas.periodica').next_run,
+                         ahora + timedelta(seconds=60))
+        # Otro worker en el mismo instante no la vuelve a encolar
+        self.assertEqual(cola.programar_periodicas(ahora), [])
+        # Vencida de nuevo, pero la anterior sigue en la cola: no se apila
+        self.assertEqual(cola.programar_periodicas(ahora + timedelta(seconds=61)), [])
+
+        Task.objects.all().delete()
+        encoladas = cola.programar_periodicas(ahora + timedelta(seconds=122))
+        self.assertEqual([t.name for t in encoladas], ['pruebas.periodica'])
+
+        Task.objects.all().delete()
+        with self.settings(TAREAS={'PERIODIC': {'pruebas.periodica': 0}}):
+            self.assertNotIn('pruebas.periodica', [t.name for t in cola.programar_periodicas(
+                ahora + timedelta(days=1))])
+
+    @override_settings(TAREAS={'MODE': 'sync'})
+    def test_modo_sync_ejecuta_al_encolar(self):
+        tarea = anotar.encolar('ya')
+        self.assertEqual(ejecutadas, ['ya'])
+        self.assertEqual(Task.objects.get(pk=tarea.pk).status, 'done')
+        anotar.programar(['despues'], retraso=60)
+        self.assertEqual(ejecutadas, ['ya'])
+
+    def test_purgar_terminadas(self):
+        vieja = anotar.encolar('v')
+        fallida = falla.encolar()
+        Task.objects.update(status='done', finished_at=timezone.now() - timedelta(days=8))
+        Task.objects.filter(pk=fallida.pk).update(status='failed')
+        anotar.encolar('nueva')
+        self.assertEqual(purgar_terminadas(), 1)
+        self.assertFalse(Task.objects.filter(pk=vieja.pk).exists())
+        self.assertEqual(Task.objects.count(), 2)
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])   # el cliente de test
+    def test_comando_y_metricas(self):
+        anotar.encolar('cmd')
+        falla.encolar()
+        Task.objects.update(run_at=timezone.now() - timedelta(seconds=30))
+        anotar.programar(['luego'], retraso=600, cola='emails')
+
+        r = self.client.get(reverse('metrics'))
+        texto = r.content.decode()
+        self.assertIn('pilates_tasks{status="pending"} 3', texto)
+        lag = float(texto.split('pilates_task_queue_lag_seconds{queue="default"} ')[1].split()[0])
+        self.assertGreaterEqual(lag, 30)
+        self.assertIn('pilates_task_queue_lag_seconds{queue="emails"} 0', texto)
+
+        salida = StringIO()
+        call_command('procesar_tareas', '--una-vez', '--sin-periodicas', '--cola', 'default',
+                     stdout=salida)
+        self.assertIn('1 hecha(s), 1 a reintentar', salida.getvalue())
+        texto = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('pilates_tasks_finished_last_minute{status="done"} 1', texto)